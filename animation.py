@@ -1,11 +1,174 @@
+import io
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
 from plot2D import Plot2D
 from plot3D import Plot3D
 from parallel_coord import ParallelCoordinates
 from radar import RadarChart
 from heatmap import HeatMap
 from bubble import BubbleChart
+from bounds import BoundsContext
+from frame_writer import open_encoder
 from base_visualization import *
 
+def get_chart_types():
+    """
+    Get the chart class and the default parameters of each chart type of the animations.
+    """
+    #Parameters that are shared among all classes
+    common_params = {
+        'data': None,
+        'title': None,
+        'subtitle': None,
+        'title_size': None,
+        'subtitle_size': None,
+        'label_size': None,
+        'ticks_size': None,
+        'label_pad': None,
+        'major_grid_line_width': None,
+        'minor_grid_line_width': None,
+        'ticks_pad': None,
+        'scatter_size': None,
+        'figure_size': None,
+        'input_values': None
+    }
+
+    # Parameters that are specific for some classes
+    plot2d_params = {
+        'min_values': None,
+        'max_values': None,
+    }
+
+    plot3d_params = {
+        'min_values': None,
+        'max_values': None,
+    }
+
+    parallel_params = {
+        'min_value': None,
+        'max_value': None,
+    }
+
+    bubble_params = {
+        'min_values': None,
+        'max_values': None,
+        'color': None,
+        'cmap': None,
+    }
+
+    radar_params = {
+        'min_value': None,
+        'max_value': None,
+        'minor': False,
+        'line_width': None,
+    }
+
+    heatmap_params = {
+        'min_value': None,
+        'max_value': None,
+        'normalized': True,
+    }
+
+    return {
+        'plot2d': (Plot2D, {**common_params, **plot2d_params}),
+        'plot3d': (Plot3D, {**common_params, **plot3d_params}),
+        'parallel': (ParallelCoordinates, {**common_params, **parallel_params}),
+        'bubble': (BubbleChart, {**common_params, **bubble_params}),
+        'radar': (RadarChart, {**common_params, **radar_params}),
+        'heatmap': (HeatMap, {**common_params, **heatmap_params}),
+    }
+
+def create_chart(obj_type, output_file, input_file, parameter_dict, bounds=None):
+    """
+    Create the chart of a frame.
+
+    Parameters:
+    - obj_type: String of the chart type.
+    - output_file: String of the image of the frame.
+    - input_file: String of the file of the frame.
+    - parameter_dict: Dictionary of the plot parameters.
+    - bounds: BoundsContext of all the frames, or None for the bounds of the file.
+    """
+    # Obtains the object of the chart and the attributes for the chart
+    obj_class, obj_params = get_chart_types()[obj_type]
+    obj_params = {**obj_params, **parameter_dict, 'input_file': input_file}
+    obj = obj_class(output_file, **obj_params)
+
+    # Sets the shared bounds, except the ones given in the parameters
+    if bounds is not None:
+        bounds.apply(obj)
+        for key in ('min_values', 'max_values'):
+            if obj_params.get(key) is not None:
+                setattr(obj, key, obj_params[key])
+    return obj
+
+def get_shared_bounds(file_list):
+    """
+    Get the bounds shared by the frames of an animation.
+
+    Parameters:
+    - file_list: List of the files of the frames.
+
+    Returns:
+    - bounds: BoundsContext of all the files, or None when the files have different numbers
+      of objectives, each frame then using the bounds of its file.
+    """
+    bounds = BoundsContext(file_list)
+    if len(bounds.get_dims()) > 1:
+        return None
+    bounds.compute()
+    return bounds
+
+def init_frame_worker():
+    """
+    Set the Agg backend in the processes that render the frames.
+    """
+    mpl.use('Agg')
+
+def render_frame(obj_type, input_file, parameter_dict, bounds, frame_width, compress):
+    """
+    Render the frame of a file, in a process of the pool of Animation.render_frames.
+
+    Parameters:
+    - obj_type: String of the chart type.
+    - input_file: String of the file of the frame.
+    - parameter_dict: Dictionary of the plot parameters.
+    - bounds: BoundsContext of all the frames, or None for the bounds of the file.
+    - frame_width: Width of the frame in pixels.
+    - compress: Specifies whether the frame is sent back as PNG instead of raw pixels.
+
+    Returns:
+    - frame: The PNG bytes of the frame, or its (width, height) and its raw RGB bytes.
+    """
+    chart = create_chart(obj_type, input_file + '.png', input_file, parameter_dict, bounds)
+
+    # Renders the figure close to the width of the frame instead of resizing a large image
+    figure_size = parameter_dict.get('figure_size') or (60, 60)
+    chart.set_dpi(frame_width / figure_size[0])
+    images = chart.plot_bytes()
+
+    image = Image.open(io.BytesIO(images[chart.get_output_files()[0]])).convert('RGB')
+    if image.width != frame_width:
+        image = image.resize((frame_width, round(image.height * frame_width / image.width)), Image.LANCZOS)
+
+    if compress:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+        return buffer.getvalue()
+    return image.size, image.tobytes()
+
+def decode_frame(frame):
+    """
+    Get the image of a frame returned by render_frame.
+    """
+    if isinstance(frame, bytes):
+        return Image.open(io.BytesIO(frame)).convert('RGB')
+    size, data = frame
+    return Image.frombytes('RGB', size, data)
+
 class Animation():
     def __init__(self, files=None, output_file=None):
         self.files = files
@@ -72,7 +235,7 @@ class Animation():
                                                                    'parallel',
                                                                    'bubble',
                                                                    'radar',
-                                                                   'heatmap']):
+                                                                   'heatmap'], shared_bounds=True):
         """
         Iterates over the file list to plot each file.
 
@@ -80,87 +243,28 @@ class Animation():
             - file_list: List of strings of the files to plot
             - parameter_dict: Dictionary of the plot parameters
             - obj_type: String of the chart type to plot
+            - shared_bounds: Specifies whether all the frames use the min and max values
+              of the whole file list, so the axes do not change between frames (only when
+              all the files have the same number of objectives)
 
         """
         self.files = []
+        charts = get_chart_types()
 
-        #Parameters that are shared among all classes
-        common_params = {
-            'data': None,
-            'title': None,
-            'subtitle': None,
-            'title_size': None,
-            'subtitle_size': None,
-            'label_size': None,
-            'ticks_size': None,
-            'label_pad': None,
-            'major_grid_line_width': None,
-            'minor_grid_line_width': None,
-            'ticks_pad': None,
-            'scatter_size': None,
-            'figure_size': None,
-            'input_values': None
-        }
-
-        # Parameters that are specific for some classes
-        plot2d_params = {
-            'min_values': None,
-            'max_values': None,
-        }
-
-        plot3d_params = {
-            'min_values': None,
-            'max_values': None,
-        }
-
-        parallel_params = {
-            'min_value': None,
-            'max_value': None,
-        }
-
-        bubble_params = {
-            'min_values': None,
-            'max_values': None,
-            'color': None,
-            'cmap': None,
-        }
-
-        radar_params = {
-            'min_value': None,
-            'max_value': None,
-            'minor': False,
-            'line_width': None,
-        }
-
-        heatmap_params = {
-            'min_value': None,
-            'max_value': None,
-            'normalized': True,
-        }
-
-        charts = {
-            'plot2d': (Plot2D, {**common_params, **plot2d_params}),
-            'plot3d': (Plot3D, {**common_params, **plot3d_params}),
-            'parallel': (ParallelCoordinates, {**common_params, **parallel_params}),
-            'bubble': (BubbleChart, {**common_params, **bubble_params}),
-            'radar': (RadarChart, {**common_params, **radar_params}),
-            'heatmap': (HeatMap, {**common_params, **heatmap_params}),
-        }
-        
         idx = 0
         if obj_type in charts:
+            # Computes the bounds of all the files at once, reading them in parallel
+            bounds = None
+            if shared_bounds:
+                bounds = get_shared_bounds(file_list)
+
             # Iterates over the file list to plot each diagram
             for file in file_list:
                 idx += 1
-                # Obtains the object of the chart and the attributes for the chart
-                obj_class, obj_params = charts[obj_type]
-                # Updates the attributes for the chart
-                obj_params.update({**parameter_dict, 'input_file': file}
-                                  )
                 # Sets output name of the image to png
                 output_name = f"{file}_{idx}.png"
-                # Initializes the object
-                obj = obj_class(output_name, **obj_params)
+                # Initializes the object with the shared bounds
+                obj = create_chart(obj_type, output_name, file, parameter_dict, bounds)
                 # Plots the chart and generates an image of it
                 obj.plot()
                 # Updates the file list to add the name of the image generated
@@ -169,6 +273,96 @@ class Animation():
         else:
             print(f"Unsupported chart type: {obj_type}")
 
+    def render_frames(self, file_list, parameter_dict, obj_type, max_workers=None, window=None,
+                      frame_width=1000, shared_bounds=True, compress=False):
+        """
+        Render the frames of the files in a pool of processes, in the order of the files.
+
+        The frames are rendered at the same time, but a frame that is ready before the
+        previous ones waits for them in a reorder buffer. At most window frames are being
+        rendered or waiting at the same time, so the memory does not grow with the number
+        of frames.
+
+        Parameters:
+            - file_list: List of strings of the files to plot
+            - parameter_dict: Dictionary of the plot parameters
+            - obj_type: String of the chart type to plot
+            - max_workers: Number of processes (default: the number of CPUs)
+            - window: Maximum number of frames in progress (default: twice the processes)
+            - frame_width: Width of the frames in pixels
+            - shared_bounds: Specifies whether all the frames use the bounds of the whole file list
+              (only when all the files have the same number of objectives)
+            - compress: Specifies whether the frames are sent back from the processes as PNG
+              instead of raw pixels, which is slower but uses less memory
+
+        Returns:
+            - A generator of the frames, as RGB images of PIL
+        """
+        if obj_type not in get_chart_types():
+            raise Exception("Unsupported chart type: %s" % obj_type)
+
+        bounds = None
+        if shared_bounds:
+            bounds = get_shared_bounds(file_list)
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if window is None:
+            window = 2 * max_workers
+
+        files = iter(file_list)
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_frame_worker) as executor:
+            def submit(file):
+                pending.append(executor.submit(render_frame, obj_type, file, parameter_dict, bounds,
+                                               frame_width, compress))
+
+            try:
+                for file in itertools.islice(files, window):
+                    submit(file)
+
+                # Takes the frames in order and starts the next file for each one taken
+                while pending:
+                    frame = pending.popleft().result()
+                    for file in itertools.islice(files, 1):
+                        submit(file)
+                    yield decode_frame(frame)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def animate_parallel(self, file_list, parameter_dict, obj_type, output_file=None, max_workers=None,
+                         window=None, frame_width=1000, interval=500, shared_bounds=True, compress=False):
+        """
+        Render the frames in a pool of processes and write the animation while they are rendered.
+
+        Unlike plot_to_animate and animate, no image file is written for the frames and only
+        a window of frames is kept in memory.
+
+        Parameters:
+            - file_list: List of strings of the files to plot
+            - parameter_dict: Dictionary of the plot parameters
+            - obj_type: String of the chart type to plot
+            - output_file: String of the GIF (.gif) or animated PNG (.png, .apng) file
+              (default: animation.gif)
+            - interval: Milliseconds between two frames
+            - The other parameters are the ones of render_frames
+
+        Returns:
+            - The output file
+        """
+        self.set_output_file(output_file)
+        self.set_default_values()
+
+        frames = self.render_frames(file_list, parameter_dict, obj_type, max_workers=max_workers, window=window,
+                                    frame_width=frame_width, shared_bounds=shared_bounds, compress=compress)
+        with open_encoder(self.output_file, interval=interval) as encoder:
+            for frame in frames:
+                encoder.append(frame)
+
+        return self.output_file
+
     def read_files(self):
         """
         Iterates over the file list to read each image of the chart.
@@ -180,22 +374,42 @@ class Animation():
             img_obj = plt.imshow(img, animated=True)
             self.images.append([img_obj])
 
-    def animate(self, output_file=None):
+    def animate(self, output_file=None, interval=500, optimize=True, frame_width=1000):
         """
         Animates the list of the images.
-        
+
+        By default the images are given to an encoder with one palette for all the frames,
+        which stores only the region that changed in each frame and drops the repeated
+        frames. Otherwise each whole frame is drawn by matplotlib and saved with the pillow
+        writer.
+
         Parameters:
-            - output_file = String of the output file
+            - output_file = String of the output file, GIF (.gif) or animated PNG (.png, .apng)
+              when optimize is True
+            - interval = Milliseconds between two frames
+            - optimize = Boolean to use the encoder instead of matplotlib
+            - frame_width = Width of the frames of the encoder
         """
+        self.set_output_file(output_file)
+        self.set_default_values()
+
+        if optimize:
+            # Streams the images to the encoder, a frame at a time
+            with open_encoder(self.output_file, interval=interval) as encoder:
+                for file in self.files:
+                    with Image.open(file) as image:
+                        image = image.convert('RGB')
+                    height = round(image.height * frame_width / image.width)
+                    encoder.append(image.resize((frame_width, height), Image.LANCZOS))
+            return
 
         fig, ax = plt.subplots(figsize=(10, 10))
         
         self.read_files()
-        self.set_output_file(output_file)
 
         # Generates the animation
         anim = animation.ArtistAnimation(
-            fig, self.images, interval=500, blit=True)
+            fig, self.images, interval=interval, blit=True)
 
         frame_height, frame_width, _ = self.images[0][0].get_array().shape
 
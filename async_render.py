@@ -0,0 +1,222 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from batch import plot_chart
+from output_writer import OutputWriter
+
+class ChartWriter():
+    def __init__(self, writer):
+        """
+        Initialize the ChartWriter class.
+
+        The writer of a single chart: it queues the images on a shared OutputWriter and
+        keeps the futures of its own writes, so they can be awaited and their errors are
+        raised for this chart only.
+
+        Parameters:
+        - writer: The shared OutputWriter.
+        """
+        self.writer = writer
+        self.futures = []
+
+    def submit(self, fig, output_file, sink=None):
+        future = self.writer.submit(fig, output_file, sink=sink)
+        self.futures.append(future)
+        return future
+
+    def run_after(self, futures, function):
+        future = self.writer.run_after(futures, function)
+        self.futures.append(future)
+        return future
+
+class AsyncRenderer():
+    def __init__(self, max_concurrency=8, executor=None, load_workers=4, writer=None):
+        """
+        Initialize the AsyncRenderer class.
+
+        The renderer plots charts from an asyncio event loop without blocking it: the data
+        is loaded in a pool of threads, the charts are rendered in an executor and the images
+        are written in the background by an OutputWriter, while the loop only waits for them.
+
+        Parameters:
+        - max_concurrency: Specifies the number of charts loaded and rendered at the same
+          time. The other charts wait for their turn without using any thread.
+        - executor: Specifies the executor that renders the charts (default: a pool of
+          max_concurrency threads). With a ProcessPoolExecutor the charts are sent to the
+          processes, which load, render and write them; their data should be a FrontHandle.
+          The threads share the interpreter lock with the event loop, so a service with many
+          charts in flight keeps its loop responsive with a pool of processes.
+        - load_workers: Specifies the number of threads that load the data of the charts.
+        - writer: Specifies the OutputWriter of the images rendered in threads (default: a
+          writer created with the renderer). Its errors are raised by the chart that failed.
+        """
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.load_executor = ThreadPoolExecutor(max_workers=load_workers)
+        self.writer = writer
+        self.own_executor = executor is None
+        self.own_writer = writer is None
+        self.semaphore = None
+        self.loop = None
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        if self.writer is None:
+            self.writer = OutputWriter(collect_errors=False)
+
+    def get_semaphore(self):
+        """
+        Get the semaphore that limits the charts in progress, for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.semaphore
+
+    async def wait(self, future):
+        """
+        Wait for a future of an executor without blocking the event loop.
+
+        If the waiting task is cancelled, the future is cancelled too when it did not start.
+
+        Parameters:
+        - future: The concurrent future to wait for.
+        """
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def plot(self, chart):
+        """
+        Plot a chart.
+
+        The task can be cancelled at any time: a chart that is waiting for its turn or its
+        data is not rendered, while a chart already loading or rendering in a thread finishes
+        there, keeping its slot until then so the limit of charts in progress holds.
+
+        Parameters:
+        - chart: The chart object to plot.
+
+        Returns:
+        - chart: The plotted chart, once its images are written.
+        """
+        semaphore = self.get_semaphore()
+        await semaphore.acquire()
+
+        future = None
+        try:
+            if isinstance(self.executor, ProcessPoolExecutor):
+                future = self.executor.submit(plot_chart, chart)
+                await self.wait(future)
+                return chart
+
+            # Loads the data of the chart, unless it is streamed while it is rendered
+            if chart.input_file is not None and chart.data is None and not chart.use_chunks():
+                future = self.load_executor.submit(chart.set_data)
+                await self.wait(future)
+
+            writer = ChartWriter(self.writer)
+            chart.set_writer(writer)
+            future = self.executor.submit(chart.plot)
+            await self.wait(future)
+        finally:
+            # A running future can not be stopped, so the slot is released when it ends
+            if future is not None and not future.done():
+                loop = asyncio.get_running_loop()
+                future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+            else:
+                semaphore.release()
+
+        # Waits for the images of the chart, while the next charts are rendered
+        try:
+            for future in writer.futures:
+                if future is not None:
+                    await self.wait(future)
+        finally:
+            chart.set_writer(None)
+
+        return chart
+
+    async def gather(self, charts, return_exceptions=False):
+        """
+        Plot several charts, at most max_concurrency of them at the same time.
+
+        Parameters:
+        - charts: List of the chart objects to plot.
+        - return_exceptions: Specifies whether the exceptions of the charts are returned in
+          the list instead of raised. Otherwise the first exception is raised and the charts
+          that did not start are cancelled.
+
+        Returns:
+        - results: The list of the plotted charts, in the same order.
+        """
+        tasks = [asyncio.ensure_future(self.plot(chart)) for chart in charts]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def close(self):
+        """
+        Wait for the images being written and stop the executors created by the renderer.
+        """
+        self.load_executor.shutdown()
+        if self.own_executor:
+            self.executor.shutdown()
+        if self.own_writer:
+            self.writer.close()
+
+    async def aclose(self):
+        """
+        Close the renderer without blocking the event loop.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+# Renderer used by the charts when they are plotted without one
+DEFAULT_RENDERER = None
+
+def get_renderer():
+    """
+    Get the default renderer, created when it is first used.
+    """
+    global DEFAULT_RENDERER
+    if DEFAULT_RENDERER is None:
+        DEFAULT_RENDERER = AsyncRenderer()
+    return DEFAULT_RENDERER
+
+async def plot_async(chart, renderer=None):
+    """
+    Plot a chart without blocking the event loop.
+
+    Parameters:
+    - chart: The chart object to plot.
+    - renderer: The AsyncRenderer that plots the chart (default: the shared renderer).
+    """
+    if renderer is None:
+        renderer = get_renderer()
+    return await renderer.plot(chart)
+
+async def gather_charts(charts, renderer=None, return_exceptions=False):
+    """
+    Plot several charts without blocking the event loop.
+
+    Parameters:
+    - charts: List of the chart objects to plot.
+    - renderer: The AsyncRenderer that plots the charts (default: the shared renderer).
+    - return_exceptions: Specifies whether the exceptions of the charts are returned in the list.
+    """
+    if renderer is None:
+        renderer = get_renderer()
+    return await renderer.gather(charts, return_exceptions=return_exceptions)
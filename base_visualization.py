@@ -1,26 +1,42 @@
 import numpy as np
 import pandas as pd
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import matplotlib.colors as colors
 import matplotlib.animation as animation
 import decimal
+import hashlib
+import io
 import os
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from front_reader import get_reader
+from front_index import FrontIndex
+from output_sink import MemorySink, OutputSink, open_sink
+from shared_front import FrontHandle, SharedFront
+
+# The rc parameters of matplotlib are global, so the charts that need to change them
+# while rendering take turns
+RC_LOCK = threading.Lock()
 
 class BaseVisualization(ABC):
 
     def __init__(self, output_file, input_file=None, data=None, title=None, dim=None, subtitle=None, min_values=None,
                  max_values=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
                  label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
-                 scatter_size=None, figure_size=None, input_values=None):
+                 scatter_size=None, figure_size=None, input_values=None, chunk_size=None):
         """
         Initialize the BaseVisualization class.
         
         Parameters:
         - output_file: Specifies the output file where the visualization will be saved.
         - input_file: Specifies an input file that may be used for the visualization.
-        - data: Specifies the data to be visualized.
+        - data: Specifies the data to be visualized, as a pandas frame or as the FrontHandle of
+          a front published in shared memory.
         - title: Specifies the title of the visualization.
         - dim: Specifies the dimensions of the visualization.
         - subtitle: Specifies the subtitle of the visualization.
@@ -37,6 +53,7 @@ class BaseVisualization(ABC):
         - scatter_size: Specifies the size of scatter plot markers.
         - figure_size: Specifies the size of the figure or plot.
         - input_values: Specifies the input values used in the visualization.
+        - chunk_size: Specifies the number of rows read at a time when streaming the input_file.
         """
         self.input_file = input_file
         self.data = data
@@ -57,14 +74,35 @@ class BaseVisualization(ABC):
         self.figure_size = figure_size
         self.dim = dim
         input_values = input_values
+        self.chunk_size = chunk_size
+        self.columns = None
+        self.rc_params = None
+        self.dpi = None
+        self.writer = None
+        self.sink = None
+        self.front_cache = None
+        self.cache = None
+        self.cache_key = None
+        self.pending_writes = []
         self.font_size = 275 / 2
         self.summary = None
+        self.shared_front = None
+
+        # Opens the front published in shared memory, without copying it
+        if isinstance(data, FrontHandle):
+            self.attach_data(data)
 
     def set_summary(self):
         """
         Set the summary statistics of the data.
+
+        When the data is streamed from the input_file, only the count, min and max rows
+        are computed, in a single pass over the chunks.
         """
-        summary = self.data.describe()
+        if self.use_chunks():
+            summary = self.get_reader().get_summary()
+        else:
+            summary = self.data.describe()
         self.summary = summary
 
     def get_summary(self):
@@ -81,9 +119,16 @@ class BaseVisualization(ABC):
         If so, it reads the data from the input_file and assigns it to the data attribute of the object.
         It raises and exception, when none is provided.
         """
+        if isinstance(new_data, FrontHandle):
+            self.attach_data(new_data)
+            new_data = None
         if self.data is None and self.input_file is not None:
-            self.data = pd.read_csv(
-                self.input_file, delimiter=" ", header=None, skiprows=1)
+            if self.front_cache is not None:
+                # Shares the front with the other charts of the same file and objectives
+                key = (self.get_front_key(), None if self.columns is None else tuple(self.columns))
+                self.data = self.front_cache.get(key, lambda: self.get_reader().read())
+            else:
+                self.data = self.get_reader().read()
         if self.data is not None and new_data is not None:
             self.data = new_data
         if self.data is None and self.input_file is None:
@@ -95,6 +140,301 @@ class BaseVisualization(ABC):
         """
         return self.data
 
+    def attach_data(self, handle):
+        """
+        Use a front published in shared memory as the data, without copying it.
+
+        Parameters:
+        - handle: The FrontHandle of the front.
+        """
+        self.release_data()
+        self.shared_front = SharedFront.attach(handle)
+        self.data = self.shared_front.get_frame()
+
+    def release_data(self):
+        """
+        Drop the data and close the shared memory of the front, if it is shared.
+        """
+        if self.shared_front is None:
+            return
+        self.data = None
+        self.summary = None
+        self.shared_front.close()
+        self.shared_front = None
+
+    def __getstate__(self):
+        """
+        Get the state sent to other processes. A shared front is sent as its handle.
+        """
+        state = self.__dict__.copy()
+        if self.shared_front is not None:
+            state['data'] = self.shared_front.handle
+            state['summary'] = None
+            state['shared_front'] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore the state received from another process, attaching to the shared front.
+        """
+        self.__dict__.update(state)
+        if isinstance(self.data, FrontHandle):
+            self.attach_data(self.data)
+
+    def get_reader(self):
+        """
+        Gets the reader of the input_file.
+        """
+        return get_reader(self.input_file, chunk_size=self.chunk_size, columns=self.columns)
+
+    def set_columns(self, columns):
+        """
+        Set the positions of the objectives read from the input_file.
+
+        Charts that only draw some of the objectives set it, so the readers of columnar
+        formats do not read the rest.
+
+        Parameters:
+        - columns: List of the positions of the objectives, or None to read all of them.
+        """
+        self.columns = columns
+
+    def get_columns(self):
+        """
+        Gets the columns attribute.
+        """
+        return self.columns
+
+    def set_dpi(self, dpi):
+        """
+        Set the resolution of the images saved.
+
+        Parameters:
+        - dpi: Dots per inch of the images, or None for the resolution of the figure.
+        """
+        self.dpi = dpi
+
+    def get_dpi(self):
+        """
+        Gets the dpi attribute.
+        """
+        return self.dpi
+
+    def set_writer(self, writer):
+        """
+        Set the writer that encodes and writes the images in the background.
+
+        Parameters:
+        - writer: An OutputWriter, or None to save the images directly.
+        """
+        self.writer = writer
+
+    def get_writer(self):
+        """
+        Gets the writer attribute.
+        """
+        return self.writer
+
+    def set_sink(self, sink):
+        """
+        Set the sink that receives the images instead of the files of the output_file.
+
+        The images keep the names of their files, e.g. the views of a Plot3D are named
+        front_1.png ... front_5.png for the output_file front.png.
+
+        An archive is closed once all its images are written, so it is given by its path to
+        plot_all or to an OutputWriter, which close it, or opened as an ArchiveSink and
+        closed by the caller.
+
+        Parameters:
+        - sink: An OutputSink, a function called with the name and the bytes of each image,
+          or None to write the files.
+        """
+        if sink is not None and not isinstance(sink, OutputSink) and not callable(sink):
+            raise Exception("The sink of a chart must be an OutputSink or a function, "
+                            "an archive path is given to plot_all or to an OutputWriter")
+        self.sink = open_sink(sink)
+
+    def get_sink(self):
+        """
+        Gets the sink attribute.
+        """
+        return self.sink
+
+    def set_front_cache(self, front_cache):
+        """
+        Set the cache of the fronts read from the input files, shared by several charts.
+
+        The input_file is kept, so the front is still identified by its file (see
+        get_front_key) and the values computed from it are found without hashing the data.
+
+        Parameters:
+        - front_cache: A front_index.FrontCache, or None to read the front for each chart.
+          The fronts in the cache are shared by the charts and must not be changed.
+        """
+        self.front_cache = front_cache
+
+    def get_front_cache(self):
+        """
+        Gets the front_cache attribute.
+        """
+        return self.front_cache
+
+    def set_cache(self, cache):
+        """
+        Set the cache of rendered images.
+
+        Parameters:
+        - cache: A RenderCache, or None to always render the chart.
+        """
+        self.cache = cache
+
+    def get_cache(self):
+        """
+        Gets the cache attribute.
+        """
+        return self.cache
+
+    def get_output_files(self):
+        """
+        Get the list of the files written by the chart.
+        """
+        return [self.output_file]
+
+    def get_data_hash(self):
+        """
+        Compute a hash of the data of the chart.
+
+        If the data is streamed from the input_file, the content of the file is hashed.
+        """
+        digest = hashlib.sha256()
+        if self.data is not None:
+            digest.update(repr((self.data.shape, list(self.data.columns))).encode())
+            digest.update(np.ascontiguousarray(self.data.to_numpy(dtype=float)).tobytes())
+        else:
+            with open(self.input_file, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+    def get_front_key(self):
+        """
+        Get a key that identifies the front of the chart, for the values computed from it.
+
+        The front is identified by its file when possible, with its modification time and
+        size, as hashing the data costs as much as most of the values computed from it.
+        """
+        if self.input_file is not None:
+            stat = os.stat(self.input_file)
+            return (os.path.abspath(self.input_file), stat.st_mtime, stat.st_size)
+        return self.get_data_hash()
+
+    def get_params(self):
+        """
+        Get the parameters of the chart that change the image, once they are resolved.
+        """
+        excluded = ['data', 'summary', 'input_file', 'output_file', 'writer', 'sink', 'front_cache', 'cache',
+                    'cache_key', 'pending_writes', 'shared_front']
+        return {name: value for name, value in vars(self).items() if name not in excluded}
+
+    def get_highlight_rows(self, highlight):
+        """
+        Get the positions of the rows of the solutions to highlight.
+
+        Parameters:
+        - highlight: A list of row positions (e.g. the result of a FrontIndex query), a dict
+          with the (low, high) range of some objectives, answered with the FrontIndex of the
+          front, 'extremes' for the solutions with the minimum value of each objective, or None.
+
+        Returns:
+        - rows: Array with the positions of the rows, empty if there is nothing to highlight.
+        """
+        if highlight is None:
+            return np.zeros(0, dtype=int)
+
+        if isinstance(highlight, dict):
+            return FrontIndex.get(self).query(highlight)
+
+        if isinstance(highlight, str):
+            if highlight != 'extremes':
+                raise Exception("Unsupported highlight: %s" % highlight)
+            # Takes the solution with the minimum value of each objective once
+            values = self.data.to_numpy(dtype=float)[:, :self.dim]
+            return np.unique(np.nanargmin(values, axis=0))
+
+        return np.asarray(highlight, dtype=int)
+
+    def restore_cached(self):
+        """
+        Copy the images of a previous render with the same data and parameters, if any.
+
+        Returns:
+        - True if the images were restored from the cache, so the chart is not rendered.
+        """
+        # The cache keeps files, so the images sent to a sink are always rendered
+        if self.cache is None or self.sink is not None:
+            return False
+
+        self.cache_key = self.cache.get_key(self)
+        if self.cache.restore(self.cache_key, self.get_output_files()):
+            return True
+
+        self.cache.release(self.get_output_files())
+        return False
+
+    def store_cached(self):
+        """
+        Add the images written by the chart to the cache.
+
+        If the images are written in the background, they are added once they are written.
+        """
+        pending_writes = [future for future in self.pending_writes if future is not None]
+        self.pending_writes = []
+
+        if self.cache is None or self.sink is not None:
+            return
+
+        cache, key, output_files = self.cache, self.cache_key, self.get_output_files()
+        if pending_writes:
+            self.writer.run_after(pending_writes, lambda: cache.store(key, output_files))
+        else:
+            cache.store(key, output_files)
+
+    def use_chunks(self):
+        """
+        Check if the data has to be streamed from the input_file instead of being loaded.
+        """
+        return self.data is None and self.input_file is not None and self.chunk_size is not None
+
+    def iter_chunks(self):
+        """
+        Iterate over the data in blocks of chunk_size rows.
+
+        If the data is already loaded it is returned as a single block, otherwise the
+        input_file is streamed without materializing the whole front.
+        """
+        if self.data is not None:
+            yield self.data
+        elif self.input_file is not None:
+            yield from self.get_reader().iter_chunks()
+        else:
+            raise Exception("You must provide the data or the input_file")
+
+    def set_chunk_size(self, size):
+        """
+        Set the number of rows read at a time when streaming the input_file.
+
+        Parameters:
+        - size: Number of rows of each chunk.
+        """
+        self.chunk_size = size
+
+    def get_chunk_size(self):
+        """
+        Gets the chunk size attribute.
+        """
+        return self.chunk_size
+
     def set_dim(self):
         """
         Set the dimension (number of columns) of the visualization.
@@ -121,6 +461,26 @@ class BaseVisualization(ABC):
         if self.max_values is None:
             self.max_values = self.get_values('max')
 
+    def set_bounds(self, bounds):
+        """
+        Set the min and max values shared with other charts, so all of them use the same axes
+        (e.g. the frames of an animation or a sweep of fronts).
+
+        Parameters:
+        - bounds: A BoundsContext of the files, or any object with the rounded min_values
+          and max_values of every objective.
+        """
+        min_values = list(bounds.min_values)
+        max_values = list(bounds.max_values)
+
+        # Keeps the objectives read by the chart, as its own summary would
+        if self.columns is not None:
+            min_values = [min_values[col] for col in self.columns]
+            max_values = [max_values[col] for col in self.columns]
+
+        self.min_values = min_values
+        self.max_values = max_values
+
     def get_min_values(self):
         """
         Gets the min values attribute.
@@ -359,18 +719,12 @@ class BaseVisualization(ABC):
         - values: A list of rounded values corresponding to the specified type.
         """
 
-        rounding = {'min': self.round_down, 'max': self.round_up}
-
         num_columns = self.summary.shape[1]
         values = []
 
         #For each columns format the min o max values to 2 decimals
         for col in range(num_columns):
-            value = self.summary[col].loc[type]
-            value_formatted = float(decimal.Decimal(str(value)).quantize(
-                decimal.Decimal('.01')))
-            value_rounded = rounding[type](value_formatted)
-            values.append(value_rounded)
+            values.append(self.round_value(self.summary[col].loc[type], type))
 
         return values
 
@@ -393,7 +747,26 @@ class BaseVisualization(ABC):
                     np.around(base_size[1] * (1 + (0.17 * (len(max_len_str) - 3)))))
         return size
 
-    def round_down(self, num):
+    @staticmethod
+    def round_value(value, type):
+        """
+        Round a min or max value to 2 decimals and then down or up to a quarter.
+
+        Parameters:
+        - value: The value to be rounded.
+        - type: Specifies the type of value. Should be 'min' or 'max'.
+
+        Returns:
+        The rounded value.
+        """
+        value_formatted = float(decimal.Decimal(str(value)).quantize(
+            decimal.Decimal('.01')))
+        if type == 'min':
+            return BaseVisualization.round_down(value_formatted)
+        return BaseVisualization.round_up(value_formatted)
+
+    @staticmethod
+    def round_down(num):
         """
         Round down a number to the nearest specified decimal value.
         
@@ -408,7 +781,8 @@ class BaseVisualization(ABC):
         round_dict = {0.1: 0, 0.251: 0.25, 0.51: 0.5, 0.751: 0.75}
         return integer + round_dict.get(max(filter(lambda x: x <= decimal, round_dict.keys()), default=0), 0)
 
-    def round_up(self, num):
+    @staticmethod
+    def round_up(num):
         """
         Rounds up a given number to the nearest predefined values.
         
@@ -502,9 +876,99 @@ class BaseVisualization(ABC):
 
         return tick_locations
 
+    def create_figure(self, figsize=None):
+        """
+        Create a figure attached to its own Agg canvas.
+
+        The figure is not registered in pyplot, so several charts can be rendered at the
+        same time from different threads.
+
+        Parameters:
+        - figsize: Size of the figure in inches.
+
+        Returns:
+        - fig: The created figure.
+        """
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig
+
+    @contextmanager
+    def render_context(self):
+        """
+        Context where the chart is rendered.
+
+        If the chart sets rc_params, they are applied only while rendering and the charts
+        that change them take turns, as the rc parameters of matplotlib are global.
+        """
+        if not self.rc_params:
+            yield
+            return
+
+        with RC_LOCK, mpl.rc_context(self.rc_params):
+            yield
+
+    def save_figure(self, fig, output_file=None):
+        """
+        Render the figure and save it as a file, or send it to the sink of the chart.
+
+        If the chart has a writer, the figure is rendered here and the file is encoded and
+        written (or sent to the sink) in the background by the writer.
+
+        Parameters:
+        - fig: The figure to save.
+        - output_file: The file where the figure is saved (default: output_file attribute).
+        """
+        if output_file is None:
+            output_file = self.output_file
+
+        with self.render_context():
+            if self.writer is None and self.sink is not None:
+                # Encodes the image in memory, in the format of the extension of the file
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=os.path.splitext(output_file)[1][1:].lower() or 'png', dpi=self.dpi)
+                self.sink.write(output_file, buffer.getvalue())
+            elif self.writer is None:
+                fig.savefig(output_file, dpi=self.dpi)
+            else:
+                # The writer renders the figure at its own resolution
+                if self.dpi is not None:
+                    fig.set_dpi(self.dpi)
+                self.pending_writes.append(self.writer.submit(fig, output_file, sink=self.sink))
+
+    def plot_bytes(self):
+        """
+        Plot the chart in memory, without writing any file.
+
+        Returns:
+        - images: Dict with the bytes of the image of each output file, e.g.
+          chart.plot_bytes()[chart.output_file].
+        """
+        writer, sink = self.writer, self.sink
+        memory = MemorySink()
+        self.writer = None
+        self.sink = memory
+        try:
+            self.plot()
+        finally:
+            self.writer, self.sink = writer, sink
+        return memory.images
+
     @abstractmethod
     def plot(self):
         """
         Abstract method to be implemented in child classes
         """
         pass
+
+    async def plot_async(self, renderer=None):
+        """
+        Plot the chart from an asyncio event loop without blocking it.
+
+        Parameters:
+        - renderer: The AsyncRenderer that plots the chart (default: the shared renderer of
+          async_render, which limits the charts rendered at the same time).
+        """
+        # Imported here, as async_render imports the charts
+        from async_render import plot_async
+        return await plot_async(self, renderer)
@@ -0,0 +1,356 @@
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from plot2D import Plot2D
+from plot3D import Plot3D
+from parallel_coord import ParallelCoordinates
+from radar import RadarChart
+from heatmap import HeatMap
+from bubble import BubbleChart
+from convergence import ConvergenceDiagram
+from scatter_matrix import ScatterMatrix
+from projection import ProjectionPlot
+from small_multiples import SmallMultiples
+from work_queue import WorkQueue, get_worker_name
+from planner import CostModel, Planner
+from output_sink import OutputSink, open_sink
+
+# Charts that can be plotted from a job, by name
+CHART_TYPES = {'plot2d': Plot2D, 'plot3d': Plot3D, 'parallel': ParallelCoordinates, 'radar': RadarChart,
+               'heatmap': HeatMap, 'bubble': BubbleChart, 'convergence': ConvergenceDiagram,
+               'scatter_matrix': ScatterMatrix, 'projection': ProjectionPlot, 'small_multiples': SmallMultiples}
+
+def plot_all(charts, max_workers=None, writer=None, sink=None):
+    """
+    Plot several charts at the same time in a pool of threads.
+
+    The charts render on their own figures and canvases, and the Agg renderer releases
+    the GIL while drawing, so the charts are rendered in parallel inside one process.
+
+    Parameters:
+    - charts: List of the chart objects to plot.
+    - max_workers: Maximum number of charts rendered at the same time.
+    - writer: OutputWriter that encodes and writes the images in the background while the
+      next charts are rendered. The images are all written when the function returns.
+    - sink: Sink that receives the images of all the charts instead of their files (see
+      output_sink), e.g. the path of a zip or tar archive, written with an entry per image.
+      An archive given by its path is closed when the function returns, or removed when a
+      chart failed.
+
+    Returns:
+    - charts: The list of the plotted charts. The first exception raised by a chart is
+      raised again once all the charts finished.
+    """
+    if writer is not None:
+        for chart in charts:
+            chart.set_writer(writer)
+
+    own_sink = sink is not None and not isinstance(sink, OutputSink)
+    sink = open_sink(sink)
+    if sink is not None:
+        for chart in charts:
+            chart.set_sink(sink)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(chart.plot) for chart in charts]
+
+        for future in futures:
+            future.result()
+
+        if writer is not None:
+            writer.flush()
+    except BaseException:
+        # Removes the archive of a failed batch instead of leaving a partial one
+        if own_sink:
+            sink.abort()
+        raise
+
+    if own_sink:
+        sink.close()
+
+    return charts
+
+def plot_chart(chart):
+    """
+    Plot a chart and release its data, closing the shared memory of a shared front.
+
+    Parameters:
+    - chart: The chart object to plot.
+    """
+    try:
+        chart.plot()
+    finally:
+        chart.release_data()
+
+def plot_processes(charts, max_workers=None):
+    """
+    Plot several charts at the same time in a pool of processes.
+
+    The charts are sent to the processes, so their data should be the FrontHandle of a
+    front published with SharedFront.publish(): only the handle is sent and each process
+    reads the values from the shared memory without a copy.
+
+    Parameters:
+    - charts: List of the chart objects to plot.
+    - max_workers: Maximum number of processes.
+
+    Returns:
+    - charts: The list of the charts. The first exception raised by a chart is raised
+      again once all the charts finished.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(plot_chart, chart) for chart in charts]
+
+    for future in futures:
+        future.result()
+
+    return charts
+
+def run_job(spec, token, front_cache=None):
+    """
+    Plot the chart of a job.
+
+    The chart is written to temporary files that replace the output files once they are
+    complete, so a job that is run twice, or a worker that crashes, never leaves a partial
+    image behind.
+
+    Parameters:
+    - spec: Dict with the 'chart' name and its 'params', including the output_file and
+      optionally the dpi of the images.
+    - token: Text that makes the temporary files of the job unique.
+    - front_cache: FrontCache of the fronts read from the input files, shared with other
+      jobs of the same process (see BaseVisualization.set_front_cache).
+
+    Returns:
+    - output_files: The list of the files written.
+    """
+    if spec['chart'] not in CHART_TYPES:
+        raise Exception("Unsupported chart: %s" % spec['chart'])
+
+    params = dict(spec['params'])
+    output_file = params.pop('output_file')
+    dpi = params.pop('dpi', None)
+    chart = CHART_TYPES[spec['chart']](output_file, **params)
+    chart.set_dpi(dpi)
+    chart.set_front_cache(front_cache)
+
+    # The default title comes from the output file, not from the temporary one
+    if chart.title is None:
+        chart.title = chart.extract_filename(output_file)
+
+    output_files = chart.get_output_files()
+    name, ext = os.path.splitext(output_file)
+    chart.output_file = '%s.tmp-%s%s' % (name, token, ext)
+    tmp_files = chart.get_output_files()
+
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    try:
+        chart.plot()
+        for tmp_file, output_file in zip(tmp_files, output_files):
+            os.replace(tmp_file, output_file)
+    finally:
+        chart.release_data()
+        for tmp_file in tmp_files:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    return output_files
+
+def run_planned(specs, planner=None, max_workers=None, max_memory=None):
+    """
+    Plot several jobs in a pool of processes, planned and scheduled by their estimated cost.
+
+    The jobs are planned to fit in the budget of the planner and started from the longest
+    one. A job only starts when the memory estimated for the jobs running plus its own is
+    under max_memory; shorter jobs that fit start meanwhile, and a job larger than the
+    limit runs alone.
+
+    Parameters:
+    - specs: List of dicts with the 'chart' name and its 'params', including the output_file.
+    - planner: The Planner of the jobs (default: a Planner without budget).
+    - max_workers: Maximum number of processes (default: the number of CPUs).
+    - max_memory: Maximum bytes of memory estimated for the jobs running at the same time
+      (default: no limit).
+
+    Returns:
+    - output_files: The list of the files written by each job, in the order of specs. The
+      first exception raised by a job is raised again once all the jobs finished.
+    """
+    if planner is None:
+        planner = Planner()
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    pending = planner.schedule(specs)
+    running = {}
+    used = 0
+    output_files = [None] * len(specs)
+    error = None
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Starts the longest jobs that fit in the free workers and memory
+            i = 0
+            while i < len(pending) and len(running) < max_workers:
+                position, spec, estimate = pending[i]
+                if max_memory is not None and running and used + estimate['memory'] > max_memory:
+                    i += 1
+                    continue
+                future = executor.submit(run_job, spec, '%d-%d' % (position, os.getpid()))
+                running[future] = (position, estimate['memory'])
+                used += estimate['memory']
+                pending.pop(i)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                position, memory = running.pop(future)
+                used -= memory
+                try:
+                    output_files[position] = future.result()
+                except Exception as exception:
+                    if error is None:
+                        error = exception
+
+    if error is not None:
+        raise error
+
+    return output_files
+
+def run_worker(queue_file, lease=300, poll_interval=5, max_jobs=None, max_attempts=3):
+    """
+    Plot the jobs of a queue until there are no jobs left.
+
+    The lease of the running job is renewed in the background, so only the jobs of the
+    workers that stopped are claimed again by other workers.
+
+    Parameters:
+    - queue_file: The database of the WorkQueue, usually on shared storage.
+    - lease: The seconds a claimed job is reserved for the worker without a renewal.
+    - poll_interval: The seconds to wait for the jobs of other workers when there is no
+      job to claim, as their leases may expire.
+    - max_jobs: Maximum number of jobs to run (default: no limit).
+    - max_attempts: Number of times a job is tried before it is failed.
+
+    Returns:
+    - done: The number of jobs the worker completed.
+    """
+    queue = WorkQueue(queue_file, max_attempts=max_attempts)
+    worker = get_worker_name()
+    done = 0
+
+    while max_jobs is None or done < max_jobs:
+        job = queue.claim(worker, lease)
+        if job is None:
+            if not queue.has_work():
+                break
+            time.sleep(poll_interval)
+            continue
+
+        job_id, spec = job
+
+        # Renews the lease of the job while it is plotted
+        stop = threading.Event()
+        def renew():
+            while not stop.wait(lease / 3):
+                queue.renew(job_id, worker, lease)
+        heartbeat = threading.Thread(target=renew, daemon=True)
+        heartbeat.start()
+
+        try:
+            run_job(spec, '%d-%d' % (job_id, os.getpid()))
+        except Exception:
+            stop.set()
+            heartbeat.join()
+            queue.fail(job_id, worker, traceback.format_exc())
+            continue
+
+        stop.set()
+        heartbeat.join()
+        queue.complete(job_id, worker)
+        done += 1
+
+    return done
+
+def run_workers(queue_file, processes=None, **kwargs):
+    """
+    Run several workers of a queue in separate processes and wait for them.
+
+    Parameters:
+    - queue_file: The database of the WorkQueue.
+    - processes: The number of workers (default: the number of CPUs).
+    - kwargs: Parameters of run_worker.
+
+    Returns:
+    - report: The report of the queue once the workers finished.
+    """
+    if processes is None:
+        processes = os.cpu_count()
+
+    workers = [multiprocessing.Process(target=run_worker, args=(queue_file,), kwargs=kwargs)
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return WorkQueue(queue_file).get_report()
+
+def main():
+    """
+    Command line of the batch rendering across several hosts.
+
+    - add QUEUE JOBS: adds the jobs of a file with a JSON job per line to the queue. With
+      --plan the jobs are planned to fit in --max-seconds and --max-memory (MB) and added
+      from the longest one, as the workers claim them in order.
+    - work QUEUE: runs workers on this host until the queue is empty.
+    - report QUEUE: prints the report of the queue.
+    """
+    parser = argparse.ArgumentParser(description='Render charts from a queue shared by several hosts')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='add the jobs of a JSON lines file')
+    add.add_argument('queue')
+    add.add_argument('jobs')
+    add.add_argument('--plan', action='store_true')
+    add.add_argument('--model', default=None, help='cost model fitted with planner.py benchmark')
+    add.add_argument('--max-seconds', type=float, default=None)
+    add.add_argument('--max-memory', type=float, default=None)
+
+    work = commands.add_parser('work', help='run workers until the queue is empty')
+    work.add_argument('queue')
+    work.add_argument('--processes', type=int, default=None)
+    work.add_argument('--lease', type=float, default=300)
+    work.add_argument('--max-attempts', type=int, default=3)
+
+    report = commands.add_parser('report', help='print the report of the queue')
+    report.add_argument('queue')
+
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        with open(args.jobs) as file:
+            specs = [json.loads(line) for line in file if line.strip()]
+        if args.plan:
+            model = CostModel.load(args.model) if args.model is not None else None
+            max_memory = args.max_memory * 2 ** 20 if args.max_memory is not None else None
+            planner = Planner(model, max_seconds=args.max_seconds, max_memory=max_memory)
+            specs = [spec for _, spec, _ in planner.schedule(specs)]
+        ids = WorkQueue(args.queue).add_jobs(specs)
+        print('%d jobs in the queue' % len(set(ids)))
+    elif args.command == 'work':
+        result = run_workers(args.queue, processes=args.processes, lease=args.lease,
+                             max_attempts=args.max_attempts)
+        print(json.dumps(result, indent=1))
+    else:
+        print(json.dumps(WorkQueue(args.queue).get_report(), indent=1))
+
+if __name__ == '__main__':
+    main()
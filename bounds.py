@@ -0,0 +1,139 @@
+import os
+from base_visualization import BaseVisualization
+from catalog import FrontCatalog
+
+class BoundsContext():
+    def __init__(self, files, max_workers=None, chunk_size=100000):
+        """
+        Initialize the BoundsContext class.
+
+        The context computes the min and max value of each objective over a set of files,
+        so every chart of the set (e.g. the frames of an animation or a sweep of scale
+        factors) uses the same axes. The bounds of each file are kept in the catalog of its
+        directory: a file is read once, in chunks and in parallel with the other files, and
+        only read again when its content changes.
+
+        Parameters:
+        - files: List of the paths of the files.
+        - max_workers: Specifies the number of processes that read the files (default: the
+          number of CPUs, 1 to read them in this process).
+        - chunk_size: Specifies the number of rows read at a time.
+        """
+        self.files = list(files)
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.min_bounds = None
+        self.max_bounds = None
+        self.min_values = None
+        self.max_values = None
+        self.rows = None
+        self.catalogs = None
+
+    def get_catalogs(self, refresh=False):
+        """
+        Get the catalogs of the directories of the files, updated the first time, reading
+        only the files that are new or changed.
+
+        Parameters:
+        - refresh: Specifies whether the catalogs are updated again, for files that changed
+          since they were first updated.
+
+        Returns:
+        - List with the catalog and the names of the files of each directory.
+        """
+        if self.catalogs is not None and not refresh:
+            return self.catalogs
+
+        if not self.files:
+            raise Exception("The bounds need at least one file")
+
+        # Groups the files by directory, as each directory has its own catalog
+        directories = {}
+        for path in self.files:
+            directory, name = os.path.split(os.path.abspath(path))
+            directories.setdefault(directory, []).append(name)
+
+        catalogs = []
+        for directory, names in directories.items():
+            catalog = FrontCatalog(directory, chunk_size=self.chunk_size)
+            catalog.update(names, max_workers=self.max_workers)
+            catalogs.append((catalog, names))
+
+        self.catalogs = catalogs
+        return catalogs
+
+    def get_dims(self):
+        """
+        Get the numbers of objectives of the files.
+
+        Returns:
+        - Set with the number of objectives of each file, a single one when the files can
+          share their bounds.
+        """
+        return {catalog.get_entry(name)['dim'] for catalog, names in self.get_catalogs() for name in names}
+
+    def compute(self, refresh=False):
+        """
+        Compute the bounds of the files, reading only the files that are new or changed.
+
+        Parameters:
+        - refresh: Specifies whether the catalogs are updated again (see get_catalogs).
+
+        Returns:
+        - min_values: List with the rounded min value of each objective, as a chart computes it.
+        - max_values: List with the rounded max value of each objective.
+        """
+        min_bounds = None
+        max_bounds = None
+        rows = 0
+
+        for catalog, names in self.get_catalogs(refresh):
+            low, high = catalog.get_bounds(names)
+            rows += sum(catalog.get_entry(name)['rows'] for name in names)
+
+            if min_bounds is None:
+                min_bounds, max_bounds = low, high
+                continue
+            if len(low) != len(min_bounds):
+                raise Exception("The files must have the same number of objectives")
+            min_bounds = [min(a, b) for a, b in zip(min_bounds, low)]
+            max_bounds = [max(a, b) for a, b in zip(max_bounds, high)]
+
+        self.min_bounds = min_bounds
+        self.max_bounds = max_bounds
+        self.rows = rows
+
+        # Rounds the bounds as the charts round the bounds of a single front
+        self.min_values = [BaseVisualization.round_value(value, 'min') for value in min_bounds]
+        self.max_values = [BaseVisualization.round_value(value, 'max') for value in max_bounds]
+
+        return self.min_values, self.max_values
+
+    def get_bounds(self):
+        """
+        Get the rounded bounds of the files, computed the first time.
+        """
+        if self.min_values is None:
+            self.compute()
+        return self.min_values, self.max_values
+
+    def apply(self, chart):
+        """
+        Set the bounds of the files as the min and max values of a chart.
+
+        Parameters:
+        - chart: The chart object.
+
+        Returns:
+        - chart: The same chart.
+        """
+        self.get_bounds()
+        chart.set_bounds(self)
+        return chart
+
+    def __enter__(self):
+        self.get_bounds()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
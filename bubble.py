@@ -41,6 +41,12 @@ class BubbleChart(BaseVisualization):
         self.color = color
         self.cmap = cmap
 
+        # Only the first five objectives are drawn (x, y, z, color and size)
+        self.columns = [0, 1, 2, 3, 4]
+
+        # Initializes the views for the resulting images
+        self.views = [[30, 45], [45, -45],  [45, 135], [30, 30], [30, 60]]
+
     def set_values(self):
         """
         Set default values for visualization attributes if not provided.
@@ -52,7 +58,7 @@ class BubbleChart(BaseVisualization):
                 self.color = 'darkblue'
         
         if self.cmap is None:
-            self.cmap = plt.get_cmap('gist_rainbow_r')
+            self.cmap = mpl.colormaps['gist_rainbow_r']
 
         if self.dim > 4:
             self.scatter_size = self.data[4] * 1000
@@ -87,6 +93,13 @@ class BubbleChart(BaseVisualization):
         """
         return self.cmap
 
+    def get_output_files(self):
+        """
+        Get the list of the files written by the chart, one for each view.
+        """
+        return [self.output_file[:-4] + '_' + str(idx) + self.output_file[-4:]
+                for idx in range(1, len(self.views) + 1)]
+
     def plot(self): 
         """
         Plot a bubble chart based on the specified parameters.
@@ -110,6 +123,10 @@ class BubbleChart(BaseVisualization):
         # Set the figure size of the figure based on the min and max values
         self.input_values = self.min_values + self.max_values
         self.set_figure_size()
+
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
         
         # Obtains the list of ticks based on the min and max values
         xticks = self.calculate_tick_locations(
@@ -119,12 +136,11 @@ class BubbleChart(BaseVisualization):
         zticks = self.calculate_tick_locations(
             self.min_values[2], self.max_values[2])
         
-        # Creates the figure
-        fig = plt.figure(figsize=(10, 10))
+        # Creates the figure with the size based on the min and max values
+        fig = self.create_figure(figsize=self.figure_size)
 
-        # Adjusts the subplot to 3d and the figure size
+        # Adjusts the subplot to 3d
         ax = fig.add_subplot(projection="3d")
-        ax.get_figure().set_size_inches(self.figure_size)
 
         # Obtains the labels for the ticks
         x_labels = [str(val) for val in xticks]
@@ -137,9 +153,9 @@ class BubbleChart(BaseVisualization):
         
         # If the dimension is greater than 3, it adds the colorbar
         if self.dim > 3:
-            colorbar = plt.colorbar(scatter, location='right',
+            colorbar = fig.colorbar(scatter, ax=ax, location='right',
                                     pad=0.05)
-            plt.subplots_adjust(right=0.9)
+            fig.subplots_adjust(right=0.9)
             colorbar.ax.set_position([0.87, 0.2, 0.03, 0.6])
             colorticks = np.linspace(self.color.min(), self.color.max(), 10)
             colorlabels = [f"{x:.2f}" for x in colorticks]
@@ -150,8 +166,8 @@ class BubbleChart(BaseVisualization):
                                fontsize=self.label_size)
         
         # Plots the ticks and labels in the 3 dimensions
-        plt.xticks(xticks, labels=x_labels)
-        plt.yticks(yticks, labels=y_labels)
+        ax.set_xticks(xticks, labels=x_labels)
+        ax.set_yticks(yticks, labels=y_labels)
         ax.set_zticks(zticks, minor=False)
         ax.set_zticklabels(z_labels)
 
@@ -179,7 +195,7 @@ class BubbleChart(BaseVisualization):
                 zorder=0)
         
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                     fontweight='bold',
                     family='monospace',
@@ -192,26 +208,18 @@ class BubbleChart(BaseVisualization):
 
         
         # Sets the label for the axes
-        plt.xlabel("$f_1$", fontsize=self.label_size, labelpad=self.label_pad)
-        plt.ylabel("$f_2$", fontsize=self.label_size, labelpad=self.label_pad)
+        ax.set_xlabel("$f_1$", fontsize=self.label_size, labelpad=self.label_pad)
+        ax.set_ylabel("$f_2$", fontsize=self.label_size, labelpad=self.label_pad)
         ax.set_zlabel("$f_3$", fontsize=self.label_size,
                       rotation=0, labelpad=self.label_pad)
 
         # Disables automatic rotation of labels
         ax.zaxis.set_rotate_label(False) 
 
-        # Initializes the views for the resulting images
-        views = [[30, 45], [45, -45],  [45, 135], [30, 30], [30, 60]]
-
         # For each view, it rotates the view and saves the images
-        idx = 0
-        for v in views:
-            idx += 1
+        for v, formatted_path in zip(self.views, self.get_output_files()):
             ax.view_init(v[0], v[1])
-            formatted_path = self.output_file[:-4] + \
-                '_' + str(idx) + self.output_file[-4:]
-
-            plt.savefig(formatted_path)
+            self.save_figure(fig, formatted_path)
 
-        # Closes the image
-        plt.close()
+        # Adds the images to the cache
+        self.store_cached()
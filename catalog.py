@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from front_reader import READERS, get_reader, split_extension
+
+class FrontCatalog():
+    def __init__(self, directory, index_file=None, chunk_size=100000):
+        """
+        Initialize the FrontCatalog class.
+
+        The catalog keeps, for each .pof file of a directory, the header values, the file size,
+        the modification time, a content hash and the min and max value of each objective, so
+        the files do not have to be parsed again to plan the charts.
+
+        Parameters:
+        - directory: Specifies the directory with the .pof files.
+        - index_file: Specifies the JSON file where the catalog is stored (default: .catalog.json
+          inside the directory).
+        - chunk_size: Specifies the number of rows read at a time when computing the bounds.
+        """
+        self.directory = directory
+        self.index_file = index_file
+        self.chunk_size = chunk_size
+        self.entries = {}
+
+        if self.index_file is None:
+            self.index_file = os.path.join(self.directory, '.catalog.json')
+
+    def load(self):
+        """
+        Load the catalog from the index file, if it exists.
+        """
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as file:
+                self.entries = json.load(file)
+        return self.entries
+
+    def save(self):
+        """
+        Save the catalog on the index file.
+
+        The file is written on a temporary file first and then renamed, so a reader never
+        sees a partial index.
+        """
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w') as file:
+            json.dump(self.entries, file, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.index_file)
+
+    def list_files(self):
+        """
+        Get the names of the files of the directory with a supported extension.
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if split_extension(name)[0] in READERS
+                      and os.path.isfile(os.path.join(self.directory, name)))
+
+    def get_hash(self, path):
+        """
+        Compute the content hash of a file.
+
+        Parameters:
+        - path: The path of the file.
+
+        Returns:
+        - The hexadecimal sha256 of the content of the file.
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read_entry(self, path):
+        """
+        Read the header and the bounds of a file.
+
+        Parameters:
+        - path: The path of the file.
+
+        Returns:
+        - entry: Dictionary with the rows, dim, min and max values of the file.
+        """
+        reader = get_reader(path, chunk_size=self.chunk_size)
+        rows, dim = reader.read_header()
+        summary = reader.get_summary()
+
+        return {'rows': rows,
+                'dim': dim,
+                'columns': summary.shape[1],
+                'min': [float(value) for value in summary.loc['min']],
+                'max': [float(value) for value in summary.loc['max']]}
+
+    def check_entry(self, name, entry):
+        """
+        Get the entry of a file whose size or modification time changed.
+
+        The values are kept if only the modification time changed, otherwise the file is
+        parsed again.
+
+        Parameters:
+        - name: The name of the file inside the directory.
+        - entry: The previous entry of the file, or None.
+
+        Returns:
+        - entry: The new entry of the file.
+        - parsed: True if the file was parsed.
+        """
+        path = os.path.join(self.directory, name)
+        stat = os.stat(path)
+        content_hash = self.get_hash(path)
+
+        parsed = entry is None or entry['hash'] != content_hash
+        entry = self.read_entry(path) if parsed else dict(entry)
+        entry.update({'size': stat.st_size, 'mtime': stat.st_mtime, 'hash': content_hash})
+        return entry, parsed
+
+    def refresh(self, max_workers=None):
+        """
+        Scan the directory and update the catalog.
+
+        Only the files whose size or modification time changed are hashed, and only the
+        files whose content hash changed are parsed again. Removed files are dropped.
+
+        Parameters:
+        - max_workers: Maximum number of processes that read the files (see update).
+
+        Returns:
+        - updated: List of the names of the files that were parsed.
+        """
+        return self.update(self.list_files(), max_workers=max_workers, drop_others=True)
+
+    def update(self, names, max_workers=None, drop_others=False):
+        """
+        Update the entries of some files of the directory.
+
+        Only the files whose size or modification time changed are hashed, and only the
+        files whose content hash changed are parsed again. When several files changed they
+        are read in a pool of processes, each file in a single pass.
+
+        Parameters:
+        - names: The names of the files inside the directory.
+        - max_workers: Maximum number of processes (default: the number of CPUs, 1 to read
+          the files in this process).
+        - drop_others: Specifies whether the entries of the other files are dropped.
+
+        Returns:
+        - updated: List of the names of the files that were parsed.
+        """
+        self.load()
+        entries = {} if drop_others else dict(self.entries)
+        changed = []
+
+        for name in names:
+            stat = os.stat(os.path.join(self.directory, name))
+            entry = self.entries.get(name)
+
+            # Keeps the entry if the file was not touched
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                entries[name] = entry
+            else:
+                changed.append(name)
+
+        previous = [self.entries.get(name) for name in changed]
+        if len(changed) > 1 and max_workers != 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(check_catalog_entry, [self.directory] * len(changed),
+                                            [self.chunk_size] * len(changed), changed, previous))
+        else:
+            results = [self.check_entry(name, entry) for name, entry in zip(changed, previous)]
+
+        updated = []
+        for name, (entry, parsed) in zip(changed, results):
+            entries[name] = entry
+            if parsed:
+                updated.append(name)
+
+        if entries != self.entries:
+            self.entries = entries
+            self.save()
+
+        return updated
+
+    def get_entry(self, name):
+        """
+        Get the entry of a file.
+
+        Parameters:
+        - name: The name of the file inside the directory.
+        """
+        return self.entries[os.path.basename(name)]
+
+    def get_path(self, name):
+        """
+        Get the path of a file of the catalog.
+
+        Parameters:
+        - name: The name of the file inside the directory.
+        """
+        return os.path.join(self.directory, name)
+
+    def find(self, dim=None, prefix=None):
+        """
+        Get the names of the files that match the given filters.
+
+        Parameters:
+        - dim: Number of objectives of the files.
+        - prefix: Start of the names of the files (e.g. 'INV_SLD_05D').
+        """
+        return [name for name, entry in sorted(self.entries.items())
+                if (dim is None or entry['dim'] == dim) and (prefix is None or name.startswith(prefix))]
+
+    def get_bounds(self, names):
+        """
+        Get the min and max value of each objective over a set of files.
+
+        Parameters:
+        - names: The names of the files.
+
+        Returns:
+        - min_values: List with the min value of each objective.
+        - max_values: List with the max value of each objective.
+        """
+        min_values = None
+        max_values = None
+
+        for name in names:
+            entry = self.get_entry(name)
+            if min_values is None:
+                min_values = list(entry['min'])
+                max_values = list(entry['max'])
+                continue
+            if len(entry['min']) != len(min_values):
+                raise Exception("The files must have the same number of objectives")
+            min_values = [min(a, b) for a, b in zip(min_values, entry['min'])]
+            max_values = [max(a, b) for a, b in zip(max_values, entry['max'])]
+
+        return min_values, max_values
+
+    def get_chart_types(self, name):
+        """
+        Get the chart types suitable for a file based on its number of objectives.
+
+        Parameters:
+        - name: The name of the file inside the directory.
+        """
+        return get_chart_types(self.get_entry(name)['dim'])
+
+def get_chart_types(dim):
+    """
+    Get the chart types suitable for a number of objectives.
+
+    Parameters:
+    - dim: The number of objectives.
+    """
+    if dim == 2:
+        return ['plot2d']
+    if dim == 3:
+        return ['plot3d']
+    return ['parallel', 'bubble', 'radar', 'heatmap']
+
+def check_catalog_entry(directory, chunk_size, name, entry):
+    """
+    Get the entry of a file of a catalog, in a process of the pool of FrontCatalog.update.
+
+    Parameters:
+    - directory: The directory of the catalog.
+    - chunk_size: The number of rows read at a time.
+    - name: The name of the file inside the directory.
+    - entry: The previous entry of the file, or None.
+    """
+    return FrontCatalog(directory, chunk_size=chunk_size).check_entry(name, entry)
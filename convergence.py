@@ -42,6 +42,10 @@ class ConvergenceDiagram(BaseVisualization):
         self.x_values = None
         self.y_values = None
 
+        # To manage large sizes of files
+        self.rc_params = {'agg.path.chunksize': 1000,
+                          'path.simplify_threshold': 1.0}
+
     def set_values(self):
         """
         Set default values for visualization attributes if not provided.
@@ -98,6 +102,10 @@ class ConvergenceDiagram(BaseVisualization):
         self.input_values = self.min_values + self.max_values
         self.set_figure_size()
 
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
         # Obtains the list of ticks based on the min and max values
         xticks = self.calculate_tick_locations(
             self.min_values[0], self.max_values[0])
@@ -105,21 +113,20 @@ class ConvergenceDiagram(BaseVisualization):
         yticks = self.calculate_tick_locations(
             self.min_values[1], self.max_values[1])
 
-        fig, ax = plt.subplots()
-        
-        # Sets the size of the figure
-        ax.get_figure().set_size_inches(self.figure_size)
+        # Creates the figure with the size based on the min and max values
+        fig = self.create_figure(figsize=self.figure_size)
+        ax = fig.add_subplot()
         
         # Sets the padding and size for the ticks in both axes
         ax.tick_params(axis='both', which='major',
                        labelsize=self.ticks_size, pad=self.ticks_pad)
 
         # Plots the ticks in the 2 dimensions
-        plt.xticks(xticks)
-        plt.yticks(yticks)
+        ax.set_xticks(xticks)
+        ax.set_yticks(yticks)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                      fontweight='bold',
                      family='monospace',
@@ -136,31 +143,27 @@ class ConvergenceDiagram(BaseVisualization):
                     style='italic')
 
         # Sets the label for the axes
-        plt.xlabel("$t$", fontsize=self.label_size, labelpad=self.label_pad)
-        plt.ylabel("$Value$", fontsize=self.label_size,
-                   labelpad=self.label_pad)
+        ax.set_xlabel("$t$", fontsize=self.label_size, labelpad=self.label_pad)
+        ax.set_ylabel("$Value$", fontsize=self.label_size,
+                      labelpad=self.label_pad)
         
         # Sets the font size of the ticks 
-        plt.xticks(fontsize=self.ticks_size)
-        plt.yticks(fontsize=self.ticks_size)
+        ax.tick_params(axis='x', labelsize=self.ticks_size)
+        ax.tick_params(axis='y', labelsize=self.ticks_size)
 
         # Sets the sytle and width of the major grid line
-        plt.grid(linestyle='--', linewidth=self.major_grid_line_width)
+        ax.grid(linestyle='--', linewidth=self.major_grid_line_width)
 
         # Sets the logarithmic visualization if indicated
         if self.logarithmic:
-            plt.yscale('log')
+            ax.set_yscale('log')
 
         # Plots the chart, sets the color and adds the marker
-        plt.plot(self.x_values, self.data[0],
-                 color='darkred', linewidth=self.line_width, marker='.', markersize=150)
-        
-        # To manage large sizes of files
-        plt.rcParams['agg.path.chunksize'] = 1000
-        plt.rcParams['path.simplify_threshold'] = 1.0
+        ax.plot(self.x_values, self.data[0],
+                color='darkred', linewidth=self.line_width, marker='.', markersize=150)
 
-        # Saves the image on a file
-        plt.savefig(self.output_file)
-        
-        # Closes the image
-        plt.close()
+        # Saves the image on a file (with the rc_params for large sizes of files)
+        self.save_figure(fig)
+
+        # Adds the image to the cache
+        self.store_cached()
@@ -0,0 +1,346 @@
+import io
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+import numpy as np
+from PIL import Image, GifImagePlugin
+
+def to_image(frame):
+    """
+    Get a frame as an RGB image of PIL.
+
+    Parameters:
+    - frame: A PIL image or an array of shape (height, width, 3 or 4).
+    """
+    if isinstance(frame, Image.Image):
+        return frame.convert('RGB')
+    return Image.fromarray(np.asarray(frame, dtype=np.uint8)[:, :, :3], 'RGB')
+
+class FrameEncoder(ABC):
+    def __init__(self, output_file, interval=500, loop=0, palette_frames=8):
+        """
+        Initialize the FrameEncoder class.
+
+        The encoder writes an animation whose frames share most of their pixels, such as
+        charts with the same axes, grids and titles, a frame at a time:
+        - All the frames use one palette of 255 colors, computed from the first
+          palette_frames frames, and the last index is kept for the transparent pixels.
+        - Only the rectangle that changed since the previous frame is stored, with the
+          pixels that did not change inside it made transparent, which compress better.
+        - A frame equal to the previous one is dropped and the previous one is shown longer.
+        The file is written on a temporary file first and then renamed when the encoder is
+        closed.
+
+        Parameters:
+        - output_file: Specifies the file of the animation.
+        - interval: Specifies the milliseconds between two frames.
+        - loop: Specifies the number of times the animation is repeated (0: forever).
+        - palette_frames: Specifies the number of frames used to compute the palette. They
+          are held in memory until the palette is computed.
+        """
+        self.output_file = output_file
+        self.interval = interval
+        self.loop = loop
+        self.palette_frames = palette_frames
+        self.tmp_file = output_file + '.tmp'
+        self.file = None
+        self.size = None
+        self.palette = None
+        self.color_table = None
+        self.buffered = []
+        self.canvas = None
+        self.pending = None
+        self.frames = 0
+        self.written = 0
+        self.dropped = 0
+
+    def append(self, frame):
+        """
+        Add a frame to the animation.
+
+        Parameters:
+        - frame: A PIL image or an array of shape (height, width, 3 or 4). Frames of another
+          size than the first one are resized.
+        """
+        image = to_image(frame)
+        if self.size is None:
+            self.size = image.size
+        elif image.size != self.size:
+            image = image.resize(self.size, Image.LANCZOS)
+        self.frames += 1
+
+        if self.palette is None:
+            self.buffered.append(image)
+            if len(self.buffered) >= self.palette_frames:
+                self.flush_buffered()
+            return
+
+        self.add_indices(self.get_indices(image))
+
+    def flush_buffered(self):
+        """
+        Compute the palette from the buffered frames and encode them.
+        """
+        self.set_palette(self.buffered)
+        buffered, self.buffered = self.buffered, []
+        for image in buffered:
+            self.add_indices(self.get_indices(image))
+
+    def set_palette(self, images):
+        """
+        Compute the palette of 255 colors of some frames, with the transparent index 255.
+
+        Parameters:
+        - images: List of the RGB frames.
+        """
+        # Quantizes the frames at once, stacked in a single image
+        width, height = images[0].size
+        mosaic = Image.new('RGB', (width, height * len(images)))
+        for idx, image in enumerate(images):
+            mosaic.paste(image, (0, height * idx))
+        colors = mosaic.quantize(255).getpalette()[:255 * 3]
+
+        # The transparent index repeats the first color, so no pixel is mapped to it
+        colors = colors + [0] * (255 * 3 - len(colors))
+        self.palette = bytes(colors + colors[:3])
+
+        self.file = open(self.tmp_file, 'wb')
+        self.write_header()
+
+    def get_indices(self, image):
+        """
+        Map the pixels of a frame to the nearest colors of the palette, without dithering so
+        the pixels that did not change keep their index. The index of each color is kept in a
+        table of all the RGB colors, where 255 marks the colors not seen yet, as the frames of
+        charts share most of their colors.
+
+        Returns:
+        - indices: Array of shape (height, width) with the index of each pixel.
+        """
+        if self.color_table is None:
+            self.color_table = np.full(2 ** 24, 255, dtype=np.uint8)
+
+        pixels = np.asarray(image, dtype=np.uint32)
+        keys = (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+        indices = self.color_table[keys]
+
+        # Finds the nearest color of the palette of the colors not seen in the previous frames
+        unknown = indices == 255
+        if unknown.any():
+            new_keys = np.unique(keys[unknown])
+            rgb = np.stack([new_keys >> 16, (new_keys >> 8) & 255, new_keys & 255], axis=1).astype(np.int32)
+            palette = np.frombuffer(self.palette, dtype=np.uint8)[:255 * 3].reshape(-1, 3).astype(np.int32)
+            for start in range(0, len(rgb), 4096):
+                distances = ((rgb[start:start + 4096, None, :] - palette) ** 2).sum(axis=2)
+                self.color_table[new_keys[start:start + 4096]] = distances.argmin(axis=1)
+            indices = self.color_table[keys]
+
+        return indices
+
+    def add_indices(self, indices):
+        """
+        Add a frame mapped to the palette, storing only what changed since the previous one.
+
+        Parameters:
+        - indices: Array of shape (height, width) with the index of each pixel.
+        """
+        if self.canvas is None:
+            self.canvas = indices
+            self.pending = [indices, (0, 0), self.interval, True]
+            return
+
+        changed = indices != self.canvas
+        if not changed.any():
+            # Shows the previous frame longer instead of storing the same frame again
+            self.pending[2] += self.interval
+            self.dropped += 1
+            return
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        top, bottom = rows[0], rows[-1] + 1
+        left, right = columns[0], columns[-1] + 1
+
+        # The pixels that did not change inside the rectangle show the previous frame
+        rect = indices[top:bottom, left:right].copy()
+        rect[~changed[top:bottom, left:right]] = 255
+
+        self.write_pending()
+        self.canvas = indices
+        self.pending = [rect, (int(left), int(top)), self.interval, False]
+
+    def write_pending(self):
+        """
+        Write the last frame added, once its duration is known.
+        """
+        if self.pending is not None:
+            rect, offset, duration, first = self.pending
+            self.write_frame(rect, offset, duration, first)
+            self.written += 1
+            self.pending = None
+
+    @abstractmethod
+    def write_header(self):
+        """
+        Write the header of the file, with the size and the palette of the frames.
+        """
+        pass
+
+    @abstractmethod
+    def write_frame(self, rect, offset, duration, first):
+        """
+        Write a frame.
+
+        Parameters:
+        - rect: Array with the indices of the rectangle of the frame that changed.
+        - offset: The (left, top) position of the rectangle.
+        - duration: The milliseconds the frame is shown.
+        - first: Specifies whether it is the first frame, stored whole and without transparency.
+        """
+        pass
+
+    @abstractmethod
+    def write_trailer(self):
+        """
+        Write the end of the file.
+        """
+        pass
+
+    def get_image(self, rect):
+        """
+        Get the PIL image of a rectangle of indices, with the palette of the animation.
+        """
+        image = Image.fromarray(rect, 'P')
+        image.putpalette(self.palette)
+        return image
+
+    def close(self):
+        """
+        Write the last frames, finish the file and rename it to the output_file.
+        """
+        if self.buffered:
+            self.flush_buffered()
+        if self.file is None:
+            return
+
+        self.write_pending()
+        self.write_trailer()
+        self.file.close()
+        self.file = None
+        os.replace(self.tmp_file, self.output_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self.file is not None:
+            self.file.close()
+            self.file = None
+            os.remove(self.tmp_file)
+
+class GifEncoder(FrameEncoder):
+    def write_header(self):
+        # Global color table of 256 colors, followed by the loop extension
+        self.file.write(b'GIF89a' + struct.pack('<HHBBB', self.size[0], self.size[1], 0xF7, 0, 0))
+        self.file.write(self.palette)
+        self.file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\0')
+
+    def write_frame(self, rect, offset, duration, first):
+        params = {'duration': min(duration, 655350), 'disposal': 1}
+        if not first:
+            params['transparency'] = 255
+        for data in GifImagePlugin.getdata(self.get_image(rect), offset, **params):
+            self.file.write(data)
+
+    def write_trailer(self):
+        self.file.write(b';')
+
+class ApngEncoder(FrameEncoder):
+    def __init__(self, output_file, interval=500, loop=0, palette_frames=8):
+        """
+        Initialize the ApngEncoder class, which writes an animated PNG with the frames of
+        FrameEncoder. The number of frames is written in the header when the file is closed.
+        """
+        super().__init__(output_file, interval=interval, loop=loop, palette_frames=palette_frames)
+        self.sequence = 0
+        self.actl_offset = None
+
+    def write_chunk(self, chunk_type, data):
+        """
+        Write a chunk of the PNG file.
+        """
+        self.file.write(struct.pack('>I', len(data)) + chunk_type + data)
+        self.file.write(struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+    def write_header(self):
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', self.size[0], self.size[1], 8, 3, 0, 0, 0))
+        self.actl_offset = self.file.tell()
+        self.write_chunk(b'acTL', struct.pack('>II', 0, self.loop))
+        self.write_chunk(b'PLTE', self.palette)
+        self.write_chunk(b'tRNS', b'\xff' * 255 + b'\0')
+
+    def get_data(self, rect):
+        """
+        Get the compressed rows of a rectangle, from the IDAT chunks of the PNG of PIL.
+        """
+        buffer = io.BytesIO()
+        self.get_image(rect).save(buffer, format='PNG')
+        png = buffer.getvalue()
+
+        data = []
+        position = 8
+        while position < len(png):
+            length, chunk_type = struct.unpack('>I4s', png[position:position + 8])
+            if chunk_type == b'IDAT':
+                data.append(png[position + 8:position + 8 + length])
+            position += 12 + length
+        return b''.join(data)
+
+    def write_frame(self, rect, offset, duration, first):
+        height, width = rect.shape
+        blend = 0 if first else 1
+        self.write_chunk(b'fcTL', struct.pack('>IIIIIHHBB', self.sequence, width, height, offset[0], offset[1],
+                                              min(duration, 65535), 1000, 0, blend))
+        self.sequence += 1
+
+        data = self.get_data(rect)
+        if first:
+            self.write_chunk(b'IDAT', data)
+        else:
+            self.write_chunk(b'fdAT', struct.pack('>I', self.sequence) + data)
+            self.sequence += 1
+
+    def write_trailer(self):
+        self.write_chunk(b'IEND', b'')
+
+        # Writes the number of frames, known now, in the header
+        end = self.file.tell()
+        self.file.seek(self.actl_offset)
+        self.write_chunk(b'acTL', struct.pack('>II', self.written, self.loop))
+        self.file.seek(end)
+
+# Encoders of each animation format, picked by the extension of the file
+ENCODERS = {
+    '.gif': GifEncoder,
+    '.png': ApngEncoder,
+    '.apng': ApngEncoder,
+}
+
+def open_encoder(output_file, interval=500, loop=0, palette_frames=8):
+    """
+    Get the encoder of an animation, GIF or animated PNG by the extension of the file.
+
+    Parameters:
+    - output_file: Specifies the file of the animation.
+    - interval: Specifies the milliseconds between two frames.
+    - loop: Specifies the number of times the animation is repeated (0: forever).
+    - palette_frames: Specifies the number of frames used to compute the palette.
+    """
+    ext = os.path.splitext(output_file)[1].lower()
+    if ext not in ENCODERS:
+        raise Exception("Unsupported animation format: %s" % output_file)
+    return ENCODERS[ext](output_file, interval=interval, loop=loop, palette_frames=palette_frames)
@@ -0,0 +1,406 @@
+import argparse
+import math
+import os
+import numpy as np
+from front_reader import COMPRESSIONS, split_extension
+
+# Problems of each family: the points of the simplex, a line of the front or random parameters
+SIMPLEX_PROBLEMS = ['SLD', 'INV_SLD', 'DTLZ1', 'DTLZ2']
+LINE_PROBLEMS = ['DTLZ5', 'WFG3']
+RANDOM_PROBLEMS = ['DTLZ7', 'WFG1', 'WFG2']
+PROBLEMS = SIMPLEX_PROBLEMS + LINE_PROBLEMS + RANDOM_PROBLEMS
+
+def get_lattice_size(h, dim):
+    """
+    Get the number of points of the simplex lattice with h divisions in dim objectives.
+    """
+    return math.comb(h + dim - 1, dim - 1)
+
+def get_lattice_divisions(rows, dim):
+    """
+    Get the largest number of divisions of a simplex lattice with at most rows points.
+
+    Parameters:
+    - rows: The maximum number of points, at least dim.
+    - dim: The number of objectives.
+    """
+    if dim == 2:
+        return rows - 1
+
+    high = 1
+    while get_lattice_size(high * 2, dim) <= rows:
+        high *= 2
+
+    # Binary search between high (fits) and 2 * high (does not fit)
+    low, high = high, high * 2
+    while high - low > 1:
+        middle = (low + high) // 2
+        if get_lattice_size(middle, dim) <= rows:
+            low = middle
+        else:
+            high = middle
+    return low
+
+def get_lattice_points(ranks, h, dim):
+    """
+    Get the points of a simplex lattice from their positions in the lattice.
+
+    Each point is a composition of h in dim parts, which is unranked from the combination
+    of the dim - 1 separators among h + dim - 1 places, so any range of the lattice is built
+    at once without building the points before it.
+
+    Parameters:
+    - ranks: Array with the positions of the points, below get_lattice_size(h, dim).
+    - h: The number of divisions of the lattice.
+    - dim: The number of objectives.
+
+    Returns:
+    - points: Array with a row per point whose values add up to 1.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    places = h + dim - 1
+    separators = dim - 1
+
+    if separators == 1:
+        positions = ranks[:, None]
+    else:
+        # Binomial coefficients C(c, j) of each place c and number of separators j
+        limit = np.iinfo(np.int64).max
+        table = np.array([[min(math.comb(c, j), limit) for j in range(separators + 1)]
+                          for c in range(places)], dtype=np.int64)
+
+        positions = np.empty((len(ranks), separators), dtype=np.int64)
+        remaining = ranks.copy()
+        for j in range(separators, 0, -1):
+            # The largest place c with C(c, j) <= rank, in colexicographic order
+            place = np.searchsorted(table[:, j], remaining, side='right') - 1
+            positions[:, j - 1] = place
+            remaining -= table[place, j]
+
+    bounds = np.empty((len(ranks), dim + 1), dtype=np.int64)
+    bounds[:, 0] = -1
+    bounds[:, 1:dim] = positions
+    bounds[:, dim] = places
+    return (np.diff(bounds, axis=1) - 1) / h
+
+def get_record_intervals(function, lower=True, resolution=2 ** 20):
+    """
+    Get the intervals of [0, 1] where a function is better than everywhere before them.
+
+    A parameter inside them is not dominated by a smaller parameter, which gives the
+    disconnected regions of the fronts of DTLZ7 and WFG2.
+
+    Parameters:
+    - function: Vectorized function of the parameter.
+    - lower: Specifies whether lower values of the function are better.
+    - resolution: Specifies the number of steps of the grid where the function is evaluated.
+
+    Returns:
+    - starts, ends: Arrays with the bounds of the intervals.
+    """
+    x = np.linspace(0, 1, resolution + 1)
+    values = function(x)
+    best = np.minimum.accumulate(values) if lower else np.maximum.accumulate(values)
+
+    edges = np.diff(np.concatenate([[0], (values == best).astype(np.int8), [0]]))
+    starts = x[np.flatnonzero(edges == 1)]
+    ends = x[np.flatnonzero(edges == -1) - 1]
+
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+def sample_intervals(u, starts, ends):
+    """
+    Map uniform values of [0, 1) to uniform values inside some intervals.
+
+    Parameters:
+    - u: Array with the uniform values.
+    - starts, ends: Arrays with the bounds of the intervals.
+    """
+    lengths = ends - starts
+    cumulative = np.cumsum(lengths)
+    position = u * cumulative[-1]
+    interval = np.minimum(np.searchsorted(cumulative, position, side='right'), len(lengths) - 1)
+    return starts[interval] + position - (cumulative[interval] - lengths[interval])
+
+def get_shape(first, last):
+    """
+    Compute the shape functions shared by DTLZ and WFG from the terms of their parameters.
+
+    The objective m (1 ... M) is the product of the first terms of the parameters
+    1 ... M - m, times the last term of the parameter M - m + 1 (none for m = 1).
+
+    Parameters:
+    - first: Array with the first term of each of the M - 1 parameters.
+    - last: Array with the last term of each of the M - 1 parameters.
+
+    Returns:
+    - values: Array with the M objectives.
+    """
+    rows, params = first.shape
+    products = np.ones((rows, params + 1))
+    products[:, 1:] = np.cumprod(first, axis=1)
+
+    values = np.empty((rows, params + 1))
+    values[:, 0] = products[:, params]
+    values[:, 1:] = (products[:, :params] * last)[:, ::-1]
+    return values
+
+def dtlz7_term(x):
+    return x * (1 + np.sin(3 * np.pi * x))
+
+def wfg2_disc(x):
+    return 1 - x * np.cos(5 * np.pi * x) ** 2
+
+class FrontGenerator():
+    def __init__(self, problem, rows, dim, scale_factor=None, seed=0, chunk_size=100000):
+        """
+        Initialize the FrontGenerator class.
+
+        The generator computes the Pareto front of a problem with any number of points and
+        objectives, a block of rows at a time, so fronts larger than the memory can be
+        written to a file.
+        - SLD, INV_SLD, DTLZ1 and DTLZ2 map the points of a simplex lattice: the lattice with
+          the most divisions that fits in the rows, then lattices shrunk by half towards the
+          center with the rows left (as the fronts of the data folder), and the last few rows
+          at random.
+        - DTLZ5 and WFG3 have a degenerate front, a line sampled at regular steps.
+        - DTLZ7, WFG1 and WFG2 map random parameters, drawn inside the non dominated regions
+          of the disconnected fronts.
+
+        Parameters:
+        - problem: Specifies the problem, one of PROBLEMS.
+        - rows: Specifies the number of points.
+        - dim: Specifies the number of objectives.
+        - scale_factor: Specifies the scale factor of the SLD and INV_SLD fronts, which shrinks
+          them towards the center of the simplex (the _sf_ files of the data folder).
+        - seed: Specifies the seed of the random values.
+        - chunk_size: Specifies the number of rows generated at a time.
+        """
+        if problem not in PROBLEMS:
+            raise Exception("Unsupported problem: %s" % problem)
+        if dim < 2:
+            raise Exception("The front needs at least 2 objectives")
+        if scale_factor is not None and problem not in ('SLD', 'INV_SLD'):
+            raise Exception("The scale factor only applies to SLD and INV_SLD")
+
+        self.problem = problem
+        self.rows = rows
+        self.dim = dim
+        self.scale_factor = scale_factor
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.layers = None
+        self.intervals = None
+
+    def get_layers(self):
+        """
+        Get the layers of the simplex lattice.
+
+        Returns:
+        - layers: List with the (start, size, divisions, shrink) of each layer, and the
+          (start, size, None, shrink) of the random points after them, if any.
+        """
+        if self.layers is None:
+            self.layers = []
+            start = 0
+            shrink = 1.0
+            while self.rows - start >= self.dim:
+                h = get_lattice_divisions(self.rows - start, self.dim)
+                size = get_lattice_size(h, self.dim)
+                self.layers.append((start, size, h, shrink))
+                start += size
+                shrink /= 2
+
+            if start < self.rows:
+                self.layers.append((start, self.rows - start, None, shrink))
+        return self.layers
+
+    def get_rng(self, start):
+        """
+        Get the random generator of the block of rows that begins at start.
+        """
+        return np.random.default_rng([self.seed, start])
+
+    def get_simplex_points(self, start, stop):
+        """
+        Get the points of the simplex lattice between two positions.
+        """
+        blocks = []
+        center = 1 / self.dim
+
+        for layer_start, size, h, shrink in self.get_layers():
+            low = max(start, layer_start)
+            high = min(stop, layer_start + size)
+            if low >= high:
+                continue
+
+            if h is None:
+                exponential = self.get_rng(low).exponential(size=(high - low, self.dim))
+                points = exponential / exponential.sum(axis=1, keepdims=True)
+            else:
+                points = get_lattice_points(np.arange(low - layer_start, high - layer_start), h, self.dim)
+            blocks.append(center + shrink * (points - center))
+
+        return np.concatenate(blocks)
+
+    def get_intervals(self, function, lower):
+        """
+        Get the non dominated intervals of the parameters of a disconnected front, computed once.
+        """
+        if self.intervals is None:
+            self.intervals = get_record_intervals(function, lower=lower)
+        return self.intervals
+
+    def get_chunk(self, start, stop):
+        """
+        Get the values of the front between two positions.
+
+        Parameters:
+        - start: First row.
+        - stop: Row after the last one.
+
+        Returns:
+        - values: Array with a row per point and a column per objective.
+        """
+        scales = 2 * np.arange(1, self.dim + 1)
+
+        if self.problem in SIMPLEX_PROBLEMS:
+            points = self.get_simplex_points(start, stop)
+            if self.problem == 'SLD':
+                return self.scale(points)
+            if self.problem == 'INV_SLD':
+                return 1 - self.scale(points)
+            if self.problem == 'DTLZ1':
+                return 0.5 * points
+            return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+        if self.problem in LINE_PROBLEMS:
+            t = np.arange(start, stop) / max(self.rows - 1, 1)
+            x = np.full((stop - start, self.dim - 1), 0.5)
+            x[:, 0] = t
+            if self.problem == 'DTLZ5':
+                angles = x * (np.pi / 2)
+                return get_shape(np.cos(angles), np.sin(angles))
+            return scales * get_shape(x, 1 - x)
+
+        x = self.get_rng(start).random((stop - start, self.dim - 1))
+        if self.problem == 'DTLZ7':
+            x = sample_intervals(x, *self.get_intervals(dtlz7_term, lower=False))
+            last = 2 * (self.dim - np.sum(dtlz7_term(x) / 2, axis=1))
+            return np.column_stack([x, last])
+
+        if self.problem == 'WFG2':
+            x[:, 0] = sample_intervals(x[:, 0], *self.get_intervals(wfg2_disc, lower=True))
+
+        values = get_shape(1 - np.cos(x * np.pi / 2), 1 - np.sin(x * np.pi / 2))
+        if self.problem == 'WFG1':
+            values[:, -1] = 1 - x[:, 0] - np.cos(10 * np.pi * x[:, 0] + np.pi / 2) / (10 * np.pi)
+        else:
+            values[:, -1] = wfg2_disc(x[:, 0])
+        return scales * values
+
+    def scale(self, points):
+        """
+        Shrink the points of the simplex towards its center by the scale factor.
+        """
+        if self.scale_factor is None:
+            return points
+        center = 1 / self.dim
+        return center + self.scale_factor * (points - center)
+
+    def iter_chunks(self):
+        """
+        Iterate over the front in blocks of chunk_size rows.
+        """
+        for start in range(0, self.rows, self.chunk_size):
+            yield self.get_chunk(start, min(start + self.chunk_size, self.rows))
+
+    def generate(self):
+        """
+        Generate the whole front.
+        """
+        return np.concatenate(list(self.iter_chunks()))
+
+    def get_file_name(self, ext='.pof'):
+        """
+        Get the name of the file of the front, following the names of the data folder.
+
+        Parameters:
+        - ext: The extension of the file.
+        """
+        name = '%s_%.2dD_%d' % (self.problem, self.dim, self.rows)
+        if self.scale_factor is not None:
+            name += '_sf_%.3f' % self.scale_factor
+        return name + ext
+
+    def write(self, output_file):
+        """
+        Write the front to a file, a block of rows at a time.
+
+        The .pof files (also compressed, e.g. front.pof.gz) have the '# N M' header and a
+        line per point; the .npy files have the binary values and can be memory mapped. The
+        file is written on a temporary file first and then renamed, so a reader never sees
+        a partial front.
+
+        Parameters:
+        - output_file: The path of the file.
+
+        Returns:
+        - output_file: The same path.
+        """
+        ext, compression = split_extension(output_file)
+        if ext not in ('.pof', '.npy') or (ext == '.npy' and compression is not None):
+            raise Exception("Unsupported output format: %s" % output_file)
+
+        tmp_file = output_file + '.tmp'
+        try:
+            if ext == '.npy':
+                with open(tmp_file, 'wb') as file:
+                    header = {'descr': '<f8', 'fortran_order': False, 'shape': (self.rows, self.dim)}
+                    np.lib.format.write_array_header_1_0(file, header)
+                    for chunk in self.iter_chunks():
+                        chunk.astype('<f8').tofile(file)
+            else:
+                opener = COMPRESSIONS[compression] if compression is not None else open
+                with opener(tmp_file, 'wt') as file:
+                    file.write('# %d %d\n' % (self.rows, self.dim))
+                    for chunk in self.iter_chunks():
+                        np.savetxt(file, chunk, fmt='%.10g')
+            os.replace(tmp_file, output_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+        return output_file
+
+def main():
+    """
+    Command line of the generator: writes a front for each problem, number of points and
+    number of objectives, e.g. python front_generator.py DTLZ2 WFG1 --rows 100000 1000000
+    --dim 15 30 --format npy --output-dir fronts.
+    """
+    parser = argparse.ArgumentParser(description='Generate synthetic Pareto fronts of any size')
+    parser.add_argument('problems', nargs='+', choices=PROBLEMS)
+    parser.add_argument('--rows', type=int, nargs='+', required=True)
+    parser.add_argument('--dim', type=int, nargs='+', required=True)
+    parser.add_argument('--scale-factor', type=float, nargs='+', default=[None])
+    parser.add_argument('--format', choices=['pof', 'pof.gz', 'npy'], default='pof')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for problem in args.problems:
+        for rows in args.rows:
+            for dim in args.dim:
+                scale_factors = args.scale_factor if problem in ('SLD', 'INV_SLD') else [None]
+                for scale_factor in scale_factors:
+                    generator = FrontGenerator(problem, rows, dim, scale_factor=scale_factor, seed=args.seed,
+                                               chunk_size=args.chunk_size)
+                    output_file = os.path.join(args.output_dir, generator.get_file_name('.' + args.format))
+                    print(generator.write(output_file), flush=True)
+
+if __name__ == '__main__':
+    main()
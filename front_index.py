@@ -0,0 +1,210 @@
+import threading
+import numpy as np
+
+class FrontCache():
+    def __init__(self, size):
+        """
+        Initialize the FrontCache class, which keeps the values computed from the fronts
+        (e.g. an index or a row order) by the key of the front, dropping the oldest value
+        once size values are kept.
+
+        Parameters:
+        - size: Specifies the maximum number of values kept.
+        """
+        self.size = size
+        self.values = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """
+        Get the value of a key, computed the first time.
+
+        Parameters:
+        - key: The key of the front, see BaseVisualization.get_front_key.
+        - compute: Function without parameters that computes the value.
+        """
+        with self.lock:
+            if key in self.values:
+                self.hits += 1
+                return self.values[key]
+
+        # Computes the value outside of the lock, so the charts of other fronts do not wait
+        value = compute()
+        with self.lock:
+            self.misses += 1
+            if key not in self.values:
+                if len(self.values) >= self.size:
+                    self.values.pop(next(iter(self.values)))
+                self.values[key] = value
+            return self.values[key]
+
+    def clear(self):
+        """
+        Remove all the values.
+        """
+        with self.lock:
+            self.values.clear()
+
+# Indexes of the fronts already built, shared by all the charts
+INDEX_CACHE = FrontCache(16)
+
+class FrontIndex():
+    def __init__(self, data):
+        """
+        Initialize the FrontIndex class.
+
+        The index keeps, for each objective, the permutation that sorts the solutions by
+        its value, so the solutions inside a range of values are found with a binary search
+        instead of a scan of the front. A KD-tree for the nearest solutions is built when it
+        is first needed, if scipy is installed.
+
+        The queries return the positions of the rows (0, 1, ...) in the data, the values
+        accepted by the highlight parameter of the charts.
+
+        Parameters:
+        - data: Pandas frame with the values of the front.
+        """
+        self.values = data.to_numpy(dtype=float)
+        self.order = np.argsort(self.values, axis=0, kind='stable')
+        self.sorted = np.take_along_axis(self.values, self.order, axis=0)
+        self.trees = {}
+
+    @classmethod
+    def get(cls, chart):
+        """
+        Get the index of the front of a chart, built once per front and kept in INDEX_CACHE.
+
+        Parameters:
+        - chart: The chart, with its data set or an input_file.
+        """
+        def build():
+            data = chart.data
+            if data is None:
+                data = chart.get_reader().read()
+            return cls(data)
+
+        return INDEX_CACHE.get(chart.get_front_key(), build)
+
+    def get_slice(self, column, low=None, high=None):
+        """
+        Get the bounds of the solutions with a value of an objective inside a range, in the
+        order of the objective.
+
+        Parameters:
+        - column: The position of the objective.
+        - low: The min value of the range, included (default: no limit).
+        - high: The max value of the range, included (default: no limit).
+
+        Returns:
+        - start, stop: The positions of the first and after the last solution in self.order.
+        """
+        values = self.sorted[:, column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+
+        # The missing values are sorted last and never match a range
+        stop = np.searchsorted(values, np.inf if high is None else high, side='right')
+        return int(start), int(max(start, stop))
+
+    def get_range(self, column, low=None, high=None):
+        """
+        Get the solutions with a value of an objective inside a range.
+
+        Parameters:
+        - column: The position of the objective.
+        - low: The min value of the range, included (default: no limit).
+        - high: The max value of the range, included (default: no limit).
+
+        Returns:
+        - rows: The sorted positions of the solutions.
+        """
+        start, stop = self.get_slice(column, low, high)
+        return np.sort(self.order[start:stop, column])
+
+    def query(self, ranges):
+        """
+        Get the solutions inside a range of several objectives at once.
+
+        The solutions of the narrowest range are found with a binary search and only they
+        are checked against the other ranges, so the cost depends on the size of the
+        narrowest range and not on the size of the front.
+
+        Parameters:
+        - ranges: Dict with the position of each objective and its (low, high) range, both
+          included and None for no limit, e.g. {0: (None, 0.2), 3: (0.3, 0.5)}.
+
+        Returns:
+        - rows: The sorted positions of the solutions.
+        """
+        if not ranges:
+            return np.arange(self.values.shape[0])
+
+        slices = {column: self.get_slice(column, *bounds) for column, bounds in ranges.items()}
+        column = min(slices, key=lambda column: slices[column][1] - slices[column][0])
+        start, stop = slices[column]
+        rows = self.order[start:stop, column]
+
+        for other, (low, high) in ranges.items():
+            if other == column or len(rows) == 0:
+                continue
+            values = self.values[rows, other]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            rows = rows[keep]
+
+        return np.sort(rows)
+
+    def nearest(self, point, k=1, columns=None):
+        """
+        Get the solutions nearest to a point.
+
+        Parameters:
+        - point: The values of the point, one per objective of columns.
+        - k: The number of solutions.
+        - columns: The positions of the objectives used for the distance (default: all).
+
+        Returns:
+        - rows: The positions of the solutions, from the nearest one.
+        """
+        columns = tuple(range(self.values.shape[1])) if columns is None else tuple(columns)
+        point = np.asarray(point, dtype=float)
+        k = min(k, self.values.shape[0])
+        if k <= 0:
+            return np.zeros(0, dtype=int)
+
+        tree, rows = self.get_tree(columns)
+        if tree is not None:
+            _, found = tree.query(point, k=min(k, len(rows)))
+            return rows[np.atleast_1d(found)]
+
+        # Without scipy the distances to all the solutions are computed at once
+        distances = np.sum((self.values[:, columns] - point) ** 2, axis=1)
+        distances[np.isnan(distances)] = np.inf
+        found = np.argpartition(distances, k - 1)[:k]
+        return found[np.argsort(distances[found], kind='stable')]
+
+    def get_tree(self, columns):
+        """
+        Get the KD-tree of some objectives, built the first time.
+
+        Returns:
+        - tree: The scipy cKDTree of the solutions without missing values, or None if scipy
+          is not installed.
+        - rows: The positions of the solutions in the tree.
+        """
+        if columns not in self.trees:
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                self.trees[columns] = (None, None)
+                return self.trees[columns]
+
+            values = self.values[:, columns]
+            rows = np.flatnonzero(~np.isnan(values).any(axis=1))
+            self.trees[columns] = (cKDTree(values[rows]), rows)
+
+        return self.trees[columns]
@@ -0,0 +1,592 @@
+import bz2
+import gzip
+import lzma
+import os
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+
+# Functions that open a compressed file as a stream, picked by the extension of the file
+COMPRESSIONS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.bz2': bz2.open,
+}
+
+def split_extension(input_file):
+    """
+    Get the extension of a file and the extension of its compression, if any.
+
+    Parameters:
+    - input_file: Specifies the file.
+
+    Returns:
+    - ext: The extension of the format of the file (e.g. '.pof' for 'front.pof.gz').
+    - compression: The extension of the compression (e.g. '.gz'), or None.
+    """
+    name, ext = os.path.splitext(input_file)
+    ext = ext.lower()
+    if ext not in COMPRESSIONS:
+        return ext, None
+    return os.path.splitext(name)[1].lower(), ext
+
+def open_text(input_file):
+    """
+    Open a text file, decompressing it on the fly if its extension is of a compression.
+
+    Parameters:
+    - input_file: Specifies the file to open.
+    """
+    _, compression = split_extension(input_file)
+    if compression is None:
+        return open(input_file)
+    return COMPRESSIONS[compression](input_file, 'rt')
+
+def summarize(chunks):
+    """
+    Compute the count, min and max of each column in a single pass over some chunks.
+
+    Parameters:
+    - chunks: Iterable of pandas frames with the same columns.
+
+    Returns:
+    - summary: A pandas frame shaped like the rows of describe() used by the charts, or
+      None if there are no chunks.
+    """
+    count = None
+    min_values = None
+    max_values = None
+    labels = None
+
+    # Updates the running statistics with each block
+    for chunk in chunks:
+        values = chunk.to_numpy(dtype=float)
+        if count is None:
+            labels = chunk.columns
+            count = np.zeros(values.shape[1])
+            min_values = np.full(values.shape[1], np.inf)
+            max_values = np.full(values.shape[1], -np.inf)
+        count += np.count_nonzero(~np.isnan(values), axis=0)
+        min_values = np.fmin(min_values, np.nanmin(values, axis=0, initial=np.inf))
+        max_values = np.fmax(max_values, np.nanmax(values, axis=0, initial=-np.inf))
+
+    if count is None:
+        return None
+
+    # Columns without any value are reported as NaN, as describe() does
+    min_values[count == 0] = np.nan
+    max_values[count == 0] = np.nan
+
+    return pd.DataFrame([count, min_values, max_values], index=['count', 'min', 'max'],
+                        columns=labels)
+
+class FrontReader(ABC):
+    def __init__(self, input_file, chunk_size=None, columns=None):
+        """
+        Initialize the FrontReader class, the base of the readers of each input format.
+
+        The frames returned by the readers always have the position of each objective as
+        column label (0, 1, ...), whatever the names of the columns in the file are.
+
+        Parameters:
+        - input_file: Specifies the file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        """
+        self.input_file = input_file
+        self.chunk_size = chunk_size
+        self.columns = columns
+        self.rows = None
+        self.dim = None
+
+    def get_columns(self):
+        """
+        Get the positions of the objectives to read, limited to the ones present in the file.
+        """
+        if self.dim is None:
+            self.read_header()
+        if self.columns is None:
+            return list(range(self.dim))
+        return [col for col in self.columns if col < self.dim]
+
+    @abstractmethod
+    def read_header(self):
+        """
+        Read the number of points and objectives without reading the values.
+
+        Returns:
+        - rows: Number of points of the front.
+        - dim: Number of objectives of the front.
+        """
+        pass
+
+    @abstractmethod
+    def read(self):
+        """
+        Read the whole file into a pandas frame.
+        """
+        pass
+
+    def iter_chunks(self):
+        """
+        Iterate over the file in blocks of chunk_size rows.
+
+        The index of the frames continues across the blocks, so each row keeps the
+        same label it would have with read().
+        """
+        if self.chunk_size is None:
+            yield self.read()
+            return
+
+        rows, _ = self.read_header()
+        for start in range(0, rows, self.chunk_size):
+            yield self.read_rows(start, min(start + self.chunk_size, rows))
+
+    @abstractmethod
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop into a pandas frame.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        pass
+
+    def get_summary(self):
+        """
+        Compute the count, min and max of each column in a single pass over the chunks.
+
+        Returns:
+        - summary: A pandas frame shaped like the rows of describe() used by the charts.
+        """
+        summary = summarize(self.iter_chunks())
+        if summary is None:
+            raise Exception("The file %s has no data" % self.input_file)
+        return summary
+
+    def to_frame(self, values, start=0):
+        """
+        Build a pandas frame labelled with the positions of the objectives.
+
+        Parameters:
+        - values: Array of shape (rows, columns) with the values read.
+        - start: Index of the first row.
+        """
+        return pd.DataFrame(values, columns=self.get_columns(),
+                            index=pd.RangeIndex(start, start + values.shape[0]), copy=False)
+
+class PofReader(FrontReader):
+    def __init__(self, input_file, chunk_size=None, columns=None):
+        """
+        Initialize the PofReader class, which reads the '# N M' + space separated format of
+        the .pof files. Files compressed with gzip, xz or bz2 are decompressed while they are
+        parsed, without temporary files.
+
+        Parameters:
+        - input_file: Specifies the .pof file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        """
+        super().__init__(input_file, chunk_size=chunk_size, columns=columns)
+
+    def read_header(self):
+        """
+        Read the '# N M' header of the file without parsing the body.
+
+        Returns:
+        - rows: Number of points declared in the header.
+        - dim: Number of objectives declared in the header.
+        """
+        with open_text(self.input_file) as file:
+            line = file.readline()
+
+        values = line.lstrip('#').split()
+        if len(values) < 2:
+            raise Exception("Invalid header in %s" % self.input_file)
+
+        self.rows = int(values[0])
+        self.dim = int(values[1])
+        return self.rows, self.dim
+
+    def get_csv_params(self):
+        """
+        Get the parameters of pandas.read_csv for the file.
+        """
+        params = {'delimiter': " ", 'header': None, 'skiprows': 1}
+        if self.columns is not None:
+            params['usecols'] = self.get_columns()
+        return params
+
+    def read(self):
+        """
+        Read the whole file into a pandas frame.
+        """
+        with open_text(self.input_file) as file:
+            return pd.read_csv(file, **self.get_csv_params())
+
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop into a pandas frame, parsing only those rows.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        params = self.get_csv_params()
+        params['skiprows'] += start
+        with open_text(self.input_file) as file:
+            frame = pd.read_csv(file, nrows=stop - start, **params)
+        frame.index = pd.RangeIndex(start, start + frame.shape[0])
+        return frame
+
+    def iter_chunks(self):
+        """
+        Iterate over the file in blocks of chunk_size rows.
+
+        The index of the frames continues across the blocks, so each row keeps the
+        same label it would have with read().
+        """
+        if self.chunk_size is None:
+            yield self.read()
+            return
+
+        with open_text(self.input_file) as file:
+            with pd.read_csv(file, chunksize=self.chunk_size, **self.get_csv_params()) as reader:
+                for chunk in reader:
+                    yield chunk
+
+class ParquetReader(FrontReader):
+    def __init__(self, input_file, chunk_size=None, columns=None):
+        """
+        Initialize the ParquetReader class, which reads Parquet files with pyarrow.
+
+        Only the projected columns are read from the file, and the file is memory mapped.
+
+        Parameters:
+        - input_file: Specifies the Parquet file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        """
+        super().__init__(input_file, chunk_size=chunk_size, columns=columns)
+        self.file = None
+
+    def open(self):
+        """
+        Open the Parquet file, if it is not open already.
+        """
+        if self.file is None:
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise Exception("pyarrow is required to read %s" % self.input_file)
+            self.file = pq.ParquetFile(self.input_file, memory_map=True)
+        return self.file
+
+    def read_header(self):
+        """
+        Read the number of rows and columns from the metadata of the file.
+        """
+        metadata = self.open().metadata
+        self.rows = metadata.num_rows
+        self.dim = metadata.num_columns
+        return self.rows, self.dim
+
+    def get_names(self):
+        """
+        Get the names in the file of the projected columns.
+        """
+        names = self.open().schema_arrow.names
+        return [names[col] for col in self.get_columns()]
+
+    def to_values(self, table):
+        """
+        Convert an arrow table or record batch into an array of shape (rows, columns).
+
+        Parameters:
+        - table: The table with the projected columns.
+        """
+        return np.column_stack([column.to_numpy(zero_copy_only=False) for column in table.columns]) \
+            if table.num_columns else np.empty((table.num_rows, 0))
+
+    def read(self):
+        """
+        Read the projected columns into a pandas frame.
+        """
+        table = self.open().read(columns=self.get_names())
+        return self.to_frame(self.to_values(table))
+
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop into a pandas frame, reading only the row
+        groups that hold them.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        metadata = self.open().metadata
+        groups = []
+        first = None
+        offset = 0
+        for group in range(metadata.num_row_groups):
+            rows = metadata.row_group(group).num_rows
+            if offset < stop and offset + rows > start:
+                groups.append(group)
+                if first is None:
+                    first = offset
+            offset += rows
+
+        if not groups:
+            return self.to_frame(np.empty((0, len(self.get_columns()))), start)
+
+        table = self.open().read_row_groups(groups, columns=self.get_names())
+        table = table.slice(start - first, stop - start)
+        return self.to_frame(self.to_values(table), start)
+
+    def iter_chunks(self):
+        """
+        Iterate over the projected columns in blocks of chunk_size rows.
+        """
+        if self.chunk_size is None:
+            yield self.read()
+            return
+
+        start = 0
+        for batch in self.open().iter_batches(batch_size=self.chunk_size, columns=self.get_names()):
+            values = self.to_values(batch)
+            yield self.to_frame(values, start)
+            start += values.shape[0]
+
+    def get_summary(self):
+        """
+        Get the count, min and max of each column from the statistics of the row groups.
+
+        The values are only read when some row group has no statistics.
+        """
+        metadata = self.open().metadata
+        columns = self.get_columns()
+        count = np.zeros(len(columns))
+        min_values = np.full(len(columns), np.inf)
+        max_values = np.full(len(columns), -np.inf)
+
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            for idx, col in enumerate(columns):
+                statistics = row_group.column(col).statistics
+                if statistics is None or not statistics.has_min_max:
+                    return super().get_summary()
+                count[idx] += row_group.num_rows - statistics.null_count
+                min_values[idx] = min(min_values[idx], statistics.min)
+                max_values[idx] = max(max_values[idx], statistics.max)
+
+        min_values[count == 0] = np.nan
+        max_values[count == 0] = np.nan
+
+        return pd.DataFrame([count, min_values, max_values], index=['count', 'min', 'max'],
+                            columns=columns)
+
+class ArrowReader(FrontReader):
+    def __init__(self, input_file, chunk_size=None, columns=None):
+        """
+        Initialize the ArrowReader class, which reads Arrow IPC (Feather v2) files with pyarrow.
+
+        The file is memory mapped, so the projected columns are accessed without copies.
+
+        Parameters:
+        - input_file: Specifies the Arrow IPC file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        """
+        super().__init__(input_file, chunk_size=chunk_size, columns=columns)
+        self.table = None
+
+    def open(self):
+        """
+        Memory map the file and open it as an arrow table, if it is not open already.
+        """
+        if self.table is None:
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise Exception("pyarrow is required to read %s" % self.input_file)
+            self.table = pa.ipc.open_file(pa.memory_map(self.input_file, 'r')).read_all()
+        return self.table
+
+    def read_header(self):
+        """
+        Read the number of rows and columns from the schema of the file.
+        """
+        table = self.open()
+        self.rows = table.num_rows
+        self.dim = table.num_columns
+        return self.rows, self.dim
+
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop of the projected columns into a pandas frame.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        table = self.open().slice(start, stop - start).select(self.get_columns())
+        values = np.column_stack([column.to_numpy() for column in table.columns]) \
+            if table.num_columns else np.empty((table.num_rows, 0))
+        return self.to_frame(values, start)
+
+    def read(self):
+        """
+        Read the projected columns into a pandas frame.
+        """
+        rows, _ = self.read_header()
+        return self.read_rows(0, rows)
+
+class HDF5Reader(FrontReader):
+    def __init__(self, input_file, chunk_size=None, columns=None, dataset=None):
+        """
+        Initialize the HDF5Reader class, which reads a 2D dataset of an HDF5 file with h5py.
+
+        Parameters:
+        - input_file: Specifies the HDF5 file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        - dataset: Specifies the name of the dataset (default: the first dataset of the file).
+        """
+        super().__init__(input_file, chunk_size=chunk_size, columns=columns)
+        self.dataset = dataset
+
+    def open(self):
+        """
+        Open the file and get the dataset with the front.
+        """
+        try:
+            import h5py
+        except ImportError:
+            raise Exception("h5py is required to read %s" % self.input_file)
+
+        file = h5py.File(self.input_file, 'r')
+        if self.dataset is None:
+            self.dataset = next(name for name in file if isinstance(file[name], h5py.Dataset))
+        return file, file[self.dataset]
+
+    def read_header(self):
+        """
+        Read the number of rows and columns from the shape of the dataset.
+        """
+        file, dataset = self.open()
+        with file:
+            self.rows, self.dim = dataset.shape
+        return self.rows, self.dim
+
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop of the projected columns into a pandas frame.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        columns = self.get_columns()
+        file, dataset = self.open()
+        with file:
+            if columns == list(range(self.dim)):
+                values = dataset[start:stop]
+            else:
+                values = dataset[start:stop, columns]
+        return self.to_frame(np.asarray(values, dtype=float), start)
+
+    def read(self):
+        """
+        Read the projected columns into a pandas frame.
+        """
+        rows, _ = self.read_header()
+        return self.read_rows(0, rows)
+
+class NumpyReader(FrontReader):
+    def __init__(self, input_file, chunk_size=None, columns=None, key=None):
+        """
+        Initialize the NumpyReader class, which reads .npy and .npz files.
+
+        The .npy files are memory mapped, so only the rows and columns used are read.
+
+        Parameters:
+        - input_file: Specifies the .npy or .npz file to read.
+        - chunk_size: Specifies the number of rows of each block when streaming the file.
+        - columns: Specifies the positions of the objectives to read (default: all of them).
+        - key: Specifies the name of the array inside a .npz file (default: the first one).
+        """
+        super().__init__(input_file, chunk_size=chunk_size, columns=columns)
+        self.key = key
+        self.array = None
+
+    def open(self):
+        """
+        Load (or memory map) the array with the front, if it is not loaded already.
+        """
+        if self.array is None:
+            if self.input_file.endswith('.npz'):
+                with np.load(self.input_file) as archive:
+                    key = self.key if self.key is not None else archive.files[0]
+                    self.array = archive[key]
+            else:
+                self.array = np.load(self.input_file, mmap_mode='r')
+        return self.array
+
+    def read_header(self):
+        """
+        Read the number of rows and columns from the shape of the array.
+        """
+        self.rows, self.dim = self.open().shape
+        return self.rows, self.dim
+
+    def read_rows(self, start, stop):
+        """
+        Read the rows between start and stop of the projected columns into a pandas frame.
+
+        Parameters:
+        - start: First row to read.
+        - stop: Row after the last one to read.
+        """
+        columns = self.get_columns()
+        values = self.open()[start:stop]
+        if columns != list(range(self.dim)):
+            values = values[:, columns]
+        return self.to_frame(np.asarray(values, dtype=float), start)
+
+    def read(self):
+        """
+        Read the projected columns into a pandas frame.
+        """
+        rows, _ = self.read_header()
+        return self.read_rows(0, rows)
+
+# Readers of each input format, picked by the extension of the file
+READERS = {
+    '.pof': PofReader,
+    '.parquet': ParquetReader,
+    '.arrow': ArrowReader,
+    '.feather': ArrowReader,
+    '.h5': HDF5Reader,
+    '.hdf5': HDF5Reader,
+    '.npy': NumpyReader,
+    '.npz': NumpyReader,
+}
+
+def get_reader(input_file, chunk_size=None, columns=None):
+    """
+    Get the reader of a file based on its extension.
+
+    Files with an unknown extension are read as .pof files. Compressed files (.gz, .xz, .bz2)
+    are only supported for the .pof text format.
+
+    Parameters:
+    - input_file: Specifies the file to read.
+    - chunk_size: Specifies the number of rows of each block when streaming the file.
+    - columns: Specifies the positions of the objectives to read (default: all of them).
+    """
+    ext, compression = split_extension(input_file)
+    reader = READERS.get(ext, PofReader)
+    if compression is not None and reader is not PofReader:
+        raise Exception("Compressed %s files are not supported" % ext)
+    return reader(input_file, chunk_size=chunk_size, columns=columns)
@@ -1,10 +1,17 @@
 from base_visualization import *
+import warnings
+
+from front_index import FrontCache
+
+# Row orders of the fronts already computed, shared by all the heatmaps
+ORDER_CACHE = FrontCache(32)
 
 class HeatMap(BaseVisualization):
     def __init__(self, output_file, data=None, input_file=None,  title=None, subtitle=None, min_value=None,
                  max_value=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
                  label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
-                 scatter_size=None, figure_size=None, input_values=None, normalized=True):
+                 scatter_size=None, figure_size=None, input_values=None, normalized=True, aggregation=None,
+                 order=None, chunk_size=None, highlight=None):
         """
         Initialize the HeatMap class, inheriting from BaseVisualization.
         
@@ -28,16 +35,57 @@ class HeatMap(BaseVisualization):
         - figure_size: Specifies the size of the figure or plot.
         - input_values: Specifies the input values used in the heatmap.
         - normalized: Specifies whether the input data should be normalized before generating the heatmap (default: True).
+        - aggregation: Specifies how the rows are pooled down to the pixel height of the heatmap:
+          'max', 'mean' or 'min' (default: None, every row is drawn).
+        - order: Specifies the order of the rows: the position of an objective to sort by, or
+          'cluster' to group the rows by their dominant objective (default: None, file order).
+        - chunk_size: Specifies the number of rows streamed at a time from the input_file when the
+          rows are pooled without an order.
+        - highlight: Specifies the solutions whose rows are marked: a list of row positions (e.g.
+          the result of a FrontIndex query), a dict with the (low, high) range of some objectives,
+          or 'extremes' for the solutions with the minimum value of each objective. The ranges
+          are on the values of the objectives before they are normalized.
         """
         super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle,
                          title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
                          ticks_size=ticks_size, label_pad=label_pad, major_grid_line_width=major_grid_line_width,
                          minor_grid_line_width=minor_grid_line_width, ticks_pad=ticks_pad, scatter_size=scatter_size,
-                         figure_size=figure_size, input_values=input_values)
+                         figure_size=figure_size, input_values=input_values, chunk_size=chunk_size)
 
         self.min_value = min_value
         self.max_value = max_value
         self.normalized = normalized
+        self.aggregation = aggregation
+        self.order = order
+        self.highlight = highlight
+        self.normalize_bounds = None
+        self.shared_bounds = False
+
+    def set_bounds(self, bounds):
+        """
+        Set the min and max values shared with other charts.
+
+        The values are normalized with the shared bounds and the color scale of the
+        normalized values goes from 0 to 1, so the colors match between the charts.
+
+        Parameters:
+        - bounds: A BoundsContext of the files, or any object with min_values and max_values.
+        """
+        super().set_bounds(bounds)
+        self.shared_bounds = True
+
+    def set_normalized_bounds(self):
+        """
+        Set the min and max values of the color scale once the values are normalized.
+        """
+        if self.shared_bounds:
+            self.set_min_value(0)
+            self.set_max_value(1)
+            return
+
+        self.set_min_value(min(self.get_values('min')))
+
+        self.set_max_value(max(self.get_values('max')))
 
     def set_values(self):
         """
@@ -49,6 +97,9 @@ class HeatMap(BaseVisualization):
         if self.max_value is None:
             self.max_value = max(self.max_values)
 
+        if self.aggregation not in (None, 'max', 'mean', 'min'):
+            raise Exception("Unsupported aggregation: %s" % self.aggregation)
+
     def set_min_value(self, value):
         """
         Set the minimum value attribute.
@@ -97,15 +148,8 @@ class HeatMap(BaseVisualization):
         """
         Normalize the values in the data columns and return a new DataFrame with normalized values.
         """
-        # Create a copy of the original DataFrame
-        normalized_data = self.data.copy()  
-
-        # Applies the normalize function to each value of each column of the frame
-        for column in normalized_data.columns:
-            normalized_data[column] = self.data[column].apply(
-                self.normalize_value)
-
-        return normalized_data
+        # Applies the normalize function to the whole frame at once
+        return self.normalize_value(self.data)
 
     def set_normalize_data(self):
         """
@@ -113,26 +157,194 @@ class HeatMap(BaseVisualization):
         """
 
         #If the values are normalized, it sets the new the summary and min and max values
-        if self.normalized:
+        if self.normalized and self.data is None:
+            # The chunks are normalized while they are streamed, so only the summary changes
+            self.normalize_bounds = [self.min_value, self.max_value]
+            summary = self.summary.copy()
+            summary.loc[['min', 'max']] = self.normalize_value(summary.loc[['min', 'max']])
+            self.summary = summary
+
+            self.set_normalized_bounds()
+
+        elif self.normalized:
             new_data = self.normalize_data()
             self.set_data(new_data)
 
             self.set_summary()
 
-            self.set_min_value(min(self.get_values('min')))
+            self.set_normalized_bounds()
 
-            self.set_max_value(max(self.get_values('max')))
+    def set_aggregation(self, aggregation):
+        """
+        Set the aggregation used to pool the rows.
+
+        Parameters:
+        - aggregation: 'max', 'mean', 'min' or None.
+        """
+        self.aggregation = aggregation
+
+    def get_aggregation(self):
+        """
+        Get the aggregation attribute.
+        """
+        return self.aggregation
+
+    def set_order(self, order):
+        """
+        Set the order of the rows.
+
+        Parameters:
+        - order: Position of an objective, 'cluster' or None.
+        """
+        self.order = order
+
+    def get_order(self):
+        """
+        Get the order attribute.
+        """
+        return self.order
+
+    def set_highlight(self, highlight):
+        """
+        Set the solutions whose rows are marked.
+
+        Parameters:
+        - highlight: List of row positions, dict of ranges, 'extremes' or None.
+        """
+        self.highlight = highlight
+
+    def get_highlight(self):
+        """
+        Gets the highlight attribute.
+        """
+        return self.highlight
+
+    def get_row_order(self):
+        """
+        Get the permutation of the rows of the data given by the order attribute.
+
+        The permutation is computed once per front and kept in ORDER_CACHE.
+
+        Returns:
+        - rows: Array with the positions of the rows in the new order.
+        """
+        def compute():
+            values = self.data.to_numpy(dtype=float)
+            if self.order == 'cluster':
+                # Groups the rows by their dominant objective, sorted by its value inside each group
+                dominant = np.argmax(np.nan_to_num(values, nan=-np.inf), axis=1)
+                return np.lexsort((-values[np.arange(values.shape[0]), dominant], dominant))
+            return np.argsort(values[:, self.order], kind='stable')
+
+        return ORDER_CACHE.get((self.get_front_key(), self.order), compute)
+
+    def iter_rows(self):
+        """
+        Iterate over the normalized and ordered rows of the heatmap in chunks.
+        """
+        if self.data is not None:
+            if self.order is None:
+                yield self.data
+            else:
+                yield self.data.iloc[self.get_row_order()]
+            return
+
+        for chunk in self.iter_chunks():
+            if self.normalize_bounds is not None:
+                low, high = self.normalize_bounds
+                chunk = (chunk - low) / (high - low)
+            yield chunk
+
+    def get_num_rows(self):
+        """
+        Get the number of rows of the data, reading only the header when it is streamed.
+        """
+        if self.data is not None:
+            return self.data.shape[0]
+        rows, _ = self.get_reader().read_header()
+        return rows
+
+    def get_pool_factor(self, height):
+        """
+        Get the number of consecutive rows pooled into each row of the given height.
+        """
+        return max(1, int(np.ceil(self.get_num_rows() / height)))
+
+    def get_highlight_positions(self, rows, height=None):
+        """
+        Get where the rows of some solutions are drawn in the heatmap.
+
+        Parameters:
+        - rows: The positions of the rows in the data.
+        - height: The pixel height the rows are pooled to, if they are pooled.
+
+        Returns:
+        - positions: The sorted rows of the heatmap, once ordered and pooled.
+        """
+        if self.order is not None:
+            # Inverts the permutation of the order to find where each row is drawn
+            position = np.empty(self.get_num_rows(), dtype=int)
+            position[self.get_row_order()] = np.arange(len(position))
+            rows = position[rows]
+
+        if height is not None:
+            rows = rows // self.get_pool_factor(height)
+
+        return np.unique(rows)
+
+    def get_pooled_data(self, height):
+        """
+        Pool the rows of the data with the aggregation function, down to the given height.
+
+        Consecutive blocks of rows are reduced at once with vectorized operations, so the
+        memory and the time only depend on the size of the chunks and the height.
+
+        Parameters:
+        - height: Maximum number of rows of the result (the pixel height of the heatmap).
+
+        Returns:
+        - pooled: Array of shape (rows, dim) with the pooled values.
+        """
+        pool = {'max': np.nanmax, 'mean': np.nanmean, 'min': np.nanmin}[self.aggregation]
+        factor = self.get_pool_factor(height)
+        blocks = []
+        rest = None
+
+        # Columns without values are pooled to NaN, without warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+
+            for chunk in self.iter_rows():
+                values = chunk.to_numpy(dtype=float)
+                if rest is not None:
+                    values = np.concatenate([rest, values])
+
+                # Pools the complete blocks and keeps the rest for the next chunk
+                full = values.shape[0] // factor * factor
+                if full:
+                    blocks.append(pool(values[:full].reshape(-1, factor, values.shape[1]), axis=1))
+                rest = values[full:]
+
+            if rest is not None and rest.shape[0]:
+                blocks.append(pool(rest, axis=0, keepdims=True))
+
+        return np.concatenate(blocks)
 
     def plot(self):
         """
         Plot a heat map based on the specified parameters.
         """
         # Sets all the values necessaries for formatting the specific chart
-        self.set_data()
+        if not self.use_chunks() or self.aggregation is None or self.order is not None \
+                or isinstance(self.highlight, str):
+            self.set_data()
         self.set_summary()
         self.set_min_max_values()
         self.set_dim()
         self.set_values()
+
+        # Finds the highlighted rows on the values before they are normalized
+        highlight_rows = self.get_highlight_rows(self.highlight)
         
         # Normalizes the data if needed
         self.set_normalize_data()
@@ -144,15 +356,34 @@ class HeatMap(BaseVisualization):
         self.input_values = [self.min_value, self.max_value]
         self.set_figure_size()
 
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
         # Sets the normalize colors to the colorbar
-        cmap = plt.cm.get_cmap('Blues')
+        cmap = mpl.colormaps['Blues']
         norm = colors.Normalize(vmin=self.min_value, vmax=self.max_value)
 
         # Creates the figure size
-        fig, ax = plt.subplots(figsize=(60, 60))
+        fig = self.create_figure(figsize=(60, 60))
+        ax = fig.add_subplot()
 
         #Creates the heatmap
-        heatmap = ax.matshow(self.data, cmap=cmap, norm=norm)
+        if self.aggregation is None:
+            height = None
+            data = self.data if self.order is None else self.data.iloc[self.get_row_order()]
+            heatmap = ax.matshow(data, cmap=cmap, norm=norm)
+        else:
+            # Pools the rows down to the pixel height of the axes and colors them directly
+            height = int(ax.get_position().height * fig.get_figheight() * fig.dpi)
+            pooled = self.get_pooled_data(height)
+            ax.matshow(cmap(norm(pooled), bytes=True), interpolation='nearest')
+            heatmap = mpl.cm.ScalarMappable(norm=norm, cmap=cmap)
+
+        # Marks the rows of the highlighted solutions with a line across the objectives
+        if len(highlight_rows):
+            ax.hlines(self.get_highlight_positions(highlight_rows, height), -0.5, self.dim - 0.5,
+                      color='darkred', linewidth=self.major_grid_line_width, zorder=3)
         
         # Sets the label for the axis
         xlabels = [f'$f_{i+1}$' for i in range(self.dim)]
@@ -167,13 +398,13 @@ class HeatMap(BaseVisualization):
         ax.set_yticklabels([])
 
         # Creates the color bar for heatmap
-        colorbar = fig.colorbar(heatmap)
+        colorbar = fig.colorbar(heatmap, ax=ax)
 
         # Adds the ticks for the color bar
         colorbar.ax.tick_params(labelsize=self.label_size*0.75)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size * 0.75,
                      fontweight='bold',
                      family='monospace',
@@ -188,8 +419,6 @@ class HeatMap(BaseVisualization):
         # Sets the aspect to auto (fills the rectangle of data)
         ax.set_aspect('auto')
 
-        # Saves the figure as a file
-        plt.savefig(self.output_file)
-
-        # Closes the image
-        plt.close()
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
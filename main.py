@@ -6,6 +6,7 @@ from parallel_coord import ParallelCoordinates
 from radar import RadarChart
 from heatmap import HeatMap
 from bubble import BubbleChart
+from bounds import BoundsContext
 
 dicc = {2: 36, 3: 36, 4: 84, 5: 85, 6: 147, 7: 168, 8: 156, 9: 174, 10: 230}
 sf = np.arange(0.1, 1, 0.1)
@@ -18,6 +19,9 @@ num = 0
 for method in types:
     for dim in dicc:
         N = dicc[dim]
+        # The fronts of all the scale factors share the axes, with their bounds read at once
+        bounds = BoundsContext(["data/%s_%.2dD_%d_sf_%.3f.pof" % (method, dim, N, factor)
+                                for factor in sf])
         for factor in sf:
             # Sets the input file and output file for each file
             input_file = "data/%s_%.2dD_%d_sf_%.3f.pof" % (
@@ -29,20 +33,26 @@ for method in types:
             subtitle = "Scaling = %.1f" % (factor)
             if dim == 3 :
                 pl = Plot3D(input_file, output_file + "_plot3D.png", title, subtitle=subtitle)
+                bounds.apply(pl)
                 pl.plot()
 
             if dim == 2 :
                 pl = Plot2D(input_file, output_file + "_plot2D.png", title)
+                bounds.apply(pl)
                 pl.plot()
             
             if dim != 2 and dim != 3:
                 ppl = ParallelCoordinates(input_file, output_file + "_parallel.png")
+                bounds.apply(ppl)
                 ppl.plot()
                 bchart = BubbleChart(input_file, output_file + "_bubble.png")
+                bounds.apply(bchart)
                 bchart.plot()
                 radar = RadarChart(input_file, output_file + "_radar.png")
+                bounds.apply(radar)
                 radar.plot()
                 heat = HeatMap(input_file, output_file + "_heat.png")
+                bounds.apply(heat)
                 heat.plot() 
 
 
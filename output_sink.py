@@ -0,0 +1,197 @@
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+
+class OutputSink(ABC):
+    def __init__(self):
+        """
+        Initialize the OutputSink class.
+
+        A sink receives the encoded images of the charts instead of the files of their
+        output_file paths. Each image is given with the name of the file it would have been
+        written to (e.g. front_1.png for the first view of a Plot3D), so the names of the
+        images do not change. The images can be written from several threads at once.
+        """
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def write(self, name, data):
+        """
+        Receive an encoded image.
+
+        Parameters:
+        - name: The name of the image, the path of the file it would have been written to.
+        - data: The bytes of the image.
+        """
+        pass
+
+    def close(self):
+        """
+        Finish the images received.
+        """
+        pass
+
+    def abort(self):
+        """
+        Stop receiving images after an error, without finishing the images received.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class MemorySink(OutputSink):
+    def __init__(self):
+        """
+        Initialize the MemorySink class, which keeps the images in memory by name.
+        """
+        super().__init__()
+        self.images = {}
+
+    def write(self, name, data):
+        with self.lock:
+            self.images[name] = data
+
+    def get_bytes(self, name):
+        """
+        Get the bytes of an image.
+
+        Parameters:
+        - name: The name of the image.
+        """
+        return self.images[name]
+
+    def get_buffer(self, name):
+        """
+        Get an image as a BytesIO, e.g. for PIL.Image.open or an HTTP response.
+
+        Parameters:
+        - name: The name of the image.
+        """
+        return io.BytesIO(self.images[name])
+
+class CallbackSink(OutputSink):
+    def __init__(self, function):
+        """
+        Initialize the CallbackSink class, which gives each image to a function.
+
+        Parameters:
+        - function: Function called with the name and the bytes of each image. It is called
+          from the threads of an OutputWriter when the charts have one.
+        """
+        super().__init__()
+        self.function = function
+
+    def write(self, name, data):
+        self.function(name, data)
+
+class ArchiveSink(OutputSink):
+    def __init__(self, archive_file, base_dir=None, compression=None, buffer_size=8 * 2 ** 20):
+        """
+        Initialize the ArchiveSink class.
+
+        The sink streams the images into a single zip or tar archive, an entry per image, so
+        a batch of charts creates one file written with large sequential appends instead of
+        a file per image. The archive is written on a temporary file, renamed when the sink
+        is closed, so a reader never sees a partial archive.
+
+        Parameters:
+        - archive_file: Specifies the archive, .zip, .tar, .tar.gz, .tgz or .tar.xz.
+        - base_dir: Specifies the directory the names of the entries are relative to
+          (default: the names of the images, without a leading separator).
+        - compression: Specifies the compression of the zip entries (default: stored, as the
+          PNG images are already compressed), e.g. zipfile.ZIP_DEFLATED.
+        - buffer_size: Specifies the bytes buffered before each append to the file.
+        """
+        super().__init__()
+        self.archive_file = archive_file
+        self.base_dir = base_dir
+        self.tmp_file = archive_file + '.tmp'
+        self.file = open(self.tmp_file, 'wb', buffering=buffer_size)
+        self.count = 0
+
+        name = archive_file.lower()
+        if name.endswith('.zip'):
+            self.archive = zipfile.ZipFile(self.file, 'w', compression=compression or zipfile.ZIP_STORED)
+        elif name.endswith(('.tar.gz', '.tgz')):
+            self.archive = tarfile.open(fileobj=self.file, mode='w|gz')
+        elif name.endswith('.tar.xz'):
+            self.archive = tarfile.open(fileobj=self.file, mode='w|xz')
+        elif name.endswith('.tar'):
+            self.archive = tarfile.open(fileobj=self.file, mode='w|')
+        else:
+            self.file.close()
+            os.remove(self.tmp_file)
+            raise Exception("Unsupported archive: %s" % archive_file)
+
+    def get_entry_name(self, name):
+        """
+        Get the name of the entry of an image inside the archive.
+
+        Parameters:
+        - name: The name of the image.
+        """
+        if self.base_dir is not None:
+            name = os.path.relpath(name, self.base_dir)
+        return os.path.normpath(name).replace(os.sep, '/').lstrip('/')
+
+    def write(self, name, data):
+        entry_name = self.get_entry_name(name)
+        with self.lock:
+            if isinstance(self.archive, zipfile.ZipFile):
+                info = zipfile.ZipInfo(entry_name, date_time=time.localtime()[:6])
+                info.compress_type = self.archive.compression
+                self.archive.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(entry_name)
+                info.size = len(data)
+                info.mtime = time.time()
+                self.archive.addfile(info, io.BytesIO(data))
+            self.count += 1
+
+    def close(self):
+        """
+        Finish the archive and rename it to the archive_file.
+        """
+        with self.lock:
+            if self.archive is None:
+                return
+            self.archive.close()
+            self.archive = None
+            self.file.close()
+            os.replace(self.tmp_file, self.archive_file)
+
+    def abort(self):
+        """
+        Remove the temporary file of the archive, so no partial archive is left.
+        """
+        with self.lock:
+            if self.archive is None:
+                return
+            self.archive = None
+            self.file.close()
+            os.remove(self.tmp_file)
+
+def open_sink(target):
+    """
+    Get the sink of a target.
+
+    Parameters:
+    - target: An OutputSink, a function called with the name and the bytes of each image, or
+      the path of a zip or tar archive.
+    """
+    if target is None or isinstance(target, OutputSink):
+        return target
+    if callable(target):
+        return CallbackSink(target)
+    return ArchiveSink(target)
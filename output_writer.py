@@ -0,0 +1,181 @@
+import io
+import os
+import threading
+import numpy as np
+import matplotlib.image as mpimg
+from concurrent.futures import ThreadPoolExecutor
+from output_sink import open_sink
+
+class OutputWriter():
+    def __init__(self, max_workers=2, max_pending=4, collect_errors=True, sink=None):
+        """
+        Initialize the OutputWriter class.
+
+        The writer takes the rendered pixels of a figure and encodes and writes the PNG file
+        in a pool of background threads, so the caller can build the next chart meanwhile.
+
+        Parameters:
+        - max_workers: Specifies the number of threads that encode and write the files.
+        - max_pending: Specifies the maximum number of images waiting to be written. When it
+          is reached, submit() blocks until an image is written.
+        - collect_errors: Specifies whether the writes are kept to raise their exceptions in
+          submit() and flush(). Without it the caller must check the futures returned.
+        - sink: Specifies the sink that receives the images instead of the files (an
+          OutputSink, a function or the path of a zip or tar archive, see output_sink). The
+          sink of a chart takes precedence. An archive is closed with the writer,
+          or removed when a write failed.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.collect_errors = collect_errors
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.futures = []
+        self.sink = open_sink(sink)
+
+    def submit(self, fig, output_file, sink=None):
+        """
+        Render the figure and queue the image to be written as a file.
+
+        Only PNG files are written in the background, other formats are saved directly.
+
+        Parameters:
+        - fig: The figure to save.
+        - output_file: The file where the figure is saved, or the name of the image in the sink.
+        - sink: The sink of the image (default: the sink of the writer, if any).
+
+        Returns:
+        - future: The future of the write, or None if the file was saved directly.
+        """
+        self.check()
+
+        if sink is None:
+            sink = self.sink
+
+        if os.path.splitext(output_file)[1].lower() != '.png':
+            if sink is None:
+                fig.savefig(output_file)
+            else:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=os.path.splitext(output_file)[1][1:].lower() or 'png')
+                sink.write(output_file, buffer.getvalue())
+            return None
+
+        # Renders the figure and copies the pixels, as the canvas is reused by the next draw
+        fig.canvas.draw()
+        rgba = np.array(fig.canvas.buffer_rgba())
+
+        # Waits for a free slot, so at most max_pending images are held in memory
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.write, rgba, output_file, fig.dpi, sink)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self.slots.release())
+        self.add_future(future)
+        return future
+
+    def run_after(self, futures, function):
+        """
+        Run a function in the background once some writes finished.
+
+        The function is not run if any of the writes failed. Its exceptions are raised like
+        the ones of the writes.
+
+        Parameters:
+        - futures: The futures of the writes returned by submit().
+        - function: The function to run, without arguments.
+        """
+        def run():
+            # The writes were queued before, so they are already taken by the threads
+            for future in futures:
+                future.result()
+            function()
+
+        future = self.executor.submit(run)
+        self.add_future(future)
+        return future
+
+    def add_future(self, future):
+        """
+        Keep the future of a write, so its exception is raised by submit() or flush().
+        """
+        if self.collect_errors:
+            with self.lock:
+                self.futures.append(future)
+
+    def write(self, rgba, output_file, dpi, sink=None):
+        """
+        Encode the pixels as PNG and write the file.
+
+        Parameters:
+        - rgba: Array of shape (height, width, 4) with the pixels of the figure.
+        - output_file: The file where the image is written.
+        - dpi: Resolution of the figure, stored in the file as savefig does.
+        - sink: The sink that receives the image instead of the file, or None.
+        """
+        if sink is None:
+            mpimg.imsave(output_file, rgba, dpi=dpi, format='png')
+            return
+
+        buffer = io.BytesIO()
+        mpimg.imsave(buffer, rgba, dpi=dpi, format='png')
+        sink.write(output_file, buffer.getvalue())
+
+    def check(self):
+        """
+        Raise the exception of the first write that failed, if any.
+        """
+        with self.lock:
+            done = [future for future in self.futures if future.done()]
+            self.futures = [future for future in self.futures if not future.done()]
+
+        for future in done:
+            future.result()
+
+    def flush(self):
+        """
+        Wait until all the queued images are written.
+
+        The exception of the first write that failed is raised.
+        """
+        with self.lock:
+            futures = self.futures
+            self.futures = []
+
+        error = None
+        for future in futures:
+            try:
+                future.result()
+            except Exception as exception:
+                if error is None:
+                    error = exception
+
+        if error is not None:
+            raise error
+
+    def close(self):
+        """
+        Wait until all the queued images are written and stop the threads.
+        """
+        try:
+            self.flush()
+        except BaseException:
+            # Removes the archive of the failed writes instead of leaving a partial one
+            self.executor.shutdown()
+            if self.sink is not None:
+                self.sink.abort()
+            raise
+
+        self.executor.shutdown()
+        if self.sink is not None:
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -4,7 +4,7 @@ class ParallelCoordinates(BaseVisualization):
     def __init__(self, output_file, data=None, input_file=None, title=None, subtitle=None, min_value=None,
                  max_value=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
                  label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
-                 scatter_size=None, figure_size=None, line_width=None, input_values=None):
+                 scatter_size=None, figure_size=None, line_width=None, input_values=None, highlight=None):
         """
         Initialize the ParallelCoordinates class, a subclass of BaseVisualization.
         
@@ -28,6 +28,9 @@ class ParallelCoordinates(BaseVisualization):
         - figure_size: Specifies the size of the figure or plot.
         - line_width: Specifies the line width of the parallel coordinates lines.
         - input_values: Specifies the input values used in the visualization.
+        - highlight: Specifies the solutions drawn over the others: a list of row positions (e.g.
+          the result of a FrontIndex query), a dict with the (low, high) range of some objectives,
+          or 'extremes' for the solutions with the minimum value of each objective.
         """
         super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle,
                          title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
@@ -38,6 +41,7 @@ class ParallelCoordinates(BaseVisualization):
         self.min_value = min_value
         self.max_value = max_value
         self.line_width = line_width
+        self.highlight = highlight
 
     def set_values(self):
         """
@@ -97,6 +101,71 @@ class ParallelCoordinates(BaseVisualization):
         """
         return self.line_width
 
+    def set_highlight(self, highlight):
+        """
+        Set the solutions drawn over the others.
+
+        Parameters:
+        - highlight: List of row positions, dict of ranges, 'extremes' or None.
+        """
+        self.highlight = highlight
+
+    def get_highlight(self):
+        """
+        Gets the highlight attribute.
+        """
+        return self.highlight
+
+    def get_highlighted(self):
+        """
+        Get the values of the solutions drawn over the others.
+
+        Returns:
+        - values: Array of shape (solutions, dim), empty if there is nothing to highlight.
+        """
+        values = self.data.to_numpy(dtype=float)[:, :self.dim]
+        return values[self.get_highlight_rows(self.highlight)]
+
+    def draw(self, ax):
+        """
+        Draw the solutions on a single axes, with a vertical line for each objective.
+
+        plot() draws each pair of objectives on its own axes, this compact layout is used
+        when the chart is a panel of a larger figure. The values of the chart must be
+        already set, as plot() does.
+
+        Parameters:
+        - ax: The axes where the chart is drawn.
+        """
+        x = np.arange(1, self.dim + 1)
+        ranges = self.calculate_tick_locations(self.min_value, self.max_value)
+
+        # Draws all the solutions with a single call
+        ax.plot(x, self.data.to_numpy(dtype=float)[:, :self.dim].T, color='darkblue',
+                linewidth=self.line_width)
+
+        # Draws the highlighted solutions over the others
+        highlighted = self.get_highlighted()
+        if len(highlighted):
+            ax.plot(x, highlighted.T, color='darkred', linewidth=self.line_width * 2, zorder=3)
+
+        # Draws the axis of each objective
+        ax.vlines(x, self.min_value, self.max_value, color='black',
+                  linewidth=self.major_grid_line_width, zorder=0)
+
+        # Sets the limits and the ticks of both axes
+        ax.set_xlim([x[0], x[-1]])
+        ax.set_xticks(x)
+        ax.set_xticklabels([f'$f_{{{i}}}$' for i in x], fontsize=self.label_size)
+        ax.set_ylim([self.min_value, self.max_value])
+        ax.set_yticks(ranges)
+        ax.tick_params(axis='y', labelsize=self.ticks_size, pad=self.ticks_pad)
+        ax.grid(which='major',
+                axis='y',
+                linewidth=self.minor_grid_line_width,
+                color='black',
+                zorder=0)
+
     def plot(self):
         """
         Plot a parallel coordinates plot based on the specified parameters.
@@ -121,18 +190,18 @@ class ParallelCoordinates(BaseVisualization):
         self.input_values = [self.min_value, self.max_value]
         self.set_figure_size()
 
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
         # Creates the figure for the subplot and the number of columns
-        fig, axes = plt.subplots(1, self.dim - 1, sharey=False)
+        fig = self.create_figure()
 
         #If the dimension is one, it turns the axes into a list of axes
         if self.dim > 2:
-            fig, axes = plt.subplots(1, self.dim - 1, sharey=False)
+            axes = fig.subplots(1, self.dim - 1, sharey=False)
         else:
-            fig, axes = plt.subplots(1, 1, sharey=False)
-            axes = [axes]
-            
-        # Sets the figure size
-        plt.rcParams["figure.figsize"] = [13, 9]
+            axes = [fig.subplots(1, 1, sharey=False)]
 
         # Creates a the list of ticks for the x axis
         x = np.arange(1, self.dim + 1)
@@ -140,6 +209,9 @@ class ParallelCoordinates(BaseVisualization):
         # Calculates the ticks locations for the axes
         ranges = self.calculate_tick_locations(self.min_value, self.max_value)
 
+        # Obtains the solutions drawn over the others
+        highlighted = self.get_highlighted()
+
         # Set the figure size of the figure based on the min and max values
         axes[0].get_figure().set_size_inches(self.figure_size)
 
@@ -185,6 +257,10 @@ class ParallelCoordinates(BaseVisualization):
                 axes[i].set_xlim([x[i], x[i+1]])
                 axes[i].set_xticks(np.arange(x[i], x[i] + 2, 1))
 
+            # Draws the highlighted solutions over the others
+            for values in highlighted:
+                axes[i].plot(x, values, color='darkred', linewidth=self.line_width * 2, zorder=3)
+
         # Adds the second tick and label for each axis 
         for tick in axes[self.dim - 2].yaxis.get_major_ticks():
             tick.label2On = True
@@ -194,10 +270,10 @@ class ParallelCoordinates(BaseVisualization):
         axes[self.dim - 2].spines['right'].set_linewidth(self.line_width)
 
         # Adjust the space of the subplot
-        plt.subplots_adjust(wspace=0)
+        fig.subplots_adjust(wspace=0)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                      fontweight='bold',
                      family='monospace',
@@ -223,8 +299,6 @@ class ParallelCoordinates(BaseVisualization):
         fig.supylabel("Objective values", fontsize=self.label_size,
                       x=left_ticks_pos[0] + self.label_pad, y=left_ticks_pos[1])
         
-        # Saves the figure as a file
-        plt.savefig(self.output_file)
-
-        # Closes the image
-        plt.close()
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
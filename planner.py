@@ -0,0 +1,446 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from front_reader import get_reader
+from shared_front import FrontHandle
+
+# Parameter that selects the drawing mode of the charts that have several
+MODE_PARAMS = {'plot2d': 'mode', 'projection': 'mode', 'radar': 'mode', 'heatmap': 'aggregation'}
+
+# Drawing modes of each chart, from the most detailed to the cheapest one for large fronts
+DOWNGRADES = {'plot2d': [{'mode': 'scatter'}, {'mode': 'downsample', 'chunk_size': 100000},
+                         {'mode': 'density', 'chunk_size': 100000}],
+              'projection': [{'mode': 'scatter'}, {'mode': 'downsample', 'chunk_size': 100000},
+                             {'mode': 'density', 'chunk_size': 100000}],
+              'radar': [{'mode': 'lines'}, {'mode': 'envelope'}],
+              'heatmap': [{'aggregation': None}, {'aggregation': 'max', 'chunk_size': 100000}]}
+
+# Resolutions tried, in order, when no drawing mode fits in the budget
+DPIS = [72, 50, 36]
+
+# Size in inches and resolution of the figures when the job does not set them
+FIGURE_SIZE = (60, 60)
+DPI = 100
+
+# Coefficients of the time (seconds) and the peak memory (bytes) of each chart and mode, for
+# the features [1, rows, rows * objectives, megapixels], fitted with benchmark() on a single
+# core of a server CPU. The 'default' coefficients are used for the charts not measured.
+DEFAULT_COEFFICIENTS = {
+    'default': {'seconds': [2.0, 2e-4, 0.0, 0.05], 'memory': [1.5e8, 2e3, 100.0, 8e6]},
+    'bubble': {'seconds': [0.665, 7.34e-4, 0.0, 0.304], 'memory': [1.36e7, 0.0, 116.0, 5.47e6]},
+    'heatmap': {'seconds': [0.497, 3.36e-5, 7.26e-7, 0.0367], 'memory': [1.98e8, 3.54e4, 49.2, 1.74e7]},
+    'heatmap:pooled': {'seconds': [0.405, 0.0, 3.18e-6, 0.0439], 'memory': [7.84e6, 0.0, 4.82, 2.5e7]},
+    'parallel': {'seconds': [0.259, 0.0, 9.58e-4, 0.215], 'memory': [9.1e6, 0.0, 7860.0, 5.94e6]},
+    'plot2d': {'seconds': [0.572, 0.0, 2.9e-5, 0.0661], 'memory': [1.36e7, 0.0, 9.71, 5.46e6]},
+    'plot2d:density': {'seconds': [0.572, 3.98e-5, 0.0, 0.114], 'memory': [1.7e7, 0.0, 0.0, 3.72e7]},
+    'plot2d:downsample': {'seconds': [0.29, 0.0, 0.0, 0.0895], 'memory': [1.07e7, 0.0, 12.1, 5.46e6]},
+    'plot3d': {'seconds': [1.67, 8.12e-4, 0.0, 0.318], 'memory': [1.36e7, 221.0, 49.2, 5.46e6]},
+    'projection': {'seconds': [0.321, 2.73e-5, 0.0, 0.0925], 'memory': [1.28e7, 0.0, 22.0, 7.14e6]},
+    'projection:density': {'seconds': [0.0, 1.73e-5, 0.0, 0.186], 'memory': [1.14e7, 0.0, 0.0, 4.92e7]},
+    'projection:downsample': {'seconds': [0.0, 7.06e-6, 0.0, 0.0967], 'memory': [1.01e7, 52.4, 0.0, 7.14e6]},
+    'radar': {'seconds': [0.0, 7.57e-4, 5.1e-4, 0.0968], 'memory': [1.28e7, 6070.0, 120.0, 6.83e6]},
+    'radar:envelope': {'seconds': [0.0, 0.0, 0.0, 0.0877], 'memory': [1.13e7, 0.0, 0.0, 7.31e6]},
+    'scatter_matrix': {'seconds': [0.121, 0.0, 0.0, 0.107], 'memory': [3.4e7, 1850.0, 0.0, 7.35e6]},
+}
+
+class CostModel():
+    def __init__(self, coefficients=None):
+        """
+        Initialize the CostModel class.
+
+        The model estimates the seconds and the peak memory of a chart as a linear function
+        of the number of rows of the front, the number of values (rows * objectives) and the
+        megapixels of the image, with a set of coefficients for each chart and drawing mode.
+
+        Parameters:
+        - coefficients: Dict with the coefficients of each model key (see get_key), as
+          returned by fit() (default: DEFAULT_COEFFICIENTS).
+        """
+        self.coefficients = dict(DEFAULT_COEFFICIENTS)
+        if coefficients is not None:
+            self.coefficients.update(coefficients)
+
+    @classmethod
+    def load(cls, model_file):
+        """
+        Load a model saved with save().
+
+        Parameters:
+        - model_file: The JSON file of the model.
+        """
+        with open(model_file) as file:
+            return cls(json.load(file))
+
+    def save(self, model_file):
+        """
+        Save the coefficients of the model on a JSON file.
+
+        Parameters:
+        - model_file: The JSON file of the model.
+        """
+        tmp_file = model_file + '.tmp'
+        with open(tmp_file, 'w') as file:
+            json.dump(self.coefficients, file, indent=1, sort_keys=True)
+        os.replace(tmp_file, model_file)
+
+    def get_key(self, chart, params):
+        """
+        Get the key of the coefficients of a chart, with its drawing mode.
+
+        Parameters:
+        - chart: The name of the chart, one of batch.CHART_TYPES.
+        - params: The parameters of the chart.
+        """
+        value = params.get(MODE_PARAMS.get(chart))
+        if value is None or value in ('scatter', 'lines'):
+            return chart
+        if chart == 'heatmap':
+            return 'heatmap:pooled'
+        return '%s:%s' % (chart, value)
+
+    def get_features(self, rows, dim, pixels):
+        """
+        Get the features of a chart.
+
+        Parameters:
+        - rows: The number of rows of the front.
+        - dim: The number of objectives of the front.
+        - pixels: The number of pixels of the image.
+        """
+        return np.array([1.0, rows, rows * dim, pixels / 1e6])
+
+    def estimate(self, chart, params, rows, dim, pixels):
+        """
+        Estimate the seconds and the peak memory of a chart.
+
+        Parameters:
+        - chart: The name of the chart.
+        - params: The parameters of the chart.
+        - rows: The number of rows of the front.
+        - dim: The number of objectives of the front.
+        - pixels: The number of pixels of the image.
+
+        Returns:
+        - estimate: Dict with the 'seconds' and the 'memory' in bytes.
+        """
+        key = self.get_key(chart, params)
+        coefficients = self.coefficients.get(key, self.coefficients.get(chart, self.coefficients['default']))
+
+        # The streamed modes only keep a chunk of the rows in memory
+        resident = rows
+        if params.get('chunk_size') is not None and params.get('input_file') is not None and key != chart:
+            resident = min(rows, params['chunk_size'])
+
+        return {'seconds': float(self.get_features(rows, dim, pixels) @ coefficients['seconds']),
+                'memory': float(self.get_features(resident, dim, pixels) @ coefficients['memory'])}
+
+    def fit(self, records):
+        """
+        Fit the coefficients from the measures of some renders.
+
+        The coefficients of each chart and mode are fitted by least squares, keeping them
+        non negative so the estimates grow with the size of the front and the image.
+
+        Parameters:
+        - records: List of dicts with the 'chart', its 'params', the 'rows', 'dim' and
+          'pixels' of the job and the 'seconds' and 'memory' measured, as returned by
+          benchmark() or measure().
+
+        Returns:
+        - The model, with the coefficients of the charts measured replaced.
+        """
+        groups = {}
+        for record in records:
+            key = self.get_key(record['chart'], record['params'])
+            groups.setdefault(key, []).append(record)
+
+        for key, group in groups.items():
+            coefficients = dict(self.coefficients.get(key, self.coefficients['default']))
+            for target in ('seconds', 'memory'):
+                # The memory is not measured on every platform
+                measured = [record for record in group if record[target] is not None]
+                if measured:
+                    features = np.array([self.get_features(record['rows'], record['dim'], record['pixels'])
+                                         for record in measured])
+                    coefficients[target] = fit_non_negative(features, [record[target] for record in measured])
+            self.coefficients[key] = coefficients
+        return self
+
+def fit_non_negative(features, values):
+    """
+    Solve a least squares problem with non negative coefficients, dropping the features
+    whose coefficients are negative until all of them are positive.
+
+    Parameters:
+    - features: Array of shape (samples, features).
+    - values: The value of each sample.
+
+    Returns:
+    - coefficients: List with a coefficient for each feature.
+    """
+    values = np.asarray(values, dtype=float)
+    active = np.ones(features.shape[1], dtype=bool)
+    coefficients = np.zeros(features.shape[1])
+
+    # Scales the features, as their magnitudes are far apart
+    scale = np.abs(features).max(axis=0)
+    scale[scale == 0] = 1
+    scaled = features / scale
+
+    while active.any():
+        solution = np.linalg.lstsq(scaled[:, active], values, rcond=None)[0]
+        if (solution >= 0).all():
+            coefficients[active] = solution
+            break
+        # Drops the most negative coefficient and solves again
+        active[np.flatnonzero(active)[np.argmin(solution)]] = False
+
+    return (coefficients / scale).tolist()
+
+class Planner():
+    def __init__(self, model=None, max_seconds=None, max_memory=None):
+        """
+        Initialize the Planner class.
+
+        The planner estimates the cost of the chart jobs (dicts with the 'chart' name and its
+        'params', as batch.run_job takes them), switches the jobs that do not fit in the
+        budget to cheaper drawing modes or to a lower resolution, and orders them.
+
+        Parameters:
+        - model: Specifies the CostModel of the estimates (default: the default coefficients).
+        - max_seconds: Specifies the seconds a job may take (default: no limit).
+        - max_memory: Specifies the bytes of memory a job may use (default: no limit).
+        """
+        self.model = model
+        self.max_seconds = max_seconds
+        self.max_memory = max_memory
+
+        if self.model is None:
+            self.model = CostModel()
+
+    def get_size(self, params):
+        """
+        Get the number of rows and objectives of the front of a job, reading only the header.
+
+        Parameters:
+        - params: The parameters of the chart.
+        """
+        if 'fronts' in params:
+            sizes = [self.get_size({'data': front} if not isinstance(front, str) else {'input_file': front})
+                     for front in params['fronts']]
+            return sum(rows for rows, _ in sizes), max(dim for _, dim in sizes)
+
+        data = params.get('data')
+        if isinstance(data, dict):
+            return tuple(data['shape'])
+        if isinstance(data, FrontHandle):
+            return tuple(data.shape)
+        if data is not None:
+            return data.shape
+
+        return get_reader(params['input_file']).read_header()
+
+    def get_pixels(self, params):
+        """
+        Get the number of pixels of the image of a job.
+
+        Parameters:
+        - params: The parameters of the chart.
+        """
+        width, height = params.get('figure_size') or FIGURE_SIZE
+        dpi = params.get('dpi') or DPI
+        return width * height * dpi * dpi
+
+    def estimate(self, spec):
+        """
+        Estimate the seconds and the peak memory of a job.
+
+        Parameters:
+        - spec: Dict with the 'chart' name and its 'params'.
+
+        Returns:
+        - estimate: Dict with the 'seconds' and the 'memory' in bytes.
+        """
+        rows, dim = self.get_size(spec['params'])
+        return self.model.estimate(spec['chart'], spec['params'], rows, dim, self.get_pixels(spec['params']))
+
+    def fits(self, estimate):
+        """
+        Check if an estimate is inside the budget.
+        """
+        return ((self.max_seconds is None or estimate['seconds'] <= self.max_seconds) and
+                (self.max_memory is None or estimate['memory'] <= self.max_memory))
+
+    def plan(self, spec):
+        """
+        Choose the most detailed drawing mode and resolution of a job that fit in the budget.
+
+        The drawing modes of DOWNGRADES are tried first, from the one of the job to the
+        cheapest one, and then the resolutions of DPIS. A job that does not fit even so is
+        planned with the cheapest options.
+
+        Parameters:
+        - spec: Dict with the 'chart' name and its 'params'.
+
+        Returns:
+        - spec: The job, with the parameters changed if needed.
+        - estimate: The estimate of the job.
+        """
+        chart, params = spec['chart'], spec['params']
+        estimate = self.estimate(spec)
+        if self.fits(estimate):
+            return spec, estimate
+
+        # Tries the drawing modes cheaper than the one of the job
+        modes = DOWNGRADES.get(chart, [])
+        names = [mode[MODE_PARAMS[chart]] for mode in modes]
+        value = params.get(MODE_PARAMS.get(chart))
+        start = names.index(value) + 1 if value in names else 1
+        candidates = [dict(params, **mode) for mode in modes[start:]]
+
+        cheapest = candidates[-1] if candidates else params
+        for dpi in DPIS:
+            if dpi < (params.get('dpi') or DPI):
+                candidates.append(dict(cheapest, dpi=dpi))
+
+        for candidate in candidates:
+            # The streamed modes only apply to input files
+            if candidate.get('input_file') is None:
+                candidate.pop('chunk_size', None)
+            spec = {'chart': chart, 'params': candidate}
+            estimate = self.estimate(spec)
+            if self.fits(estimate):
+                break
+
+        return spec, estimate
+
+    def schedule(self, specs):
+        """
+        Plan several jobs and order them from the longest one, so the long jobs do not start
+        last and leave the other workers idle.
+
+        Parameters:
+        - specs: List of the jobs.
+
+        Returns:
+        - jobs: List of tuples with the position of the job in specs, the planned job and its
+          estimate, from the longest one. The jobs whose front can not be read are kept as
+          they are, with no cost, so they fail when they run and not the whole plan.
+        """
+        jobs = []
+        for i, spec in enumerate(specs):
+            try:
+                jobs.append((i,) + self.plan(spec))
+            except Exception:
+                jobs.append((i, spec, {'seconds': 0.0, 'memory': 0.0}))
+        return sorted(jobs, key=lambda job: job[2]['seconds'], reverse=True)
+
+def get_peak_memory():
+    """
+    Get the peak resident memory of this process in bytes, or None if it is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_measured(spec):
+    """
+    Plot a job and measure its seconds and the memory it added to the peak of the process.
+    """
+    from batch import run_job
+
+    baseline = get_peak_memory()
+    start = time.perf_counter()
+    run_job(spec, 'benchmark-%d' % os.getpid())
+    seconds = time.perf_counter() - start
+    peak = get_peak_memory()
+    return seconds, None if peak is None else peak - baseline
+
+def measure(spec):
+    """
+    Measure the seconds and the peak memory of a job.
+
+    The job runs in a new process, so the memory of previous jobs is not counted.
+
+    Parameters:
+    - spec: Dict with the 'chart' name and its 'params'.
+
+    Returns:
+    - record: Dict with the 'chart', 'params', 'rows', 'dim', 'pixels', 'seconds' and 'memory'.
+    """
+    planner = Planner()
+    rows, dim = planner.get_size(spec['params'])
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        seconds, memory = executor.submit(run_measured, spec).result()
+
+    params = {name: value for name, value in spec['params'].items() if name not in ('input_file', 'output_file')}
+    return {'chart': spec['chart'], 'params': params, 'rows': int(rows), 'dim': int(dim),
+            'pixels': planner.get_pixels(spec['params']), 'seconds': seconds, 'memory': memory}
+
+def benchmark(charts=None, sizes=((1000, 3), (20000, 3), (1000, 8)), low_dpi=50, directory=None):
+    """
+    Measure the charts on random fronts of several sizes, to fit a CostModel.
+
+    Each chart and drawing mode of DOWNGRADES is plotted for each size at the default
+    resolution, and for the first size at a lower resolution.
+
+    Parameters:
+    - charts: List of the names of the charts (default: the charts of one front of batch).
+    - sizes: List of the (rows, objectives) of the fronts.
+    - low_dpi: The lower resolution measured.
+    - directory: Directory for the fronts and the images (default: a temporary directory).
+
+    Returns:
+    - records: The list of the measures, for CostModel.fit().
+    """
+    if charts is None:
+        charts = ['plot2d', 'plot3d', 'parallel', 'radar', 'heatmap', 'bubble', 'scatter_matrix', 'projection']
+
+    records = []
+    with tempfile.TemporaryDirectory(dir=directory) as tmp_dir:
+        rng = np.random.default_rng(0)
+        fronts = {}
+        for rows, dim in sizes:
+            fronts[rows, dim] = os.path.join(tmp_dir, 'front_%d_%d.npy' % (rows, dim))
+            np.save(fronts[rows, dim], rng.random((rows, dim)))
+
+        for chart in charts:
+            for mode in DOWNGRADES.get(chart, [{}]):
+                for i, (rows, dim) in enumerate(sizes):
+                    for dpi in ([None, low_dpi] if i == 0 else [None]):
+                        params = dict(mode, input_file=fronts[rows, dim], title='benchmark',
+                                      output_file=os.path.join(tmp_dir, 'chart.png'))
+                        if dpi is not None:
+                            params['dpi'] = dpi
+                        records.append(measure({'chart': chart, 'params': params}))
+
+    return records
+
+def main():
+    """
+    Command line of the planner: benchmark MODEL measures the charts on this host and saves
+    the fitted CostModel, to be used with batch.py add --plan --model MODEL.
+    """
+    parser = argparse.ArgumentParser(description='Fit the cost model of the charts')
+    parser.add_argument('command', choices=['benchmark'])
+    parser.add_argument('model')
+    parser.add_argument('--records', default=None, help='JSON file where the measures are saved')
+    args = parser.parse_args()
+
+    records = benchmark()
+    if args.records is not None:
+        with open(args.records, 'w') as file:
+            json.dump(records, file, indent=1)
+    CostModel().fit(records).save(args.model)
+
+if __name__ == '__main__':
+    main()
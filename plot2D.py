@@ -4,7 +4,8 @@ class Plot2D(BaseVisualization):
     def __init__(self, output_file, data=None, input_file=None, title=None, subtitle=None, min_values=None,
                  max_values=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
                  label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
-                 scatter_size=None, figure_size=None, input_values=None):
+                 scatter_size=None, figure_size=None, input_values=None, mode=None, chunk_size=None, bins=None,
+                 sample_size=None):
         """
         Initialize the Plot2D class, inheriting from BaseVisualization.
 
@@ -27,44 +28,137 @@ class Plot2D(BaseVisualization):
         - scatter_size: Specifies the size of scatter plot markers.
         - figure_size: Specifies the size of the figure or plot.
         - input_values: Specifies the input values used in the visualization.
+        - mode: Specifies how the points are drawn: 'scatter' (default), 'density' or 'downsample'.
+        - chunk_size: Specifies the number of rows streamed at a time from the input_file in the
+          'density' and 'downsample' modes.
+        - bins: Specifies the number of bins per axis of the 'density' mode.
+        - sample_size: Specifies the number of points kept by the 'downsample' mode.
         """
         super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle, min_values=min_values,
                          max_values=max_values, title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
                          ticks_size=ticks_size, label_pad=label_pad, major_grid_line_width=major_grid_line_width,
                          minor_grid_line_width=minor_grid_line_width, ticks_pad=ticks_pad, scatter_size=scatter_size,
-                         figure_size=figure_size, input_values=input_values)
+                         figure_size=figure_size, input_values=input_values, chunk_size=chunk_size)
 
-    def plot(self):
+        self.mode = mode
+        self.bins = bins
+        self.sample_size = sample_size
+
+        # Only the first two objectives are drawn
+        self.columns = [0, 1]
+
+        # Labels of the axes
+        self.x_label = "$f_1$"
+        self.y_label = "$f_2$"
+
+    def set_values(self):
         """
-        Plot a 2D scatter plot based on the specified parameters.
+        Set default values for visualization attributes if not provided.
         """
-        # Sets all the values necessaries for formatting the specific chart
-        self.set_data()
-        self.set_summary()
-        self.set_min_max_values()
+        if self.mode is None:
+            self.mode = 'scatter'
 
-        # Sets the default values if needed
-        self.set_default_values()
+        if self.mode not in ('scatter', 'density', 'downsample'):
+            raise Exception("Unsupported mode: %s" % self.mode)
 
-        # Set the figure size of the figure based on the min and max values
-        self.input_values = self.min_values + self.max_values
-        self.set_figure_size()
+        if self.bins is None:
+            self.bins = 500
+
+        if self.sample_size is None:
+            self.sample_size = 10000
+
+    def set_mode(self, mode):
+        """
+        Set the drawing mode of the visualization.
+
+        Parameters:
+        - mode: 'scatter', 'density' or 'downsample'.
+        """
+        self.mode = mode
+
+    def get_mode(self):
+        """
+        Gets the mode attribute.
+        """
+        return self.mode
+
+    def get_density(self):
+        """
+        Accumulate the 2D histogram of the first two objectives over the chunks of the data.
+
+        Returns:
+        - counts: Array of shape (bins, bins) with the number of points of each cell.
+        """
+        counts = np.zeros((self.bins, self.bins))
+        bounds = [[self.min_values[0], self.max_values[0]],
+                  [self.min_values[1], self.max_values[1]]]
+
+        for chunk in self.iter_chunks():
+            chunk_counts, _, _ = np.histogram2d(chunk[0].to_numpy(dtype=float),
+                                                chunk[1].to_numpy(dtype=float),
+                                                bins=self.bins, range=bounds)
+            counts += chunk_counts
+
+        return counts
+
+    def get_sample(self):
+        """
+        Draw a uniform random sample of sample_size points over the chunks of the data.
+
+        Each point receives a random key and only the points with the smallest keys seen so
+        far are kept, so the whole front is never held in memory.
+
+        Returns:
+        - sample: Pandas frame with the sampled points.
+        """
+        rng = np.random.default_rng(0)
+        sample = None
+        keys = None
+
+        for chunk in self.iter_chunks():
+            chunk_keys = rng.random(chunk.shape[0])
+            if sample is not None:
+                chunk = pd.concat([sample, chunk])
+                chunk_keys = np.concatenate([keys, chunk_keys])
+
+            # Keeps the points with the smallest keys
+            if chunk.shape[0] > self.sample_size:
+                selected = np.argpartition(chunk_keys, self.sample_size)[:self.sample_size]
+                chunk = chunk.iloc[selected]
+                chunk_keys = chunk_keys[selected]
+
+            sample = chunk
+            keys = chunk_keys
+
+        return sample.sort_index()
+
+    def draw_extras(self, ax):
+        """
+        Draw additional elements over the points. Charts built on Plot2D override it.
 
+        Parameters:
+        - ax: The axes of the chart.
+        """
+        pass
+
+    def draw(self, ax):
+        """
+        Draw the points, the grid and the labels of the chart on an axes.
+
+        The values of the chart must be already set, as plot() does.
+
+        Parameters:
+        - ax: The axes where the chart is drawn.
+        """
         # Obtains the list of ticks based on the min and max values
         xticks = self.calculate_tick_locations(
             self.min_values[0], self.max_values[0])
         yticks = self.calculate_tick_locations(
             self.min_values[1], self.max_values[1])
         
-        # Creates the figure
-        fig, ax = plt.subplots()
-
-        # Set the figure size of the figure based on the min and max values
-        ax.get_figure().set_size_inches(self.figure_size)
-
         # Plots the ticks in the 2 dimensions
-        plt.xticks(xticks)
-        plt.yticks(yticks)
+        ax.set_xticks(xticks)
+        ax.set_yticks(yticks)
 
         # Sets the locations of the ticks for both axes
         ax.xaxis.set_major_locator(ticker.MaxNLocator(len(xticks)))
@@ -103,14 +197,76 @@ class Plot2D(BaseVisualization):
         ax.set_ylim(ylims)
 
         # Formats the scatter dots
-        plt.scatter(self.data[0],
-                    self.data[1],
-                    s=self.scatter_size,
-                    alpha=1,
-                    color='darkblue')
+        if self.mode == 'density':
+            # Draws the number of points of each cell instead of the points
+            counts = self.get_density()
+
+            # Uses the darker part of the colormap so that cells with a single point are visible
+            cmap = colors.ListedColormap(mpl.colormaps['Blues'](np.linspace(0.4, 1, 256)))
+            ax.imshow(np.ma.masked_equal(counts.T, 0),
+                      origin='lower',
+                      extent=[self.min_values[0], self.max_values[0],
+                              self.min_values[1], self.max_values[1]],
+                      aspect='auto',
+                      interpolation='nearest',
+                      cmap=cmap,
+                      norm=colors.LogNorm(vmin=1, vmax=max(counts.max(), 1)),
+                      zorder=2)
+        else:
+            points = self.data if self.mode == 'scatter' else self.get_sample()
+            ax.scatter(points[0],
+                       points[1],
+                       s=self.scatter_size,
+                       alpha=1,
+                       color='darkblue')
+
+        self.draw_extras(ax)
+
+        # Formats the font size of the ticks
+        ax.tick_params(axis='x', labelsize=self.ticks_size)
+        ax.tick_params(axis='y', labelsize=self.ticks_size)
+
+        # Sets the label and format for both axes
+        ax.set_xlabel(self.x_label,
+                      fontsize=self.label_size,
+                      labelpad=self.label_pad)
+        ax.set_ylabel(self.y_label,
+                      fontsize=self.label_size,
+                      labelpad=self.label_pad)
+
+    def plot(self):
+        """
+        Plot a 2D scatter plot based on the specified parameters.
+        """
+        # Sets all the values necessaries for formatting the specific chart
+        self.set_values()
+
+        # Loads the front unless it is streamed in chunks
+        if self.mode == 'scatter' or not self.use_chunks():
+            self.set_data()
+        self.set_summary()
+        self.set_min_max_values()
+
+        # Sets the default values if needed
+        self.set_default_values()
+
+        # Set the figure size of the figure based on the min and max values
+        self.input_values = self.min_values + self.max_values
+        self.set_figure_size()
+
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
+        # Creates the figure with the size based on the min and max values
+        fig = self.create_figure(figsize=self.figure_size)
+        ax = fig.add_subplot()
+
+        # Draws the points, the grid and the labels
+        self.draw(ax)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                      fontweight='bold',
                      family='monospace',
@@ -126,20 +282,6 @@ class Plot2D(BaseVisualization):
                     fontsize=self.subtitle_size,
                     style='italic')
 
-        # Formats the font size of the ticks
-        plt.xticks(fontsize=self.ticks_size)
-        plt.yticks(fontsize=self.ticks_size)
-
-        # Sets the label and format for both axes
-        plt.xlabel("$f_1$",
-                   fontsize=self.label_size,
-                   labelpad=self.label_pad)
-        plt.ylabel("$f_2$",
-                   fontsize=self.label_size,
-                   labelpad=self.label_pad)
-
-        # Saves the figure as a file
-        plt.savefig(self.output_file)
-
-        # Closes the image
-        plt.close()
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
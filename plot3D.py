@@ -34,6 +34,19 @@ class Plot3D(BaseVisualization):
                          minor_grid_line_width=minor_grid_line_width, ticks_pad=ticks_pad, scatter_size=scatter_size,
                          figure_size=figure_size, input_values=input_values)
 
+        # Only the first three objectives are drawn
+        self.columns = [0, 1, 2]
+
+        # Initializes the views for the resulting images
+        self.views = [[30, 45], [45, -45],  [45, 135], [30, 30], [30, 60]]
+
+    def get_output_files(self):
+        """
+        Get the list of the files written by the chart, one for each view.
+        """
+        return [self.output_file[:-4] + '_' + str(idx) + self.output_file[-4:]
+                for idx in range(1, len(self.views) + 1)]
+
     def plot(self):
         """
         Plot a 3D scatter plot based on the specified parameters.
@@ -53,6 +66,10 @@ class Plot3D(BaseVisualization):
         self.input_values = self.min_values + self.max_values
         self.set_figure_size()
 
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
         # Obtains the list of ticks based on the min and max values
         xticks = self.calculate_tick_locations(
             self.min_values[0], self.max_values[0])
@@ -61,13 +78,11 @@ class Plot3D(BaseVisualization):
         zticks = self.calculate_tick_locations(
             self.min_values[2], self.max_values[2])
 
-        # Creates the figure
-        fig, ax = plt.subplots()
-        fig = plt.figure(figsize=(10, 10))
+        # Creates the figure with the size based on the min and max values
+        fig = self.create_figure(figsize=self.figure_size)
 
-        # Adjusts the subplot to 3d and the figure size
+        # Adjusts the subplot to 3d
         ax = fig.add_subplot(projection="3d")
-        ax.get_figure().set_size_inches(self.figure_size)
 
         # Obtains the labels for the ticks
         x_labels = [str(val) for val in xticks]
@@ -79,8 +94,8 @@ class Plot3D(BaseVisualization):
                    self.data[2], s=self.scatter_size, alpha=1)
         
         # Plots the ticks and labels in the 3 dimensions
-        plt.xticks(xticks, labels=x_labels)
-        plt.yticks(yticks, labels=y_labels)
+        ax.set_xticks(xticks, labels=x_labels)
+        ax.set_yticks(yticks, labels=y_labels)
         ax.set_zticks(zticks, minor=False)
         ax.set_zticklabels(z_labels)
 
@@ -114,33 +129,25 @@ class Plot3D(BaseVisualization):
                 zorder=0)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                      fontweight='bold',
                      family='monospace',
                      y=0.97)
 
         # Sets the label for the axes
-        plt.xlabel("$f_1$", fontsize=self.label_size, labelpad=self.label_pad)
-        plt.ylabel("$f_2$", fontsize=self.label_size, labelpad=self.label_pad)
+        ax.set_xlabel("$f_1$", fontsize=self.label_size, labelpad=self.label_pad)
+        ax.set_ylabel("$f_2$", fontsize=self.label_size, labelpad=self.label_pad)
         ax.set_zlabel("$f_3$", fontsize=self.label_size,
                       rotation=0, labelpad=self.label_pad)
 
         # Disables the automatic rotation
         ax.zaxis.set_rotate_label(False)  
 
-        # Initializes the views for the resulting images
-        views = [[30, 45], [45, -45],  [45, 135], [30, 30], [30, 60]]
-
         # For each view, it rotates the view and saves the images
-        idx = 0
-        for v in views:
-            idx += 1
+        for v, formatted_path in zip(self.views, self.get_output_files()):
             ax.view_init(v[0], v[1])
-            formatted_path = self.output_file[:-4] + \
-                '_' + str(idx) + self.output_file[-4:]
-
-            plt.savefig(formatted_path)
+            self.save_figure(fig, formatted_path)
 
-        # Closes the image
-        plt.close()
+        # Adds the images to the cache
+        self.store_cached()
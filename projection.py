@@ -0,0 +1,277 @@
+from plot2D import *
+from front_reader import summarize
+
+class ProjectionPlot(Plot2D):
+    def __init__(self, output_file, data=None, input_file=None, title=None, subtitle=None, min_values=None,
+                 max_values=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
+                 label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
+                 scatter_size=None, figure_size=None, input_values=None, mode=None, chunk_size=None, bins=None,
+                 sample_size=None, method=None, random_state=None):
+        """
+        Initialize the ProjectionPlot class, inheriting from Plot2D.
+
+        All the objectives of the front are mapped to the plane with a single matrix product,
+        and the projected points are drawn as a Plot2D, so the 'density' and 'downsample'
+        modes can be used for large fronts.
+
+        Parameters:
+        - input_file: Specifies an input file that may be used for the visualization.
+        - output_file: Specifies the output file where the visualization will be saved.
+        - data: Specifies the data to be visualized.
+        - title: Specifies the title of the visualization.
+        - subtitle: Specifies the subtitle of the visualization.
+        - min_values: Specifies the minimum values of the projected axes.
+        - max_values: Specifies the maximum values of the projected axes.
+        - title_size: Specifies the font size of the title.
+        - subtitle_size: Specifies the font size of the subtitle.
+        - label_size: Specifies the font size of the labels.
+        - ticks_size: Specifies the size of the ticks in the visualization.
+        - label_pad: Specifies the padding between labels and the visualization.
+        - major_grid_line_width: Specifies the line width of major grid lines.
+        - minor_grid_line_width: Specifies the line width of minor grid lines.
+        - ticks_pad: Specifies the padding between ticks and the visualization.
+        - scatter_size: Specifies the size of scatter plot markers.
+        - figure_size: Specifies the size of the figure or plot.
+        - input_values: Specifies the input values used in the visualization.
+        - mode: Specifies how the points are drawn: 'scatter' (default), 'density' or 'downsample'.
+        - chunk_size: Specifies the number of rows streamed at a time from the input_file in the
+          'density' and 'downsample' modes.
+        - bins: Specifies the number of bins per axis of the 'density' mode.
+        - sample_size: Specifies the number of points kept by the 'downsample' mode.
+        - method: Specifies the projection: 'radviz' (default), 'pca' or 'random'.
+        - random_state: Specifies the seed of the 'random' projection.
+        """
+        super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle, min_values=min_values,
+                         max_values=max_values, title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
+                         ticks_size=ticks_size, label_pad=label_pad, major_grid_line_width=major_grid_line_width,
+                         minor_grid_line_width=minor_grid_line_width, ticks_pad=ticks_pad, scatter_size=scatter_size,
+                         figure_size=figure_size, input_values=input_values, mode=mode, chunk_size=chunk_size, bins=bins,
+                         sample_size=sample_size)
+
+        self.method = method
+        self.random_state = random_state
+        self.matrix = None
+        self.offset = None
+
+        # All the objectives are projected
+        self.columns = None
+
+    def set_values(self):
+        """
+        Set default values for visualization attributes if not provided.
+        """
+        super().set_values()
+
+        if self.method is None:
+            self.method = 'radviz'
+
+        if self.method not in ('radviz', 'pca', 'random'):
+            raise Exception("Unsupported method: %s" % self.method)
+
+        if self.random_state is None:
+            self.random_state = 0
+
+        # The axes of the projections have no units
+        labels = {'radviz': ("", ""), 'pca': ("$PC_1$", "$PC_2$"), 'random': ("$z_1$", "$z_2$")}
+        self.x_label, self.y_label = labels[self.method]
+
+    def set_method(self, method):
+        """
+        Set the projection of the visualization.
+
+        Parameters:
+        - method: 'radviz', 'pca' or 'random'.
+        """
+        self.method = method
+
+    def get_method(self):
+        """
+        Gets the method attribute.
+        """
+        return self.method
+
+    def iter_objectives(self):
+        """
+        Iterate over the values of the objectives before the projection.
+
+        The rows with missing values are dropped, as they have no position in the plane.
+
+        Returns:
+        - Tuples with the array of values and the index of the rows of each chunk.
+        """
+        for chunk in super().iter_chunks():
+            values = chunk.to_numpy(dtype=float)
+            keep = ~np.isnan(values).any(axis=1)
+            yield values[keep], chunk.index[keep]
+
+    def set_projection(self):
+        """
+        Compute the linear map from the objectives to the plane in a single pass over the data.
+
+        The objectives are normalized to [0, 1] before the projection. The normalization is
+        folded into the matrix, so projecting a block of points is one matrix product.
+        """
+        count = 0
+        low = None
+        high = None
+        total = None
+        products = None
+        reference = None
+
+        # Accumulates the bounds, the sums and, for the PCA, the sums of the products
+        for values, _ in self.iter_objectives():
+            if values.shape[0] == 0:
+                continue
+            if reference is None:
+                reference = values[0]
+                low = np.full(values.shape[1], np.inf)
+                high = np.full(values.shape[1], -np.inf)
+                total = np.zeros(values.shape[1])
+                products = np.zeros((values.shape[1], values.shape[1]))
+
+            # Shifts the values by the first row to keep the sums of products accurate
+            shifted = values - reference
+            count += values.shape[0]
+            low = np.minimum(low, values.min(axis=0))
+            high = np.maximum(high, values.max(axis=0))
+            total += shifted.sum(axis=0)
+            if self.method == 'pca':
+                products += shifted.T @ shifted
+
+        if count == 0:
+            raise Exception("There are no points to project")
+        if low.shape[0] < 2:
+            raise Exception("The projection needs at least 2 objectives")
+
+        width = high - low
+        width[width == 0] = 1
+        mean = reference + total / count
+
+        if self.method == 'radviz':
+            # Places an anchor for each objective on the unit circle. The last column of
+            # the matrix sums the normalized values, which divide the weighted anchors.
+            angles = 2 * np.pi * np.arange(low.shape[0]) / low.shape[0]
+            basis = np.column_stack([np.cos(angles), np.sin(angles), np.ones(low.shape[0])])
+            self.matrix = basis / width[:, None]
+            self.offset = -(low / width) @ basis
+            return
+
+        if self.method == 'pca':
+            # Takes the two main components of the covariance of the normalized objectives
+            mean_shift = total / count
+            covariance = (products - count * np.outer(mean_shift, mean_shift)) / max(count - 1, 1)
+            covariance /= np.outer(width, width)
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            basis = eigenvectors[:, np.argsort(eigenvalues)[::-1][:2]]
+
+            # Fixes the sign of each component, so the same front gives the same image
+            signs = np.sign(basis[np.abs(basis).argmax(axis=0), [0, 1]])
+            basis = basis * np.where(signs == 0, 1, signs)
+        else:
+            rng = np.random.default_rng(self.random_state)
+            basis = rng.standard_normal((low.shape[0], 2)) / np.sqrt(2)
+
+        # Centers the projected points on the mean of the front
+        self.matrix = basis / width[:, None]
+        self.offset = -(mean / width) @ basis
+
+    def project(self, values):
+        """
+        Project a block of points to the plane.
+
+        Parameters:
+        - values: Array of shape (rows, objectives) with the values of the points.
+
+        Returns:
+        - Array of shape (rows, 2) with the coordinates of the points.
+        """
+        coordinates = values @ self.matrix + self.offset
+        if self.method != 'radviz':
+            return coordinates
+
+        # Points with all the objectives at their minimum stay at the center
+        sums = coordinates[:, 2:]
+        return np.divide(coordinates[:, :2], sums, out=np.zeros_like(coordinates[:, :2]),
+                         where=sums != 0)
+
+    def iter_chunks(self):
+        """
+        Iterate over the projected points in blocks of chunk_size rows.
+
+        If the data is loaded it is already projected, otherwise each chunk of the
+        input_file is projected as it is read.
+        """
+        if self.data is not None:
+            yield self.data
+            return
+
+        for values, index in self.iter_objectives():
+            yield pd.DataFrame(self.project(values), index=index, copy=False)
+
+    def set_summary(self):
+        """
+        Set the summary statistics of the projected points.
+        """
+        if self.use_chunks():
+            self.summary = summarize(self.iter_chunks())
+        else:
+            self.summary = self.data.describe()
+
+    def set_min_max_values(self):
+        """
+        Set default values for attributes if they are not provided.
+
+        The axes of the 'radviz' projection always show the circle of the anchors.
+        """
+        if self.method == 'radviz':
+            if self.min_values is None:
+                self.min_values = [-1.2, -1.2]
+            if self.max_values is None:
+                self.max_values = [1.2, 1.2]
+
+        super().set_min_max_values()
+
+    def set_bounds(self, bounds):
+        """
+        The bounds of the objectives do not apply to the projected axes, so a projection
+        keeps its own min and max values.
+        """
+        raise Exception("The bounds of the objectives can not be used as the axes of a projection")
+
+    def draw_extras(self, ax):
+        """
+        Draw the circle and the anchors of the objectives of the 'radviz' projection.
+
+        Parameters:
+        - ax: The axes of the chart.
+        """
+        if self.method != 'radviz':
+            return
+
+        dim = self.matrix.shape[0]
+        angles = 2 * np.pi * np.arange(dim) / dim
+        circle = np.linspace(0, 2 * np.pi, 361)
+        ax.plot(np.cos(circle), np.sin(circle), color='gray', linewidth=self.major_grid_line_width, zorder=3)
+        ax.scatter(np.cos(angles), np.sin(angles), s=self.scatter_size * 4, color='darkred', zorder=4)
+
+        # Labels each anchor with its objective, outside of the circle
+        for i, angle in enumerate(angles):
+            ax.text(1.08 * np.cos(angle), 1.08 * np.sin(angle), f'$f_{{{i + 1}}}$',
+                    ha='center', va='center', fontsize=self.ticks_size, zorder=4)
+
+    def plot(self):
+        """
+        Plot the projection of the front based on the specified parameters.
+        """
+        # Loads the front unless it is streamed in chunks
+        self.set_values()
+        if self.mode == 'scatter' or not self.use_chunks():
+            self.set_data()
+
+        # Projects the loaded front once, the streamed chunks are projected as they are read
+        self.set_projection()
+        if self.data is not None:
+            values, index = next(self.iter_objectives())
+            self.data = pd.DataFrame(self.project(values), index=index, copy=False)
+
+        super().plot()
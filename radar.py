@@ -4,7 +4,8 @@ class RadarChart(BaseVisualization):
     def __init__(self, output_file, data=None, input_file=None, title=None, subtitle=None, min_value=None,
                  max_value=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
                  label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
-                 scatter_size=None, figure_size=None, minor=False, line_width=None, input_values=None):
+                 scatter_size=None, figure_size=None, minor=False, line_width=None, input_values=None, mode=None,
+                 highlight=None):
         """
         Initialize the RadarChart class, inheriting from BaseVisualization.
         
@@ -29,6 +30,11 @@ class RadarChart(BaseVisualization):
         - minor: Specifies whether to use minor grid lines.
         - line_width: Specifies the line width of the radar chart.
         - input_values: Specifies the input values used in the visualization.
+        - mode: Specifies how the solutions are drawn: 'lines' (default) draws a polygon per
+          solution and 'envelope' draws the quantiles of each objective as filled bands.
+        - highlight: Specifies the solutions drawn over the others: a list of row positions (e.g.
+          the result of a FrontIndex query), a dict with the (low, high) range of some objectives,
+          or 'extremes' for the solutions with the minimum value of each objective.
         """
         super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle,
                          title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
@@ -40,6 +46,8 @@ class RadarChart(BaseVisualization):
         self.line_width = line_width
         self.min_value = min_value
         self.max_value = max_value
+        self.mode = mode
+        self.highlight = highlight
 
     def set_values(self):
         """
@@ -54,6 +62,12 @@ class RadarChart(BaseVisualization):
         if self.line_width is None:
             self.line_width = self.font_size*0.02
 
+        if self.mode is None:
+            self.mode = 'lines'
+
+        if self.mode not in ('lines', 'envelope'):
+            raise Exception("Unsupported mode: %s" % self.mode)
+
     def set_min_value(self, value):
         """
         Set the minimum value attribute.
@@ -99,32 +113,65 @@ class RadarChart(BaseVisualization):
         """
         return self.line_width
 
-    def plot(self):
+    def set_mode(self, mode):
         """
-        Plot a radar chart based on the specified parameters.
+        Set the drawing mode of the visualization.
+
+        Parameters:
+        - mode: 'lines' or 'envelope'.
         """
-        # Sets all the values necessaries for formatting the specific chart
-        self.set_data()
-        self.set_summary()
-        self.set_min_max_values()
-        self.set_dim()
-        self.set_values()
+        self.mode = mode
 
-        # Sets the subtitle size, label padding and ticks size for this specific chart
-        if self.subtitle_size is None:
-            self.set_subtitle_size(self.font_size + 10)
-        if self.label_pad is None:
-            self.set_label_pad(self.font_size)
-        if self.ticks_size is None:
-            self.set_ticks_size(self.font_size * 0.75)
-        
-        # Sets the default values if needed
-        self.set_default_values()
+    def get_mode(self):
+        """
+        Gets the mode attribute.
+        """
+        return self.mode
 
-        # Set the figure size of the figure based on the min and max values
-        self.input_values = [self.min_value, self.max_value]
-        self.set_figure_size()
+    def set_highlight(self, highlight):
+        """
+        Set the solutions drawn over the others.
+
+        Parameters:
+        - highlight: List of row positions, dict of ranges, 'extremes' or None.
+        """
+        self.highlight = highlight
+
+    def get_highlight(self):
+        """
+        Gets the highlight attribute.
+        """
+        return self.highlight
+
+    def get_quantiles(self):
+        """
+        Compute the min, first quartile, median, third quartile and max of each objective.
+
+        Returns:
+        - quantiles: Array of shape (5, dim) with a row for each quantile.
+        """
+        values = self.data.to_numpy(dtype=float)[:, :self.dim]
+        return np.nanquantile(values, [0, 0.25, 0.5, 0.75, 1], axis=0)
+
+    def get_highlighted(self):
+        """
+        Get the values of the solutions drawn over the others.
 
+        Returns:
+        - values: Array of shape (solutions, dim), empty if there is nothing to highlight.
+        """
+        values = self.data.to_numpy(dtype=float)[:, :self.dim]
+        return values[self.get_highlight_rows(self.highlight)]
+
+    def draw(self, ax):
+        """
+        Draw the solutions, the grid and the labels of the chart on a polar axes.
+
+        The values of the chart must be already set, as plot() does.
+
+        Parameters:
+        - ax: The polar axes where the chart is drawn.
+        """
         # Obtains the list of ticks based on the min and max values
         ranges = self.calculate_tick_locations(self.min_value, self.max_value)
 
@@ -134,17 +181,28 @@ class RadarChart(BaseVisualization):
         # Adds the last angle at the end to close the circle
         angles += [angles[0]]
 
-        # Creates the figure
-        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={
-            'polar': True})
-
-        # For each row in the data it creates a line and adjusts the figure size
-        for i in range(len(self.data)):
-            values = self.data.iloc[i].values.tolist()
-            line_values = values + [values[0]]
-            ax.plot(angles, line_values, color='darkred',
-                    linewidth=self.line_width)
-            ax.get_figure().set_size_inches(self.figure_size)
+        if self.mode == 'envelope':
+            # Draws the range and the quartiles of each objective as bands, and the median
+            quantiles = self.get_quantiles()
+            quantiles = np.concatenate([quantiles, quantiles[:, :1]], axis=1)
+            ax.fill_between(angles, quantiles[0], quantiles[4], color='darkred', alpha=0.15,
+                            linewidth=0, zorder=2)
+            ax.fill_between(angles, quantiles[1], quantiles[3], color='darkred', alpha=0.35,
+                            linewidth=0, zorder=2)
+            ax.plot(angles, quantiles[2], color='darkred', linewidth=self.line_width * 2, zorder=3)
+        else:
+            # For each row in the data it creates a line
+            for i in range(len(self.data)):
+                values = self.data.iloc[i].values.tolist()
+                line_values = values + [values[0]]
+                ax.plot(angles, line_values, color='darkred',
+                        linewidth=self.line_width)
+
+        # Draws the highlighted solutions over the others
+        for values in self.get_highlighted():
+            line_values = np.append(values, values[0])
+            ax.plot(angles, line_values, color='darkblue', linewidth=self.line_width * 2,
+                    linestyle='--', zorder=4)
 
         # Sets the color and width of the major grid line
         ax.grid(which='major',
@@ -185,11 +243,49 @@ class RadarChart(BaseVisualization):
         # Adjusts the rotation of the label
         ax.tick_params(axis='y', labelrotation=270)
 
+    def plot(self):
+        """
+        Plot a radar chart based on the specified parameters.
+        """
+        # Sets all the values necessaries for formatting the specific chart
+        self.set_data()
+        self.set_summary()
+        self.set_min_max_values()
+        self.set_dim()
+        self.set_values()
+
+        # Sets the subtitle size, label padding and ticks size for this specific chart
+        if self.subtitle_size is None:
+            self.set_subtitle_size(self.font_size + 10)
+        if self.label_pad is None:
+            self.set_label_pad(self.font_size)
+        if self.ticks_size is None:
+            self.set_ticks_size(self.font_size * 0.75)
+        
+        # Sets the default values if needed
+        self.set_default_values()
+
+        # Set the figure size of the figure based on the min and max values
+        self.input_values = [self.min_value, self.max_value]
+        self.set_figure_size()
+
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
+        # Creates the figure
+        fig = self.create_figure(figsize=(6, 6))
+        ax = fig.add_subplot(polar=True)
+
+        # Draws the solutions, the grid and the labels, and adjusts the figure size
+        self.draw(ax)
+        fig.set_size_inches(self.figure_size)
+
         # Adjusts the space between plots
-        plt.subplots_adjust(wspace=0)
+        fig.subplots_adjust(wspace=0)
 
         # Sets the format for the title
-        plt.suptitle(self.title,
+        fig.suptitle(self.title,
                      fontsize=self.title_size,
                      fontweight='bold',
                      family='monospace',
@@ -207,8 +303,6 @@ class RadarChart(BaseVisualization):
             fig.text(0.5, suptitle_pos[1] - 0.05, self.subtitle,
                      ha='center', fontsize=self.subtitle_size, style='italic')
 
-        # Saves the figure as a file
-        plt.savefig(self.output_file)
-
-        # Closes the image
-        plt.close()
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.colors import Colormap
+
+# The manifest is locked between processes where the system has fcntl
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Version of the charts, to be increased when a change of the code changes the images
+CACHE_VERSION = 1
+
+class RenderCache():
+    def __init__(self, cache_dir, max_size=None, link=True):
+        """
+        Initialize the RenderCache class.
+
+        The cache keeps the images of the rendered charts, indexed by a hash of the data, the
+        resolved parameters of the chart, the chart class and the versions of the code, so
+        a chart that did not change is copied instead of rendered again. Several processes
+        can use the same cache_dir: the manifest is read again and saved while the file
+        manifest.lock is locked, so no process drops the entries of another one.
+
+        Parameters:
+        - cache_dir: Specifies the directory where the images and the manifest are kept.
+        - max_size: Specifies the maximum size in bytes of the cached images. The least
+          recently used images are removed when it is exceeded (default: no limit).
+        - link: Specifies whether the cached images are hard linked to the output files
+          instead of copied, when the file system allows it.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.link = link
+        self.lock = threading.Lock()
+        self.manifest_file = os.path.join(cache_dir, 'manifest.json')
+        self.lock_file = os.path.join(cache_dir, 'manifest.lock')
+        self.manifest_stamp = None
+        self.entries = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with self.locked():
+            pass
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold the manifest, for the other threads and for the other processes that use the
+        cache_dir, with the entries read again if another process changed the manifest.
+        """
+        with self.lock:
+            with open(self.lock_file, 'a') as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                self.load_manifest()
+                yield
+
+    def load_manifest(self):
+        """
+        Read the entries of the manifest, if it changed since it was last read or saved.
+        """
+        try:
+            stat = os.stat(self.manifest_file)
+        except FileNotFoundError:
+            self.entries = {}
+            self.manifest_stamp = None
+            return
+
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp != self.manifest_stamp:
+            with open(self.manifest_file) as file:
+                self.entries = json.load(file)
+            self.manifest_stamp = stamp
+
+    def save_manifest(self):
+        """
+        Save the manifest with the entries of the cache. The manifest must be held (see locked).
+        """
+        tmp_file = '%s.tmp-%d-%d' % (self.manifest_file, os.getpid(), threading.get_ident())
+        with open(tmp_file, 'w') as file:
+            json.dump(self.entries, file, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
+
+        stat = os.stat(self.manifest_file)
+        self.manifest_stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get_key(self, chart):
+        """
+        Compute the key of a chart.
+
+        Parameters:
+        - chart: The chart, with its parameters already resolved.
+
+        Returns:
+        - The hexadecimal sha256 of the data, the parameters, the class and the versions.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            'class': type(chart).__module__ + '.' + type(chart).__name__,
+            'version': CACHE_VERSION,
+            'matplotlib': matplotlib.__version__,
+            'data': chart.get_data_hash(),
+            'params': chart.get_params(),
+        }, sort_keys=True, default=encode_value).encode())
+        return digest.hexdigest()
+
+    def copy_file(self, source, target, link=False):
+        """
+        Hard link or copy a file, replacing the target.
+
+        Parameters:
+        - source: The file to copy.
+        - target: The path of the copy.
+        - link: Specifies whether to try a hard link first.
+        """
+        if os.path.exists(target):
+            os.remove(target)
+        if link:
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, target)
+
+    def restore(self, key, output_files):
+        """
+        Copy the cached images of a key to the output files.
+
+        Parameters:
+        - key: The key of the chart.
+        - output_files: List of the files the chart writes.
+
+        Returns:
+        - True if the images were in the cache and were copied, False otherwise.
+        """
+        with self.locked():
+            entry = self.entries.get(key)
+            if entry is None or len(entry['files']) != len(output_files):
+                return False
+
+            cached_files = [os.path.join(self.cache_dir, name) for name in entry['files']]
+            if not all(os.path.exists(path) for path in cached_files):
+                return False
+
+            for source, target in zip(cached_files, output_files):
+                self.copy_file(source, target, link=self.link)
+
+            entry['used'] = time.time()
+            self.save_manifest()
+            return True
+
+    def release(self, output_files):
+        """
+        Remove the output files that are hard links to cached images, so rendering the chart
+        again does not overwrite the cached images.
+
+        Parameters:
+        - output_files: List of the files the chart writes.
+        """
+        for path in output_files:
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                os.remove(path)
+
+    def store(self, key, output_files):
+        """
+        Add the images written by a chart to the cache.
+
+        The images are copied, never linked, so the output files can be changed afterwards.
+
+        Parameters:
+        - key: The key of the chart.
+        - output_files: List of the files written by the chart.
+        """
+        with self.locked():
+            names = []
+            size = 0
+            for idx, path in enumerate(output_files):
+                name = '%s_%d%s' % (key, idx, os.path.splitext(path)[1])
+                self.copy_file(path, os.path.join(self.cache_dir, name))
+                names.append(name)
+                size += os.path.getsize(path)
+
+            self.entries[key] = {'files': names, 'size': size, 'used': time.time()}
+            self.evict()
+            self.save_manifest()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_size.
+        """
+        if self.max_size is None:
+            return
+
+        total = sum(entry['size'] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda key: self.entries[key]['used']):
+            if total <= self.max_size:
+                break
+            entry = self.entries.pop(key)
+            for name in entry['files']:
+                path = os.path.join(self.cache_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= entry['size']
+
+    def get_size(self):
+        """
+        Get the size in bytes of the cached images.
+        """
+        with self.locked():
+            return sum(entry['size'] for entry in self.entries.values())
+
+def encode_value(value):
+    """
+    Convert a parameter of a chart that is not JSON serializable into a value for the key.
+
+    Parameters:
+    - value: The value of the parameter.
+    """
+    if isinstance(value, Colormap):
+        return 'cmap:' + value.name
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes())
+        return 'array:%s:%s:%s' % (value.dtype, value.shape, digest.hexdigest())
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
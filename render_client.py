@@ -0,0 +1,80 @@
+import argparse
+import json
+import socket
+
+# Only the standard library is imported, so the client starts fast
+
+def send_request(socket_path, request):
+    """
+    Send a request to a RenderServer and wait for the reply.
+
+    Parameters:
+    - socket_path: The path of the Unix socket of the server.
+    - request: Dict with the request.
+
+    Returns:
+    - reply: Dict with the reply. An exception is raised if the request failed.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile('rwb') as stream:
+            stream.write((json.dumps(request) + '\n').encode())
+            stream.flush()
+            reply = json.loads(stream.readline())
+
+    if not reply['ok']:
+        raise Exception(reply['error'])
+    return reply
+
+def render(socket_path, chart, output_file, **params):
+    """
+    Ask a RenderServer to plot a chart.
+
+    Parameters:
+    - socket_path: The path of the Unix socket of the server.
+    - chart: The name of the type of chart, one of batch.CHART_TYPES.
+    - output_file: The output file of the chart.
+    - params: The parameters of the chart. A FrontHandle given as data is sent as its fields.
+
+    Returns:
+    - reply: Dict with the output files and the seconds spent by the server.
+    """
+    if hasattr(params.get('data'), '_asdict'):
+        params['data'] = params['data']._asdict()
+    params['output_file'] = output_file
+    return send_request(socket_path, {'chart': chart, 'params': params})
+
+def main():
+    """
+    Command line of the client of the render server.
+
+    - render SOCKET CHART OUTPUT [--input-file FILE] [--params JSON]: plots a chart.
+    - stats SOCKET: prints the counters of the server.
+    - shutdown SOCKET: stops the server.
+    """
+    parser = argparse.ArgumentParser(description='Send charts to a render server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plot = commands.add_parser('render', help='plot a chart in the server')
+    plot.add_argument('socket')
+    plot.add_argument('chart')
+    plot.add_argument('output_file')
+    plot.add_argument('--input-file', default=None)
+    plot.add_argument('--params', default='{}', help='JSON object with the parameters of the chart')
+
+    for name in ('stats', 'shutdown'):
+        command = commands.add_parser(name)
+        command.add_argument('socket')
+
+    args = parser.parse_args()
+
+    if args.command == 'render':
+        params = json.loads(args.params)
+        if args.input_file is not None:
+            params['input_file'] = args.input_file
+        print(json.dumps(render(args.socket, args.chart, args.output_file, **params)))
+    else:
+        print(json.dumps(send_request(args.socket, {'command': args.command})))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from batch import run_job
+from front_index import FrontCache
+from shared_front import FrontHandle
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, max_workers=4, max_fronts=16):
+        """
+        Initialize the RenderServer class.
+
+        The server stays alive with the chart classes imported, the fonts loaded and the last
+        fronts in memory, and plots the charts requested through a Unix socket in a pool of
+        threads. Each request is a line with a JSON object:
+        - {"chart": name, "params": {...}} plots a chart of batch.CHART_TYPES. The params
+          include the output_file and either an input_file or "data", the fields of the
+          FrontHandle of a front in shared memory.
+        - {"command": "stats"} returns the counters of the server.
+        - {"command": "shutdown"} stops the server.
+        The reply is a line with a JSON object with "ok" and the result or the "error".
+
+        Parameters:
+        - socket_path: Specifies the path of the Unix socket.
+        - max_workers: Specifies the number of charts plotted at the same time.
+        - max_fronts: Specifies the number of fronts kept in memory.
+        """
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, RenderHandler)
+
+        self.socket_path = socket_path
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.fronts = FrontCache(max_fronts)
+        self.rendered = 0
+        self.lock = threading.Lock()
+        self.warm_up()
+
+    def warm_up(self):
+        """
+        Draw a small figure with text and math, so the fonts are loaded before the first chart.
+        """
+        fig = Figure(figsize=(1, 1))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot([0, 1], [0, 1])
+        ax.set_xlabel('$f_1$')
+        ax.set_title('warm up', family='monospace', fontweight='bold', style='italic')
+        fig.canvas.draw()
+
+    def render(self, spec):
+        """
+        Plot the chart of a request.
+
+        Parameters:
+        - spec: Dict with the 'chart' name and its 'params'.
+
+        Returns:
+        - Dict with the output files and the seconds spent.
+        """
+        start = time.time()
+        params = dict(spec['params'])
+
+        # Uses the front in shared memory
+        if 'data' in params:
+            fields = dict(params['data'])
+            fields['shape'] = tuple(fields['shape'])
+            params['data'] = FrontHandle(**fields)
+
+        # The charts of an input file read it through the cache of the fronts, keeping the file
+        token = '%d-%d' % (os.getpid(), threading.get_ident())
+        output_files = self.executor.submit(run_job, {'chart': spec['chart'], 'params': params}, token,
+                                            self.fronts).result()
+
+        with self.lock:
+            self.rendered += 1
+        return {'output_files': output_files, 'seconds': time.time() - start}
+
+    def get_stats(self):
+        """
+        Get the counters of the server.
+        """
+        return {'rendered': self.rendered, 'fronts': len(self.fronts.values),
+                'front_hits': self.fronts.hits, 'front_misses': self.fronts.misses}
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        """
+        Answer the requests of a connection, one JSON object per line.
+        """
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            command = None
+            try:
+                request = json.loads(line)
+                command = request.get('command', 'render')
+                if command == 'render':
+                    reply = self.server.render(request)
+                elif command == 'stats':
+                    reply = self.server.get_stats()
+                elif command == 'shutdown':
+                    reply = {}
+                else:
+                    raise Exception("Unsupported command: %s" % command)
+                reply['ok'] = True
+            except Exception as exception:
+                reply = {'ok': False, 'error': str(exception), 'traceback': traceback.format_exc()}
+
+            self.wfile.write((json.dumps(reply) + '\n').encode())
+            self.wfile.flush()
+
+            # Stops the server once the reply is sent
+            if command == 'shutdown' and reply['ok']:
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+def main():
+    """
+    Command line of the render server: serve SOCKET runs the server until it is shut down.
+    The requests are sent with render_client.
+    """
+    parser = argparse.ArgumentParser(description='Render charts in a long lived server')
+    parser.add_argument('command', choices=['serve'])
+    parser.add_argument('socket')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--fronts', type=int, default=16)
+    args = parser.parse_args()
+
+    with RenderServer(args.socket, max_workers=args.workers, max_fronts=args.fronts) as server:
+        server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+from base_visualization import *
+
+class ScatterMatrix(BaseVisualization):
+    def __init__(self, output_file, data=None, input_file=None, title=None, subtitle=None, min_values=None,
+                 max_values=None, title_size=None, subtitle_size=None, label_size=None, ticks_size=None,
+                 label_pad=None, major_grid_line_width=None, minor_grid_line_width=None, ticks_pad=None,
+                 scatter_size=None, figure_size=None, input_values=None, bins=None, chunk_size=None, cmap=None):
+        """
+        Initialize the ScatterMatrix class, inheriting from BaseVisualization.
+
+        Each cell of the matrix shows the density of the points for a pair of objectives, and
+        the diagonal shows the histogram of each objective. All the 2D histograms are computed
+        in a single pass over the data.
+
+        Parameters:
+        - input_file: Specifies an input file that may be used for the visualization.
+        - output_file: Specifies the output file where the visualization will be saved.
+        - data: Specifies the data to be visualized.
+        - title: Specifies the title of the visualization.
+        - subtitle: Specifies the subtitle of the visualization.
+        - min_values: Specifies the minimum values used in the visualization.
+        - max_values: Specifies the maximum values used in the visualization.
+        - title_size: Specifies the font size of the title.
+        - subtitle_size: Specifies the font size of the subtitle.
+        - label_size: Specifies the font size of the labels.
+        - ticks_size: Specifies the size of the ticks in the visualization.
+        - label_pad: Specifies the padding between labels and the visualization.
+        - major_grid_line_width: Specifies the line width of major grid lines.
+        - minor_grid_line_width: Specifies the line width of minor grid lines.
+        - ticks_pad: Specifies the padding between ticks and the visualization.
+        - scatter_size: Specifies the size of scatter plot markers.
+        - figure_size: Specifies the size of the figure or plot.
+        - input_values: Specifies the input values used in the visualization.
+        - bins: Specifies the number of bins per objective of each cell.
+        - chunk_size: Specifies the number of rows binned at a time. With an input_file the
+          data is streamed and never loaded at once.
+        - cmap: Specifies the colormap of the cells.
+        """
+        super().__init__(data=data, input_file=input_file, output_file=output_file, title=title, subtitle=subtitle, min_values=min_values,
+                         max_values=max_values, title_size=title_size, subtitle_size=subtitle_size, label_size=label_size,
+                         ticks_size=ticks_size, label_pad=label_pad, major_grid_line_width=major_grid_line_width,
+                         minor_grid_line_width=minor_grid_line_width, ticks_pad=ticks_pad, scatter_size=scatter_size,
+                         figure_size=figure_size, input_values=input_values, chunk_size=chunk_size)
+
+        self.bins = bins
+        self.cmap = cmap
+
+    def set_values(self):
+        """
+        Set default values for visualization attributes if not provided.
+        """
+        if self.bins is None:
+            self.bins = 100
+
+        if self.cmap is None:
+            self.cmap = colors.ListedColormap(mpl.colormaps['Blues'](np.linspace(0.4, 1, 256)))
+
+        # Sets the font sizes based on the number of cells of each row
+        if self.label_size is None:
+            self.set_label_size(self.font_size * 3 / self.dim)
+        if self.ticks_size is None:
+            self.set_ticks_size(self.font_size * 2 / self.dim)
+
+    def set_bins(self, bins):
+        """
+        Set the number of bins per objective.
+
+        Parameters:
+        - bins: Number of bins.
+        """
+        self.bins = bins
+
+    def get_bins(self):
+        """
+        Get the bins attribute.
+        """
+        return self.bins
+
+    def iter_blocks(self, num_pairs):
+        """
+        Iterate over the data in blocks small enough to bin all the pairs at once.
+
+        Parameters:
+        - num_pairs: Number of pairs of objectives.
+        """
+        # Limits the size of the array of the bin of every pair of each block
+        max_rows = self.chunk_size if self.chunk_size is not None else max(1, (1 << 22) // max(num_pairs, 1))
+
+        for chunk in self.iter_chunks():
+            for start in range(0, chunk.shape[0], max_rows):
+                yield chunk.iloc[start:start + max_rows]
+
+    def get_histograms(self):
+        """
+        Compute the histogram of every objective and the 2D histogram of every pair of objectives.
+
+        The bin of each value is computed once, and the 2D histograms of all the pairs are
+        counted with a single bincount over each block of the data.
+
+        Returns:
+        - histograms: Array of shape (dim, bins) with the histogram of each objective.
+        - pair_histograms: Array of shape (pairs, bins, bins) with the 2D histogram of each
+          pair (i, j), i < j, in the order of np.triu_indices.
+        """
+        first, second = np.triu_indices(self.dim, k=1)
+        num_pairs = first.shape[0]
+        low = np.array(self.min_values[:self.dim], dtype=float)
+        width = np.array(self.max_values[:self.dim], dtype=float) - low
+        width[width == 0] = 1
+
+        histograms = np.zeros((self.dim, self.bins))
+        pair_histograms = np.zeros(num_pairs * self.bins * self.bins)
+        offsets = np.arange(self.dim) * self.bins
+        pair_offsets = np.arange(num_pairs) * self.bins * self.bins
+
+        for block in self.iter_blocks(num_pairs):
+            values = block.to_numpy(dtype=float)[:, :self.dim]
+
+            # Drops the rows with missing values, as they have no bin
+            values = values[~np.isnan(values).any(axis=1)]
+
+            # Computes the bin of every value, sharing the bounds of each objective
+            idx = ((values - low) / width * self.bins).astype(np.int64)
+            np.clip(idx, 0, self.bins - 1, out=idx)
+
+            histograms += np.bincount((idx + offsets).ravel(),
+                                      minlength=self.dim * self.bins).reshape(self.dim, self.bins)
+
+            # Counts the cell of every pair of every row at once
+            cells = idx[:, first] * self.bins + idx[:, second] + pair_offsets
+            pair_histograms += np.bincount(cells.ravel(), minlength=pair_histograms.shape[0])
+
+        return histograms, pair_histograms.reshape(num_pairs, self.bins, self.bins)
+
+    def plot(self):
+        """
+        Plot a scatter matrix based on the specified parameters.
+        """
+        # Sets all the values necessaries for formatting the specific chart
+        if not self.use_chunks():
+            self.set_data()
+        self.set_summary()
+        self.set_min_max_values()
+        self.set_dim()
+        self.set_values()
+
+        # Sets the default values if needed
+        self.set_default_values()
+
+        # Set the figure size of the figure based on the min and max values
+        self.input_values = self.min_values + self.max_values
+        self.set_figure_size()
+
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
+        # Computes all the histograms in one pass over the data
+        histograms, pair_histograms = self.get_histograms()
+        first, second = np.triu_indices(self.dim, k=1)
+        pairs = {(i, j): pair for pair, (i, j) in enumerate(zip(first, second))}
+        norm = colors.LogNorm(vmin=1, vmax=max(pair_histograms.max(), 1))
+
+        # Obtains the list of ticks of each objective based on the min and max values
+        ticks = [self.calculate_tick_locations(self.min_values[i], self.max_values[i])
+                 for i in range(self.dim)]
+
+        # Creates the figure with a cell for each pair of objectives
+        fig = self.create_figure(figsize=self.figure_size)
+        axes = fig.subplots(self.dim, self.dim, squeeze=False)
+
+        for row in range(self.dim):
+            for col in range(self.dim):
+                ax = axes[row][col]
+                x_lims = [self.min_values[col], self.max_values[col]]
+
+                # Draws the histogram of the objective on the diagonal
+                if row == col:
+                    edges = np.linspace(x_lims[0], x_lims[1], self.bins + 1)
+                    ax.stairs(histograms[col], edges, fill=True, color='darkblue')
+                    ax.set_yticks([])
+
+                # Draws the 2D histogram as a small raster on the other cells
+                else:
+                    if row < col:
+                        counts = pair_histograms[pairs[(row, col)]]
+                    else:
+                        counts = pair_histograms[pairs[(col, row)]].T
+                    ax.imshow(np.ma.masked_equal(counts, 0),
+                              origin='lower',
+                              extent=[x_lims[0], x_lims[1], self.min_values[row], self.max_values[row]],
+                              aspect='auto',
+                              interpolation='nearest',
+                              cmap=self.cmap,
+                              norm=norm)
+                    ax.set_ylim([self.min_values[row], self.max_values[row]])
+                    ax.set_yticks(ticks[row])
+
+                # Sets the limits and the ticks shared by the objectives
+                ax.set_xlim(x_lims)
+                ax.set_xticks(ticks[col])
+                ax.tick_params(axis='both', labelsize=self.ticks_size, pad=self.ticks_pad / self.dim)
+                ax.grid(which='major',
+                        linestyle='--',
+                        linewidth=self.major_grid_line_width / self.dim,
+                        color='black',
+                        zorder=0)
+
+                # Only the outer cells have tick labels
+                if row != self.dim - 1:
+                    ax.tick_params(labelbottom=False)
+                else:
+                    ax.set_xlabel(f'$f_{col + 1}$', fontsize=self.label_size)
+                if col != 0 or row == 0:
+                    ax.tick_params(labelleft=False)
+                if col == 0:
+                    ax.set_ylabel(f'$f_{row + 1}$', fontsize=self.label_size)
+
+        # Adjusts the space between the cells
+        fig.subplots_adjust(wspace=0.05, hspace=0.05)
+
+        # Sets the format for the title
+        fig.suptitle(self.title,
+                     fontsize=self.title_size,
+                     fontweight='bold',
+                     family='monospace',
+                     y=0.97)
+
+        # Adds the formatted subtitle if needed
+        if self.subtitle:
+            suptitle_pos = fig._suptitle.get_position()
+            fig.text(0.5, suptitle_pos[1] - 0.05, self.subtitle,
+                     ha='center', fontsize=self.subtitle_size, style='italic')
+
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
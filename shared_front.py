@@ -0,0 +1,121 @@
+import gc
+import sys
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+# Description of a front published in shared memory, small enough to be sent to other processes
+FrontHandle = namedtuple('FrontHandle', ['name', 'shape', 'dtype', 'columns', 'start'])
+
+# Names of the segments published by this process
+PUBLISHED = set()
+
+class SharedFront():
+    def __init__(self, memory, handle, owner=False):
+        """
+        Initialize the SharedFront class.
+
+        A shared front holds the values of a front in a block of shared memory, so the
+        charts of other processes read them without a copy. Use publish() to create one
+        and attach() to open it from its handle.
+
+        Parameters:
+        - memory: The SharedMemory block with the values.
+        - handle: The FrontHandle of the front.
+        - owner: Specifies whether this object published the front and removes the block.
+        """
+        self.memory = memory
+        self.handle = handle
+        self.owner = owner
+        self.frame = None
+
+    @classmethod
+    def publish(cls, data):
+        """
+        Copy a front into a new block of shared memory.
+
+        Parameters:
+        - data: Pandas frame with the values of the front and a range index.
+
+        Returns:
+        - The SharedFront that owns the block. The block is removed by unlink(), or when
+          the object is used as a context manager and the context ends.
+        """
+        if not isinstance(data.index, pd.RangeIndex) or data.index.step != 1:
+            raise Exception("Only fronts with a range index can be shared")
+
+        values = data.to_numpy(dtype=float)
+        memory = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        array = np.ndarray(values.shape, dtype=values.dtype, buffer=memory.buf)
+        array[:] = values
+        del array
+
+        PUBLISHED.add(memory.name)
+        handle = FrontHandle(memory.name, values.shape, values.dtype.str, list(data.columns), data.index.start)
+        return cls(memory, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Open a front published by this or another process.
+
+        Parameters:
+        - handle: The FrontHandle of the front.
+
+        Returns:
+        - The attached SharedFront. close() must be called once its frame is not used.
+        """
+        if sys.version_info >= (3, 13):
+            memory = shared_memory.SharedMemory(name=handle.name, track=False)
+        else:
+            memory = shared_memory.SharedMemory(name=handle.name)
+            # Only the publisher removes the block, not the processes that attach to it
+            if handle.name not in PUBLISHED:
+                resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, handle)
+
+    def get_frame(self):
+        """
+        Get a read only pandas frame over the shared values, without copying them.
+        """
+        if self.frame is None:
+            values = np.ndarray(self.handle.shape, dtype=np.dtype(self.handle.dtype), buffer=self.memory.buf)
+            values.flags.writeable = False
+            index = pd.RangeIndex(self.handle.start, self.handle.start + self.handle.shape[0])
+            self.frame = pd.DataFrame(values, index=index, columns=self.handle.columns, copy=False)
+        return self.frame
+
+    def close(self):
+        """
+        Close the block in this process. The frames over it must not be used afterwards.
+        """
+        if self.memory is None:
+            return
+
+        self.frame = None
+        try:
+            self.memory.close()
+        except BufferError:
+            # Frees the frames that are only kept by reference cycles and tries again
+            gc.collect()
+            self.memory.close()
+
+    def unlink(self):
+        """
+        Remove the block, once every process closed it. Only the publisher removes it.
+        """
+        self.close()
+        if self.owner and self.memory is not None:
+            self.memory.unlink()
+            PUBLISHED.discard(self.handle.name)
+            self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
@@ -0,0 +1,211 @@
+from base_visualization import *
+from plot2D import Plot2D
+from parallel_coord import ParallelCoordinates
+from radar import RadarChart
+
+# Charts that can be drawn as panels, by name
+CHARTS = {'plot2d': Plot2D, 'parallel': ParallelCoordinates, 'radar': RadarChart}
+
+class SmallMultiples(BaseVisualization):
+    def __init__(self, output_file, fronts, chart=None, titles=None, title=None, subtitle=None,
+                 title_size=None, subtitle_size=None, num_columns=None, panel_size=None, chart_params=None):
+        """
+        Initialize the SmallMultiples class, inheriting from BaseVisualization.
+
+        The fronts are drawn with the same type of chart as the panels of a single figure.
+        The bounds are computed once for all the fronts, the panels share the axes and the
+        ticks, and the figure is saved once.
+
+        Parameters:
+        - output_file: Specifies the output file where the visualization will be saved.
+        - fronts: Specifies the list of fronts, each one an input file or a pandas frame.
+        - chart: Specifies the type of chart of the panels: 'plot2d', 'parallel' or 'radar'
+          (default: 'plot2d' for fronts of 2 objectives and 'parallel' otherwise).
+        - titles: Specifies the list of titles of the panels (default: the name of each file).
+        - title: Specifies the title of the visualization.
+        - subtitle: Specifies the subtitle of the visualization.
+        - title_size: Specifies the font size of the title.
+        - subtitle_size: Specifies the font size of the subtitle and of the panel titles.
+        - num_columns: Specifies the number of panels of each row (default: a square grid).
+        - panel_size: Specifies the size in inches of each panel.
+        - chart_params: Specifies a dict of parameters passed to the chart of every panel.
+        """
+        super().__init__(output_file=output_file, title=title, subtitle=subtitle, title_size=title_size,
+                         subtitle_size=subtitle_size)
+
+        self.fronts = fronts
+        self.chart = chart
+        self.titles = titles
+        self.num_columns = num_columns
+        self.panel_size = panel_size
+        self.chart_params = chart_params
+        self.charts = None
+
+    def set_values(self):
+        """
+        Set default values for visualization attributes if not provided.
+        """
+        if not self.fronts:
+            raise Exception("You must provide at least one front")
+
+        if self.chart is None:
+            self.chart = 'plot2d' if self.get_front_dim(self.fronts[0]) == 2 else 'parallel'
+
+        if self.chart not in CHARTS:
+            raise Exception("Unsupported chart: %s" % self.chart)
+
+        if self.num_columns is None:
+            self.num_columns = int(np.ceil(np.sqrt(len(self.fronts))))
+
+        if self.panel_size is None:
+            self.panel_size = (8, 8)
+
+        # Scales the fonts of the charts, made for figures of 60 inches, to the panels
+        self.font_size = 275 / 2 * self.panel_size[0] / 60
+
+    def get_front_dim(self, front):
+        """
+        Get the number of objectives of a front without loading it.
+
+        Parameters:
+        - front: An input file or a pandas frame.
+        """
+        if isinstance(front, str):
+            return get_reader(front).read_header()[1]
+        return front.shape[1]
+
+    def set_charts(self):
+        """
+        Create the chart of each front and load its data and summary.
+        """
+        titles = self.titles
+        if titles is None:
+            titles = [self.extract_filename(front) if isinstance(front, str) else "Front %d" % (i + 1)
+                      for i, front in enumerate(self.fronts)]
+
+        chart_class = CHARTS[self.chart]
+        self.charts = []
+        for front, title in zip(self.fronts, titles):
+            if isinstance(front, str):
+                chart = chart_class(self.output_file, input_file=front, title=title, **(self.chart_params or {}))
+            else:
+                chart = chart_class(self.output_file, data=front, title=title, **(self.chart_params or {}))
+
+            if not chart.use_chunks():
+                chart.set_data()
+            chart.set_summary()
+            self.charts.append(chart)
+
+    def set_summary(self):
+        """
+        Set the summary with the min and max values of every objective over all the fronts.
+        """
+        dims = set(chart.summary.shape[1] for chart in self.charts)
+        if len(dims) != 1:
+            raise Exception("All the fronts must have the same number of objectives")
+
+        min_values = pd.concat([chart.summary.loc[['min']] for chart in self.charts]).min()
+        max_values = pd.concat([chart.summary.loc[['max']] for chart in self.charts]).max()
+        self.summary = pd.DataFrame([min_values, max_values], index=['min', 'max'])
+
+    def set_panel_values(self, chart):
+        """
+        Set the shared bounds and the sizes of the chart of a panel.
+
+        Parameters:
+        - chart: The chart of the panel.
+        """
+        chart.font_size = self.font_size
+        chart.min_values = self.min_values
+        chart.max_values = self.max_values
+        if isinstance(chart, (ParallelCoordinates, RadarChart)):
+            chart.min_value = min(self.min_values)
+            chart.max_value = max(self.max_values)
+
+        chart.set_dim()
+        chart.set_values()
+        chart.set_default_values()
+
+    def get_output_files(self):
+        """
+        Get the list of the files written by the chart.
+        """
+        return [self.output_file]
+
+    def get_data_hash(self):
+        """
+        Compute a hash of the data of all the fronts.
+        """
+        digest = hashlib.sha256()
+        for chart in self.charts:
+            digest.update(chart.get_data_hash().encode())
+        return digest.hexdigest()
+
+    def get_params(self):
+        """
+        Get the parameters of the chart that change the image, once they are resolved.
+
+        The fronts are identified by the hash of their data.
+        """
+        params = super().get_params()
+        params.pop('fronts')
+        params['charts'] = [chart.get_params() for chart in self.charts]
+        return params
+
+    def plot(self):
+        """
+        Plot the fronts as the panels of a grid based on the specified parameters.
+        """
+        # Loads the fronts and sets the bounds shared by all of them
+        self.set_values()
+        self.set_charts()
+        self.set_summary()
+        self.set_min_max_values()
+        self.set_dim()
+
+        # Sets the default values if needed
+        self.set_default_values()
+        for chart in self.charts:
+            self.set_panel_values(chart)
+
+        # Reuses the images of a previous render with the same data and parameters
+        if self.restore_cached():
+            return
+
+        # Creates the figure with a panel for each front
+        num_rows = int(np.ceil(len(self.charts) / self.num_columns))
+        polar = self.chart == 'radar'
+        fig = self.create_figure(figsize=(self.panel_size[0] * self.num_columns,
+                                          self.panel_size[1] * num_rows + 2))
+        axes = fig.subplots(num_rows, self.num_columns, squeeze=False, sharex=not polar,
+                            sharey=not polar, subplot_kw={'polar': polar})
+
+        # Draws each front on its panel
+        for idx, ax in enumerate(axes.flat):
+            if idx >= len(self.charts):
+                ax.set_visible(False)
+                continue
+
+            chart = self.charts[idx]
+            chart.draw(ax)
+            ax.set_title(chart.title, fontsize=self.subtitle_size, pad=self.font_size)
+
+            # Only the outer panels have the labels of the shared axes
+            if not polar:
+                ax.label_outer()
+
+        # Sets the format for the title
+        fig.suptitle(self.title,
+                     fontsize=self.title_size,
+                     fontweight='bold',
+                     family='monospace')
+
+        # Adds the formatted subtitle if needed
+        if self.subtitle:
+            suptitle_pos = fig._suptitle.get_position()
+            fig.text(0.5, suptitle_pos[1] - 0.03, self.subtitle,
+                     ha='center', fontsize=self.subtitle_size, style='italic')
+
+        # Saves the figure as a file and adds it to the cache
+        self.save_figure(fig)
+        self.store_cached()
@@ -0,0 +1,478 @@
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import matplotlib as mpl
+from matplotlib import colors
+import matplotlib.image as mpimg
+from catalog import FrontCatalog
+from front_reader import get_reader
+
+# Bits of each coordinate of the points in the index, the resolution of the deepest level
+DEPTH = 24
+
+def spread_bits(values):
+    """
+    Insert a zero bit between the bits of each value, the first step of a Morton code.
+
+    Parameters:
+    - values: Array of unsigned integers of up to 32 bits.
+    """
+    values = values.astype(np.uint64) & np.uint64(0x00000000FFFFFFFF)
+    values = (values | (values << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    values = (values | (values << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    values = (values | (values << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    values = (values | (values << np.uint64(2))) & np.uint64(0x3333333333333333)
+    values = (values | (values << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return values
+
+def compact_bits(values):
+    """
+    Keep the even bits of each value, the inverse of spread_bits.
+
+    Parameters:
+    - values: Array of unsigned integers of 64 bits.
+    """
+    values = values & np.uint64(0x5555555555555555)
+    values = (values | (values >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    values = (values | (values >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    values = (values | (values >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    values = (values | (values >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    values = (values | (values >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return values
+
+def encode(cols, rows):
+    """
+    Compute the Morton codes of cells, interleaving the bits of their column and row.
+    """
+    return spread_bits(cols) | (spread_bits(rows) << np.uint64(1))
+
+def decode(codes):
+    """
+    Compute the column and the row of the cells of some Morton codes.
+    """
+    return compact_bits(codes), compact_bits(codes >> np.uint64(1))
+
+class TilePyramid():
+    def __init__(self, input_file, cache_dir, min_values, max_values, objectives=(0, 1),
+                 tile_size=256, chunk_size=100000):
+        """
+        Initialize the TilePyramid class.
+
+        The points of two objectives of a front are indexed once by the Morton code of
+        their cell in a grid of 2^DEPTH x 2^DEPTH cells and stored sorted on disk. The
+        level z of the pyramid has 2^z x 2^z tiles of tile_size x tile_size bins, and the
+        points of any tile are a contiguous range of the index, so a tile costs a binary
+        search and the points inside it, whatever the size of the front. The index, the
+        maximum count of each level and the rendered tiles are built when they are first
+        requested and kept in the cache directory.
+
+        Parameters:
+        - input_file: Specifies the file of the front.
+        - cache_dir: Specifies the directory where the index and the tiles are kept.
+        - min_values: Specifies the min value of each of the two objectives.
+        - max_values: Specifies the max value of each of the two objectives.
+        - objectives: Specifies the positions of the objectives drawn on the x and y axes.
+        - tile_size: Specifies the number of bins per side of each tile, a power of 2.
+        - chunk_size: Specifies the number of rows read at a time when building the index.
+        """
+        if tile_size & (tile_size - 1) or not 1 < tile_size < 2 ** DEPTH:
+            raise Exception("The tile size must be a power of 2")
+
+        self.input_file = input_file
+        self.cache_dir = cache_dir
+        self.min_values = [float(value) for value in min_values]
+        self.max_values = [float(value) for value in max_values]
+        self.objectives = list(objectives)
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.tile_bits = tile_size.bit_length() - 1
+        self.max_level = DEPTH - self.tile_bits
+        self.codes = None
+        self.level_max = {}
+        self.lock = threading.Lock()
+
+        # Uses the darker part of the colormap so that bins with a single point are visible, as plot2D
+        self.cmap = colors.ListedColormap(mpl.colormaps['Blues'](np.linspace(0.4, 1, 256)))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_path(self, *names):
+        """
+        Get the path of a file of the cache directory.
+        """
+        return os.path.join(self.cache_dir, *names)
+
+    def write_file(self, path, content):
+        """
+        Write a file of the cache on a temporary file first and then rename it, so a reader
+        never sees a partial file.
+
+        Parameters:
+        - path: The path of the file.
+        - content: The bytes of the file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = '%s.tmp-%d-%d' % (path, os.getpid(), threading.get_ident())
+        with open(tmp_file, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_file, path)
+
+    def get_codes(self):
+        """
+        Get the sorted Morton codes of the points, building the index if it is not cached.
+        """
+        if self.codes is not None:
+            return self.codes
+
+        with self.lock:
+            if self.codes is None:
+                path = self.get_path('index.npy')
+                if not os.path.exists(path):
+                    buffer = io.BytesIO()
+                    np.save(buffer, self.build_codes())
+                    self.write_file(path, buffer.getvalue())
+
+                # Maps the index, so the pages of the tiles requested are the only ones read
+                self.codes = np.load(path, mmap_mode='r')
+        return self.codes
+
+    def build_codes(self):
+        """
+        Read the front in chunks and compute the sorted Morton codes of its points.
+        """
+        scale = 2 ** DEPTH
+        spans = [max(high - low, np.finfo(float).tiny) for low, high in zip(self.min_values, self.max_values)]
+        reader = get_reader(self.input_file, chunk_size=self.chunk_size, columns=self.objectives)
+
+        codes = []
+        for chunk in reader.iter_chunks():
+            values = chunk[self.objectives].to_numpy(dtype=float)
+            values = values[~np.isnan(values).any(axis=1)]
+            cells = [np.clip((values[:, i] - self.min_values[i]) / spans[i] * scale, 0, scale - 1).astype(np.uint64)
+                     for i in range(2)]
+            codes.append(encode(cells[0], cells[1]))
+
+        codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.uint64)
+        codes.sort()
+        return codes
+
+    def check_tile(self, z, x, y):
+        """
+        Check that a tile exists in the pyramid.
+        """
+        if not 0 <= z <= self.max_level or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+            raise KeyError("Tile out of range: %d/%d/%d" % (z, x, y))
+
+    def get_tile_points(self, z, x, y):
+        """
+        Get the Morton codes of the points of a tile.
+
+        The tiles are numbered from the top left corner, so the row y of the tiles is the
+        row 2^z - 1 - y of the cells.
+
+        Parameters:
+        - z: The level of the tile.
+        - x: The column of the tile.
+        - y: The row of the tile.
+        """
+        self.check_tile(z, x, y)
+        codes = self.get_codes()
+
+        shift = np.uint64(2 * (DEPTH - z))
+        prefix = int(encode(np.array([x]), np.array([2 ** z - 1 - y]))[0])
+        start, stop = np.searchsorted(codes, [np.uint64(prefix) << shift, np.uint64(prefix + 1) << shift])
+        return codes[start:stop]
+
+    def get_counts(self, z, x, y):
+        """
+        Count the points of each bin of a tile.
+
+        Returns:
+        - counts: Array of shape (tile_size, tile_size) with the first row at the top.
+        """
+        cols, rows = decode(self.get_tile_points(z, x, y))
+        shift = np.uint64(DEPTH - z - self.tile_bits)
+        mask = np.uint64(self.tile_size - 1)
+        bins = ((rows >> shift) & mask).astype(np.int64) * self.tile_size + ((cols >> shift) & mask).astype(np.int64)
+        counts = np.bincount(bins, minlength=self.tile_size ** 2).reshape(self.tile_size, self.tile_size)
+        return counts[::-1]
+
+    def get_level_max(self, z):
+        """
+        Get the largest number of points of a bin of a level, so all the tiles of the level
+        share the same colors. It is computed when the level is first requested.
+
+        Parameters:
+        - z: The level of the pyramid.
+        """
+        if z in self.level_max:
+            return self.level_max[z]
+
+        path = self.get_path('levels.json')
+        if os.path.exists(path):
+            with open(path) as file:
+                self.level_max.update({int(level): count for level, count in json.load(file).items()})
+
+        if z not in self.level_max:
+            # The codes are sorted, so the points of each bin are a run of the same prefix
+            bins = self.get_codes() >> np.uint64(2 * (DEPTH - z - self.tile_bits))
+            edges = np.flatnonzero(np.diff(bins)) + 1
+            runs = np.diff(np.concatenate([[0], edges, [len(bins)]]))
+            self.level_max[z] = int(runs.max()) if len(bins) else 0
+            self.write_file(path, json.dumps(self.level_max, sort_keys=True).encode())
+
+        return self.level_max[z]
+
+    def get_tile(self, z, x, y):
+        """
+        Get the PNG image of a tile, with the empty bins transparent.
+
+        Parameters:
+        - z: The level of the tile.
+        - x: The column of the tile.
+        - y: The row of the tile.
+        """
+        self.check_tile(z, x, y)
+        path = self.get_path(str(z), str(x), '%d.png' % y)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                return file.read()
+
+        counts = self.get_counts(z, x, y)
+        norm = colors.LogNorm(vmin=1, vmax=max(self.get_level_max(z), 1))
+        pixels = self.cmap(norm(np.ma.masked_equal(counts, 0)), bytes=True)
+
+        buffer = io.BytesIO()
+        mpimg.imsave(buffer, pixels, format='png')
+        content = buffer.getvalue()
+        self.write_file(path, content)
+        return content
+
+    def get_geometry(self, z, x, y, max_points=20000):
+        """
+        Get the contents of a tile as compact binary data for the clients that draw it.
+
+        A tile with few points is sent as the points themselves: b'PNTS', the number of
+        points (uint32) and their x and y values (float32 pairs). A tile with more points
+        is sent as the counts of its bins: b'GRID', the tile size (uint32) and the counts
+        (uint32, tile_size x tile_size, first row at the top). Integers are little endian.
+
+        Parameters:
+        - z: The level of the tile.
+        - x: The column of the tile.
+        - y: The row of the tile.
+        - max_points: Specifies the largest number of points sent as points.
+        """
+        points = self.get_tile_points(z, x, y)
+        if len(points) > max_points:
+            counts = self.get_counts(z, x, y).astype('<u4')
+            return b'GRID' + struct.pack('<I', self.tile_size) + counts.tobytes()
+
+        # Places each point at the center of its cell of the deepest level
+        cells = decode(points)
+        values = np.empty((len(points), 2), dtype='<f4')
+        for i in range(2):
+            span = self.max_values[i] - self.min_values[i]
+            values[:, i] = self.min_values[i] + (cells[i].astype(float) + 0.5) / 2 ** DEPTH * span
+        return b'PNTS' + struct.pack('<I', len(points)) + values.tobytes()
+
+    def get_info(self):
+        """
+        Get the description of the pyramid.
+        """
+        return {'objectives': self.objectives, 'min': self.min_values, 'max': self.max_values,
+                'points': len(self.get_codes()), 'tile_size': self.tile_size, 'max_level': self.max_level}
+
+class TileServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory, cache_dir=None, tile_size=256, max_points=20000):
+        """
+        Initialize the TileServer class.
+
+        The server answers HTTP GET requests for the fronts of a directory:
+        - /fronts: JSON with the catalog entry of each front.
+        - /fronts/NAME: JSON with the description of the pyramid of a front.
+        - /tiles/NAME/Z/X/Y.png: the density image of a tile.
+        - /geometry/NAME/Z/X/Y.bin: the points or the counts of a tile (see TilePyramid.get_geometry).
+        The objectives drawn are chosen with ?objectives=I,J (default: 0,1). A client only
+        requests the tiles of its viewport at its zoom level, and each tile is computed once.
+
+        Parameters:
+        - address: Specifies the (host, port) of the server.
+        - directory: Specifies the directory with the fronts.
+        - cache_dir: Specifies the directory of the pyramids (default: .tiles inside the directory).
+        - tile_size: Specifies the number of bins per side of each tile.
+        - max_points: Specifies the largest number of points of a tile sent as points.
+        """
+        super().__init__(address, TileHandler)
+
+        self.catalog = FrontCatalog(directory)
+        self.cache_dir = cache_dir
+        self.tile_size = tile_size
+        self.max_points = max_points
+        self.pyramids = {}
+        self.lock = threading.Lock()
+
+        if self.cache_dir is None:
+            self.cache_dir = os.path.join(directory, '.tiles')
+
+        self.catalog.refresh()
+
+    def get_pyramid(self, name, objectives=(0, 1)):
+        """
+        Get the pyramid of two objectives of a front.
+
+        The pyramids are kept by the content hash of the file, so a file that changes gets
+        a new pyramid and the tiles of the old content are never served.
+
+        Parameters:
+        - name: The name of the file inside the directory.
+        - objectives: The positions of the objectives drawn on the x and y axes.
+        """
+        with self.lock:
+            self.update_entries(name)
+            if name not in self.catalog.entries:
+                raise KeyError("Unknown front: %s" % name)
+
+            entry = self.catalog.get_entry(name)
+            if len(objectives) != 2 or not all(0 <= i < entry['columns'] for i in objectives):
+                raise KeyError("Invalid objectives: %s" % list(objectives))
+
+            key = '%s-%d-%d-%d' % (entry['hash'][:16], objectives[0], objectives[1], self.tile_size)
+            if key not in self.pyramids:
+                self.pyramids[key] = TilePyramid(self.catalog.get_path(name), os.path.join(self.cache_dir, key),
+                                                 [entry['min'][i] for i in objectives],
+                                                 [entry['max'][i] for i in objectives],
+                                                 objectives=objectives, tile_size=self.tile_size,
+                                                 chunk_size=self.catalog.chunk_size)
+            return key, self.pyramids[key]
+
+    def update_entries(self, name=None):
+        """
+        Update the catalog entry of a front, or of all the fronts, if the files changed, and
+        drop the pyramids of the contents that are not in the directory anymore. The lock of
+        the server must be held.
+
+        Parameters:
+        - name: The name of the file inside the directory (default: all the files).
+        """
+        entry = self.catalog.entries.get(name)
+        try:
+            stat = os.stat(self.catalog.get_path(name)) if entry is not None else None
+        except FileNotFoundError:
+            stat = None
+
+        # Only stats a known front, and scans the directory for new and removed files
+        if stat is None:
+            self.catalog.refresh()
+        elif entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            self.catalog.update([name])
+        else:
+            return
+
+        hashes = {entry['hash'][:16] for entry in self.catalog.entries.values()}
+        for key in [key for key in self.pyramids if key.split('-')[0] not in hashes]:
+            pyramid = self.pyramids.pop(key)
+            shutil.rmtree(pyramid.cache_dir, ignore_errors=True)
+
+    def get_entries(self):
+        """
+        Get the catalog entries of all the fronts, updated with the files of the directory.
+        """
+        with self.lock:
+            self.update_entries()
+            return dict(self.catalog.entries)
+
+class TileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """
+        Answer a request for the fronts, a pyramid, a tile or its geometry.
+        """
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            objectives = [int(i) for i in query.get('objectives', ['0,1'])[0].split(',')]
+
+            if url.path == '/fronts':
+                self.send(json.dumps(self.server.get_entries()).encode(), 'application/json')
+                return
+
+            match = re.fullmatch(r'/fronts/([^/]+)', url.path)
+            if match:
+                _, pyramid = self.server.get_pyramid(match.group(1), objectives)
+                self.send(json.dumps(pyramid.get_info()).encode(), 'application/json')
+                return
+
+            match = re.fullmatch(r'/(tiles|geometry)/([^/]+)/(\d+)/(\d+)/(\d+)\.(png|bin)', url.path)
+            if not match or (match.group(1) == 'tiles') != (match.group(6) == 'png'):
+                raise KeyError("Not found: %s" % url.path)
+
+            key, pyramid = self.server.get_pyramid(match.group(2), objectives)
+            z, x, y = (int(value) for value in match.group(3, 4, 5))
+
+            # The tiles of a content never change, so the clients revalidate them with the key
+            etag = '"%s-%s-%d-%d-%d"' % (key, match.group(1), z, x, y)
+            pyramid.check_tile(z, x, y)
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            if match.group(1) == 'tiles':
+                self.send(pyramid.get_tile(z, x, y), 'image/png', etag)
+            else:
+                self.send(pyramid.get_geometry(z, x, y, self.server.max_points), 'application/octet-stream', etag)
+        except KeyError as exception:
+            self.send(str(exception.args[0]).encode(), 'text/plain', status=404)
+        except Exception as exception:
+            self.send(str(exception).encode(), 'text/plain', status=500)
+
+    def send(self, content, content_type, etag=None, status=200):
+        """
+        Send a reply with its content.
+
+        Parameters:
+        - content: The bytes of the reply.
+        - content_type: The type of the content.
+        - etag: The tag of the content, if it can be cached.
+        - status: The HTTP status of the reply.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(content)
+
+def main():
+    """
+    Command line of the tile server: serve DIRECTORY serves the fronts of a directory.
+    """
+    parser = argparse.ArgumentParser(description='Serve the fronts of a directory as tiles')
+    parser.add_argument('command', choices=['serve'])
+    parser.add_argument('directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--tile-size', type=int, default=256)
+    parser.add_argument('--max-points', type=int, default=20000)
+    args = parser.parse_args()
+
+    with TileServer((args.host, args.port), args.directory, cache_dir=args.cache_dir,
+                    tile_size=args.tile_size, max_points=args.max_points) as server:
+        server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,568 @@
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from batch import run_job
+from catalog import get_chart_types
+from front_reader import READERS, get_reader, split_extension
+from render_cache import CACHE_VERSION
+
+# Events of inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher():
+    def __init__(self, directory):
+        """
+        Initialize the InotifyWatcher class.
+
+        The watcher asks the Linux kernel for the files of a directory that are created,
+        written or moved into it, through the inotify calls of the C library, so it does not
+        scan the directory.
+
+        Parameters:
+        - directory: Specifies the directory to watch.
+        """
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify is not available")
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, "Can not watch %s" % directory)
+
+    def changes(self, timeout):
+        """
+        Wait for changes of the files of the directory.
+
+        Parameters:
+        - timeout: Maximum number of seconds to wait.
+
+        Returns:
+        - names: Set with the names of the files changed, empty if there were no changes.
+        """
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return set()
+
+        names = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                # Some events were lost, so every file is checked
+                if mask & IN_Q_OVERFLOW:
+                    names.update(os.listdir(self.directory))
+                elif name:
+                    names.add(os.fsdecode(name))
+
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher():
+    def __init__(self, directory, interval=1.0):
+        """
+        Initialize the PollingWatcher class.
+
+        The watcher compares the size and the modification time of the files of a directory
+        every interval seconds. Only the directory entries are read, not the files.
+
+        Parameters:
+        - directory: Specifies the directory to watch.
+        - interval: Specifies the seconds between two scans.
+        """
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        """
+        Get the size and modification time of each file of the directory.
+        """
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout):
+        """
+        Wait for changes of the files of the directory.
+
+        Parameters:
+        - timeout: Maximum number of seconds to wait.
+
+        Returns:
+        - names: Set with the names of the files changed, empty if there were no changes.
+        """
+        time.sleep(max(min(timeout, self.interval), 0))
+        snapshot = self.scan()
+        names = set(name for name, stat in snapshot.items() if self.snapshot.get(name) != stat)
+        self.snapshot = snapshot
+        return names
+
+    def close(self):
+        pass
+
+def get_watcher(directory, poll_interval=1.0, use_inotify=True):
+    """
+    Get a watcher of a directory: inotify where it is available, polling otherwise.
+
+    Parameters:
+    - directory: Specifies the directory to watch.
+    - poll_interval: Specifies the seconds between two scans when polling.
+    - use_inotify: Specifies whether inotify is used when it is available.
+    """
+    if use_inotify:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory, poll_interval)
+
+def read_snapshot(path):
+    """
+    Compute the content hash and the number of lines of a file in a single pass.
+
+    Parameters:
+    - path: The path of the file.
+
+    Returns:
+    - content_hash: The hexadecimal sha256 of the content of the file.
+    - lines: The number of lines, counting a last line without a newline.
+    """
+    digest = hashlib.sha256()
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+            lines += block.count(b'\n')
+            last = block[-1:]
+
+    if last != b'\n':
+        lines += 1
+    return digest.hexdigest(), lines
+
+def render_front(specs):
+    """
+    Plot the charts of a front, in a process of the pool of FrontWatcher.
+
+    Parameters:
+    - specs: List of the jobs of the charts, as batch.run_job takes them.
+
+    Returns:
+    - output_files: The list of the files written.
+    """
+    token = 'watch-%d' % os.getpid()
+    return [output_file for spec in specs for output_file in run_job(spec, token)]
+
+class FrontWatcher():
+    def __init__(self, directory, output_dir=None, charts=None, params=None, debounce=1.0, max_workers=4,
+                 poll_interval=1.0, use_inotify=True, callback=None):
+        """
+        Initialize the FrontWatcher class.
+
+        The watcher re-renders the charts of the fronts of a directory when they are created
+        or changed. The changes of a file are coalesced until it has been quiet for debounce
+        seconds, and a file is skipped while it is still being written: when its size or
+        modification time changes between two checks, when a .pof file has fewer rows than
+        its header declares, or when its header can not be read. The skipped files are
+        checked again on their next change.
+
+        Only the files whose content changed since their last render are plotted, in a pool
+        of max_workers processes, and a file changed while its charts are plotted is plotted
+        again once they are done. The key of the last render of each file (its content, the
+        charts and their parameters) and the images written are kept in the output directory,
+        so restarting the watcher does not render the same fronts, while changing the charts
+        or the parameters, or removing an image, renders them again.
+
+        Parameters:
+        - directory: Specifies the directory with the fronts.
+        - output_dir: Specifies the directory of the images (default: 'charts' inside the
+          directory). The image of each chart is named after the front and the chart.
+        - charts: Specifies the list of the charts of batch.CHART_TYPES plotted for each front
+          (default: the charts suitable for its number of objectives).
+        - params: Specifies a dict with the parameters of all the charts (e.g. the dpi).
+        - debounce: Specifies the seconds a file has to be quiet before it is plotted.
+        - max_workers: Specifies the number of fronts plotted at the same time.
+        - poll_interval: Specifies the seconds between two scans when inotify is not available.
+        - use_inotify: Specifies whether inotify is used when it is available.
+        - callback: Specifies a function called with the name of the front, the list of the
+          files written and the error (None if the charts were plotted) after each render.
+        """
+        self.directory = directory
+        self.output_dir = output_dir
+        self.charts = charts
+        self.params = params
+        self.debounce = debounce
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.callback = callback
+
+        self.pending = {}
+        self.running = {}
+        self.rendered = {}
+        self.errors = {}
+        self.renders = 0
+        self.watcher = None
+        self.executor = None
+        self.stopped = threading.Event()
+
+        if self.output_dir is None:
+            self.output_dir = os.path.join(self.directory, 'charts')
+
+        if self.params is None:
+            self.params = {}
+
+        self.state_file = os.path.join(self.output_dir, '.watch.json')
+
+    def load_state(self):
+        """
+        Load the key and the images of the last render of each front, if they were saved.
+        """
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as file:
+                self.rendered = json.load(file)
+        return self.rendered
+
+    def save_state(self):
+        """
+        Save the key and the images of the last render of each front.
+
+        The file is written on a temporary file first and then renamed.
+        """
+        tmp_file = self.state_file + '.tmp'
+        with open(tmp_file, 'w') as file:
+            json.dump(self.rendered, file, indent=1, sort_keys=True)
+        os.replace(tmp_file, self.state_file)
+
+    def is_front(self, name):
+        """
+        Check whether a file of the directory is a front, by its extension.
+
+        Hidden files are ignored, as well as temporary files (e.g. front.pof.tmp) renamed
+        once complete, which are seen when they are renamed.
+
+        Parameters:
+        - name: The name of the file.
+        """
+        return not name.startswith('.') and split_extension(name)[0] in READERS
+
+    def get_stat(self, name):
+        """
+        Get the size and modification time of a file, or None if it does not exist.
+
+        Parameters:
+        - name: The name of the file.
+        """
+        try:
+            stat = os.stat(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def add_changes(self, names):
+        """
+        Add the fronts changed to the pending ones, restarting their quiet time.
+
+        Parameters:
+        - names: The names of the files changed.
+        """
+        now = time.monotonic()
+        for name in names:
+            if self.is_front(name):
+                self.pending[name] = (now, self.get_stat(name))
+
+    def check_file(self, name):
+        """
+        Check that a front is complete and get its content hash and number of objectives.
+
+        Parameters:
+        - name: The name of the file.
+
+        Returns:
+        - content_hash, dim: The content hash and the number of objectives, or None if the
+          file is still being written.
+        """
+        path = os.path.join(self.directory, name)
+        content_hash, lines = read_snapshot(path)
+
+        try:
+            rows, dim = get_reader(path).read_header()
+        except Exception:
+            return None
+
+        # The rows of a .pof file follow the header line
+        if split_extension(name) == ('.pof', None) and lines - 1 < rows:
+            return None
+
+        return content_hash, dim
+
+    def get_stem(self, name):
+        """
+        Get the name of a front without the extensions of its format and compression.
+
+        Parameters:
+        - name: The name of the file.
+        """
+        stem, ext = os.path.splitext(name)
+        if split_extension(name)[1] is not None:
+            stem = os.path.splitext(stem)[0]
+        return stem
+
+    def get_jobs(self, name, dim):
+        """
+        Get the jobs of the charts of a front.
+
+        Parameters:
+        - name: The name of the file.
+        - dim: The number of objectives of the front.
+
+        Returns:
+        - specs: List of the jobs, as batch.run_job takes them.
+        """
+        charts = self.charts if self.charts is not None else get_chart_types(dim)
+        stem = self.get_stem(name)
+
+        specs = []
+        for chart in charts:
+            params = {'title': stem, **self.params}
+            params['input_file'] = os.path.join(self.directory, name)
+            params['output_file'] = os.path.join(self.output_dir, '%s_%s.png' % (stem, chart))
+            specs.append({'chart': chart, 'params': params})
+        return specs
+
+    def get_render_key(self, content_hash, specs):
+        """
+        Get the key of the render of a front, which changes with its content, the jobs of its
+        charts with their parameters and the version of the charts.
+
+        Parameters:
+        - content_hash: The content hash of the file.
+        - specs: List of the jobs of the charts of the front.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'content': content_hash, 'version': CACHE_VERSION, 'jobs': specs},
+                                 sort_keys=True, default=repr).encode())
+        return digest.hexdigest()
+
+    def is_rendered(self, name, key):
+        """
+        Check that the last render of a front has a key and that all its images exist.
+
+        Parameters:
+        - name: The name of the file.
+        - key: The key of the render (see get_render_key).
+        """
+        state = self.rendered.get(name)
+        if not isinstance(state, dict) or state['key'] != key:
+            return False
+        return all(os.path.exists(path) for path in state['files'])
+
+    def submit_ready(self):
+        """
+        Plot the pending fronts that have been quiet for debounce seconds, while there are
+        free workers.
+        """
+        now = time.monotonic()
+
+        # The fronts that changed first are plotted first
+        for name, (changed, stat) in sorted(self.pending.items(), key=lambda item: item[1][0]):
+            if len(self.running) >= self.max_workers:
+                break
+            if name in self.running or now - changed < self.debounce:
+                continue
+
+            current = self.get_stat(name)
+            if current is None:
+                del self.pending[name]
+                continue
+
+            # Waits again if the file changed without an event (e.g. between two scans)
+            if current != stat:
+                self.pending[name] = (now, current)
+                continue
+
+            # Skips the file until its next change if it is not complete
+            del self.pending[name]
+            snapshot = self.check_file(name)
+            if snapshot is None:
+                continue
+
+            content_hash, dim = snapshot
+            specs = self.get_jobs(name, dim)
+            key = self.get_render_key(content_hash, specs)
+            if self.is_rendered(name, key):
+                continue
+
+            future = self.executor.submit(render_front, specs)
+            self.running[name] = (future, key)
+
+    def collect(self):
+        """
+        Record the fronts whose charts are plotted.
+        """
+        done = False
+        for name, (future, key) in list(self.running.items()):
+            if not future.done():
+                continue
+
+            del self.running[name]
+            output_files = []
+            error = None
+            try:
+                # Records the render once all the images of the front are written
+                output_files = future.result()
+                self.rendered[name] = {'key': key, 'files': output_files}
+                self.errors.pop(name, None)
+                self.renders += 1
+            except Exception:
+                # Some images may have been replaced, so the previous render is not kept
+                error = traceback.format_exc()
+                self.errors[name] = error
+                self.rendered.pop(name, None)
+            done = True
+
+            if self.callback is not None:
+                self.callback(name, output_files, error)
+
+        if done:
+            self.save_state()
+
+    def get_timeout(self, end):
+        """
+        Get the seconds to wait for changes before the next pending front is ready.
+
+        Parameters:
+        - end: The time when the watcher stops, or None.
+        """
+        now = time.monotonic()
+        timeout = self.poll_interval
+
+        if self.pending:
+            timeout = min(timeout, min(changed for changed, _ in self.pending.values()) + self.debounce - now)
+
+        # Checks the fronts being plotted often, to start the next ones
+        if self.running:
+            timeout = min(timeout, 0.1)
+
+        if end is not None:
+            timeout = min(timeout, end - now)
+        return max(timeout, 0)
+
+    def start(self):
+        """
+        Start watching the directory, with every front of the directory pending.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.load_state()
+        self.watcher = get_watcher(self.directory, self.poll_interval, self.use_inotify)
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.add_changes(os.listdir(self.directory))
+
+    def run(self, duration=None):
+        """
+        Watch the directory and plot the fronts changed until the watcher is stopped.
+
+        Parameters:
+        - duration: Specifies the seconds to watch the directory (default: until stop is called).
+        """
+        self.start()
+        end = None if duration is None else time.monotonic() + duration
+
+        try:
+            while not self.stopped.is_set():
+                if end is not None and time.monotonic() >= end:
+                    break
+                self.add_changes(self.watcher.changes(self.get_timeout(end)))
+                self.collect()
+                self.submit_ready()
+        finally:
+            self.close()
+
+    def stop(self):
+        """
+        Stop the watcher, from another thread or a signal handler.
+        """
+        self.stopped.set()
+
+    def close(self):
+        """
+        Wait for the fronts being plotted and stop watching the directory.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.collect()
+            self.executor = None
+
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+def main():
+    """
+    Command line of the watch mode: watch DIR re-renders the charts of the fronts of the
+    directory when they change, until it is interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Re-render the charts of the fronts of a directory when they change')
+    parser.add_argument('command', choices=['watch'])
+    parser.add_argument('directory')
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--charts', nargs='+', default=None)
+    parser.add_argument('--params', type=json.loads, default=None, help='JSON object with the parameters of the charts')
+    parser.add_argument('--debounce', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    parser.add_argument('--polling', action='store_true', help='scan the directory instead of using inotify')
+    args = parser.parse_args()
+
+    def report(name, output_files, error):
+        if error is None:
+            print('%s: %s' % (name, ' '.join(output_files)), flush=True)
+        else:
+            print('%s failed:\n%s' % (name, error), flush=True)
+
+    watcher = FrontWatcher(args.directory, output_dir=args.output_dir, charts=args.charts, params=args.params,
+                           debounce=args.debounce, max_workers=args.workers, poll_interval=args.poll_interval,
+                           use_inotify=not args.polling, callback=report)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+class WorkQueue():
+    def __init__(self, queue_file, max_attempts=3, timeout=60):
+        """
+        Initialize the WorkQueue class.
+
+        The queue is a SQLite database, usually on storage shared by several hosts. Each
+        job is claimed by a worker for a lease of some seconds; a job whose lease expires,
+        because its worker crashed, can be claimed again by another worker.
+
+        Parameters:
+        - queue_file: Specifies the file of the database, created if it does not exist.
+        - max_attempts: Specifies the number of times a job is tried before it is failed.
+        - timeout: Specifies the seconds to wait for the lock of the database.
+        """
+        self.queue_file = queue_file
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+        with self.connect() as connection:
+            connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                                      id INTEGER PRIMARY KEY,
+                                      spec TEXT UNIQUE NOT NULL,
+                                      status TEXT NOT NULL DEFAULT 'pending',
+                                      attempts INTEGER NOT NULL DEFAULT 0,
+                                      worker TEXT,
+                                      lease_until REAL,
+                                      error TEXT,
+                                      started REAL,
+                                      finished REAL)''')
+
+    def connect(self):
+        """
+        Open a connection to the database, with the transactions handled explicitly.
+        """
+        connection = sqlite3.connect(self.queue_file, timeout=self.timeout, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return Transaction(connection)
+
+    def add(self, chart, **params):
+        """
+        Add a job that plots a chart.
+
+        Adding the same job again does nothing, so the script that fills the queue can be
+        run several times.
+
+        Parameters:
+        - chart: The name of the type of chart, one of batch.CHART_TYPES.
+        - params: The parameters of the chart, including its output_file.
+
+        Returns:
+        - The id of the job.
+        """
+        return self.add_jobs([{'chart': chart, 'params': params}])[0]
+
+    def add_jobs(self, specs):
+        """
+        Add several jobs at once.
+
+        Parameters:
+        - specs: List of dicts with the 'chart' name and its 'params'.
+
+        Returns:
+        - ids: The ids of the jobs, in the same order.
+        """
+        ids = []
+        with self.connect() as connection:
+            for spec in specs:
+                text = json.dumps(spec, sort_keys=True)
+                connection.execute('INSERT OR IGNORE INTO jobs (spec) VALUES (?)', (text,))
+                row = connection.execute('SELECT id FROM jobs WHERE spec = ?', (text,)).fetchone()
+                ids.append(row['id'])
+        return ids
+
+    def claim(self, worker, lease=300):
+        """
+        Claim the next pending job, or a running job whose lease expired.
+
+        Parameters:
+        - worker: The name of the worker.
+        - lease: The seconds the job is reserved for the worker.
+
+        Returns:
+        - job: Tuple with the id and the spec of the job, or None if there is no job to claim.
+        """
+        now = time.time()
+        with self.connect() as connection:
+            # Fails the expired jobs that already used all their attempts
+            connection.execute('''UPDATE jobs SET status = 'failed', finished = ?,
+                                      error = COALESCE(error, 'The lease expired')
+                                  WHERE status = 'running' AND lease_until < ? AND attempts >= ?''',
+                               (now, now, self.max_attempts))
+
+            row = connection.execute('''SELECT id, spec FROM jobs
+                                        WHERE status = 'pending' OR (status = 'running' AND lease_until < ?)
+                                        ORDER BY id LIMIT 1''', (now,)).fetchone()
+            if row is None:
+                return None
+
+            connection.execute('''UPDATE jobs SET status = 'running', worker = ?, lease_until = ?,
+                                      attempts = attempts + 1, started = ?
+                                  WHERE id = ?''', (worker, now + lease, now, row['id']))
+            return row['id'], json.loads(row['spec'])
+
+    def renew(self, job_id, worker, lease=300):
+        """
+        Extend the lease of a running job.
+
+        Parameters:
+        - job_id: The id of the job.
+        - worker: The name of the worker that claimed the job.
+        - lease: The seconds the job is reserved from now.
+
+        Returns:
+        - True if the job is still claimed by the worker.
+        """
+        with self.connect() as connection:
+            cursor = connection.execute('''UPDATE jobs SET lease_until = ?
+                                           WHERE id = ? AND worker = ? AND status = 'running' ''',
+                                        (time.time() + lease, job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker):
+        """
+        Mark a job as done.
+
+        Parameters:
+        - job_id: The id of the job.
+        - worker: The name of the worker that claimed the job.
+        """
+        with self.connect() as connection:
+            connection.execute('''UPDATE jobs SET status = 'done', finished = ?, error = NULL
+                                  WHERE id = ? AND worker = ?''', (time.time(), job_id, worker))
+
+    def fail(self, job_id, worker, error):
+        """
+        Record the error of a job. The job is tried again until it used all its attempts.
+
+        Parameters:
+        - job_id: The id of the job.
+        - worker: The name of the worker that claimed the job.
+        - error: The description of the error.
+        """
+        with self.connect() as connection:
+            connection.execute('''UPDATE jobs SET error = ?, finished = ?,
+                                      status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END
+                                  WHERE id = ? AND worker = ?''',
+                               (error, time.time(), self.max_attempts, job_id, worker))
+
+    def has_work(self):
+        """
+        Check if there are jobs pending or running.
+        """
+        with self.connect() as connection:
+            row = connection.execute('''SELECT COUNT(*) AS count FROM jobs
+                                        WHERE status IN ('pending', 'running')''').fetchone()
+            return row['count'] > 0
+
+    def get_report(self):
+        """
+        Summarize the state of the jobs.
+
+        Returns:
+        - report: Dict with the number of jobs of each status, the number of jobs done by each
+          worker, the total seconds spent in the jobs done and the errors of the failed jobs.
+        """
+        with self.connect() as connection:
+            rows = connection.execute('SELECT * FROM jobs ORDER BY id').fetchall()
+
+        report = {'total': len(rows), 'status': {}, 'workers': {}, 'seconds': 0.0, 'failed': []}
+        for row in rows:
+            report['status'][row['status']] = report['status'].get(row['status'], 0) + 1
+            if row['status'] == 'done':
+                report['workers'][row['worker']] = report['workers'].get(row['worker'], 0) + 1
+                report['seconds'] += row['finished'] - row['started']
+            elif row['status'] == 'failed':
+                report['failed'].append({'id': row['id'], 'spec': json.loads(row['spec']),
+                                         'attempts': row['attempts'], 'error': row['error']})
+        return report
+
+def get_worker_name():
+    """
+    Get a name for the worker of this process, unique across the hosts.
+    """
+    return '%s:%d' % (socket.gethostname(), os.getpid())
+
+class Transaction():
+    def __init__(self, connection):
+        """
+        Initialize the Transaction class.
+
+        The context takes the write lock of the database when it starts, so the jobs are
+        claimed by a single worker, and commits or rolls back when it ends.
+
+        Parameters:
+        - connection: The connection to the database.
+        """
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.connection.execute('ROLLBACK' if exc_type is not None else 'COMMIT')
+        finally:
+            self.connection.close()